@@ -1,38 +1,234 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy.orm import Session, sessionmaker, relationship, validates
 from datetime import datetime
+import asyncio
 import os
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
 
-# Database URL
+# Database URL; DATABASE_READ_URL can point GET endpoints at a replica of a server database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./esg_analyzer.db")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or DATABASE_URL
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def is_memory_database(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def sqlite_pragmas(read_only: bool = False) -> dict:
+    """
+    Pragmas applied to every SQLite connection. WAL lets readers run alongside a writer, and
+    synchronous=NORMAL only syncs at checkpoints, which stays durable against application crashes.
+    """
+    pragmas = {
+        'journal_mode': os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        'synchronous': os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        'busy_timeout': int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        'cache_size': -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # Negative values are KiB
+        'mmap_size': int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        'temp_store': 'MEMORY',
+    }
+    if read_only:
+        pragmas['query_only'] = 'ON'
+    return pragmas
+
+# Async drivers for the database URLs' backends
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+
+def async_database_url(url: str) -> str:
+    """The URL with its backend's async driver, e.g. sqlite:///x.db -> sqlite+aiosqlite:///x.db"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def _listen_for_sqlite_pragmas(engine: Engine, pragmas: dict):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+def create_database_engine(url: str, read_only: bool = False) -> Engine:
+    """
+    Create an engine for a SQLite file with tuned pragmas, or a pooled engine for a server database.
+    A read-only engine has its own pool, so reads never wait for a connection held by a write.
+    """
+    if make_url(url).get_backend_name() == 'sqlite':
+        if is_memory_database(url):
+            # One shared connection per thread; there is no file to journal or map
+            engine = create_engine(url, connect_args={"check_same_thread": False})
+            pragmas = {'cache_size': sqlite_pragmas()['cache_size']}
+        else:
+            engine = create_engine(
+                url,
+                connect_args={"check_same_thread": False},
+                pool_size=int(os.getenv("DB_POOL_SIZE") or "8"),
+                max_overflow=int(os.getenv("DB_MAX_OVERFLOW") or "16"),
+                pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30"))
+            )
+            pragmas = sqlite_pragmas(read_only)
+
+        _listen_for_sqlite_pragmas(engine, pragmas)
+        return engine
+
+    return create_engine(
+        url,
+        pool_size=int(os.getenv("DB_POOL_SIZE") or "10"),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW") or "20"),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True
+    )
+
+def create_async_database_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    """
+    Async counterpart of create_database_engine (aiosqlite, asyncpg), with the same pragmas and pool sizing.
+    An in-memory SQLite database is private to its engine, so it is not shared with the sync engine.
+    """
+    async_url = async_database_url(url)
+    if make_url(url).get_backend_name() == 'sqlite':
+        if is_memory_database(url):
+            return create_async_engine(async_url, poolclass=StaticPool)
+        engine = create_async_engine(
+            async_url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE") or "8"),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW") or "16"),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        )
+        _listen_for_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(read_only))
+        return engine
+
+    return create_async_engine(
+        async_url,
+        pool_size=int(os.getenv("DB_POOL_SIZE") or "10"),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW") or "20"),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True
+    )
+
+# Writes go through the sync engine and async reads through aiosqlite, and each connection to an
+# in-memory SQLite database opens a private database, so writes would never be visible to reads
+for url in {DATABASE_URL, DATABASE_READ_URL}:
+    if is_memory_database(url):
+        raise ValueError(f"In-memory SQLite databases are not supported ({url}); use a database file")
+
+engine = create_database_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# GET endpoints read through their own engine
+read_engine = create_database_engine(DATABASE_READ_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# The analysis routes run on the event loop through async engines. Objects stay loaded after a commit
+# because attributes can't be lazily refreshed outside an await.
+async_engine = create_async_database_engine(DATABASE_URL)
+async_read_engine = create_async_database_engine(DATABASE_READ_URL, read_only=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+# SQLite allows one writer at a time. On the event loop a write transaction hands every statement to the
+# driver thread and back, and can't reach its COMMIT while the loop runs other work, so writers queued
+# behind it past busy_timeout. Every SQLite write of this process therefore goes through run_write (job
+# queue updates, POST /jobs, percentile refreshes and history pruning) or run_async_write (the analysis
+# routes), which run them one at a time on a single writer thread with a sync Session, taking the write
+# lock up front with BEGIN IMMEDIATE. Schema migrations run at startup, before any of these, under their own lock.
+SERIALIZE_WRITES = make_url(DATABASE_URL).get_backend_name() == 'sqlite'
+sqlite_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+T = TypeVar('T')
+
+def _write_immediately(write: Callable[[Session], T], session_factory=None) -> T:
+    with (session_factory or SessionLocal)() as session:
+        session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        result = write(session)
+        session.commit()
+        return result
+
+def run_write(write: Callable[[Session], T], session_factory=None) -> T:
+    """
+    Apply `write` to a new Session (from session_factory, by default SessionLocal) and commit it,
+    returning its result. Blocks, so it is called from a worker thread; on SQLite the write runs on the
+    writer thread, so it must not be called from inside another write.
+    """
+    if not SERIALIZE_WRITES:
+        with (session_factory or SessionLocal)() as session:
+            result = write(session)
+            session.commit()
+            return result
+
+    return sqlite_writer.submit(_write_immediately, write, session_factory).result()
+
+async def run_async_write(db: AsyncSession, write: Callable[[Session], T]) -> T:
+    """
+    Apply `write` to a Session and commit it, returning its result. `write` loads what it changes in that
+    Session instead of merging objects the AsyncSession read earlier, which may be stale. On SQLite the write runs on
+    the writer thread, after which the AsyncSession is cleared of its now stale objects; elsewhere it
+    runs on the AsyncSession itself.
+    """
+    if not SERIALIZE_WRITES:
+        result = await db.run_sync(write)
+        await db.commit()
+        return result
+
+    result = await asyncio.get_running_loop().run_in_executor(sqlite_writer, _write_immediately, write)
+    db.expunge_all()
+    return result
+
 Base = declarative_base()
 
+def normalize_company_name(name: str) -> str:
+    """Normalize a company name into the key used for exact lookups"""
+    name = unicodedata.normalize('NFKC', name).casefold()
+    name = re.sub(r'[^\w\s]', ' ', name)
+    return ' '.join(name.split())
+
 class Company(Base):
     __tablename__ = "companies"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
+    name_key = Column(String, unique=True, index=True)  # normalize_company_name(name)
+    sector = Column(String, index=True)
+    analysis_count = Column(Integer)  # Analyses stored for the company; numbers the latest one
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     articles = relationship("Article", back_populates="company")
     risk_scores = relationship("RiskScore", back_populates="company")
+    score_state = relationship("CompanyScoreState", back_populates="company", uselist=False)
+    
+    @validates('name')
+    def _set_name_key(self, key, name):
+        self.name_key = normalize_company_name(name)
+        return name
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        Index('ix_articles_company_published', 'company_id', 'published_at'),
+        UniqueConstraint('company_id', 'canonical_url', 'content_hash', name='uq_articles_company_identity'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     content = Column(Text)
     url = Column(String)
+    canonical_url = Column(String)  # deduplication.canonicalize_url(url)
+    content_hash = Column(String(64))  # deduplication.content_hash(title, content)
     published_at = Column(DateTime)
     sentiment_score = Column(Float)
     company_id = Column(Integer, ForeignKey("companies.id"))
+    last_analysis = Column(Integer)  # Company.analysis_count of the latest analysis that fetched the article
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -46,7 +242,7 @@ class ESGEvent(Base):
     event_type = Column(String)  # e.g., "labor_strike", "oil_spill", "regulatory_fine"
     description = Column(Text)
     severity = Column(Float)  # 0.0 to 1.0
-    article_id = Column(Integer, ForeignKey("articles.id"))
+    article_id = Column(Integer, ForeignKey("articles.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -54,6 +250,10 @@ class ESGEvent(Base):
 
 class RiskScore(Base):
     __tablename__ = "risk_scores"
+    __table_args__ = (
+        Index('ix_risk_scores_company_calculated', 'company_id', 'calculated_at'),
+        Index('ix_risk_scores_calculated', 'calculated_at'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"))
@@ -66,9 +266,136 @@ class RiskScore(Base):
     # Relationships
     company = relationship("Company", back_populates="risk_scores")
 
+class CompanyScoreState(Base):
+    """Running time-decayed aggregates behind a company's incremental risk score"""
+    __tablename__ = "company_score_state"
+    
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    reference_at = Column(DateTime)  # Time the aggregates are decayed to (newest article seen)
+    sentiment_weight = Column(Float)  # Sum of article weights
+    sentiment_sum = Column(Float)  # Sum of weight * sentiment
+    event_weight = Column(Float)  # Sum of event weights
+    severity_sum = Column(Float)  # Sum of weight * severity
+    overall_score = Column(Float)
+    environmental_score = Column(Float)  # Highest decayed event severity per category
+    social_score = Column(Float)
+    governance_score = Column(Float)
+    article_count = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    company = relationship("Company", back_populates="score_state")
+
+class CompanyLatestScore(Base):
+    """Each company's latest RiskScore, maintained on write so leaderboard reads are index range scans"""
+    __tablename__ = "company_latest_scores"
+    __table_args__ = (
+        Index('ix_latest_scores_overall', 'overall_score', 'company_id'),
+        Index('ix_latest_scores_environmental', 'environmental_score', 'company_id'),
+        Index('ix_latest_scores_social', 'social_score', 'company_id'),
+        Index('ix_latest_scores_governance', 'governance_score', 'company_id'),
+        Index('ix_latest_scores_sector_overall', 'sector', 'overall_score', 'company_id'),
+        Index('ix_latest_scores_sector_environmental', 'sector', 'environmental_score', 'company_id'),
+        Index('ix_latest_scores_sector_social', 'sector', 'social_score', 'company_id'),
+        Index('ix_latest_scores_sector_governance', 'sector', 'governance_score', 'company_id'),
+        Index('ix_latest_scores_calculated', 'calculated_at'),
+    )
+    
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    risk_score_id = Column(Integer)  # The RiskScore these values come from
+    sector = Column(String)  # Copy of companies.sector for filtered range scans
+    overall_score = Column(Float)
+    environmental_score = Column(Float)
+    social_score = Column(Float)
+    governance_score = Column(Float)
+    overall_percentile = Column(Float)  # percent_rank of the score among all companies, 0.0 to 1.0
+    environmental_percentile = Column(Float)
+    social_percentile = Column(Float)
+    governance_percentile = Column(Float)
+    total_articles = Column(Integer)
+    calculated_at = Column(DateTime)
+
+class LeaderboardVersion(Base):
+    """Single-row watermark of company_latest_scores, moved by every change to it; validates /companies ETags"""
+    __tablename__ = "leaderboard_version"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    version = Column(Integer, nullable=False, default=0)
+    company_count = Column(Integer, nullable=False, default=0)  # Rows in company_latest_scores
+    percentiles_version = Column(Integer, nullable=False, default=0, server_default='0')  # Version the percentile ranks were computed at
+
+class RiskScoreRollup(Base):
+    """
+    A company's risk scores over one day, week or month, maintained on write. Sums and counts rather
+    than means, so scores can be added to a bucket and raw rows past retention pruned.
+    """
+    __tablename__ = "risk_score_rollups"
+    
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    resolution = Column(String, primary_key=True)  # day, week or month
+    bucket_start = Column(DateTime, primary_key=True)  # Midnight UTC starting the day, the week's Monday or the month's 1st
+    score_count = Column(Integer, nullable=False)
+    last_at = Column(DateTime)  # calculated_at of the newest score in the bucket
+    overall_score_min = Column(Float)
+    overall_score_max = Column(Float)
+    overall_score_sum = Column(Float)
+    overall_score_last = Column(Float)
+    environmental_score_min = Column(Float)
+    environmental_score_max = Column(Float)
+    environmental_score_sum = Column(Float)
+    environmental_score_last = Column(Float)
+    social_score_min = Column(Float)
+    social_score_max = Column(Float)
+    social_score_sum = Column(Float)
+    social_score_last = Column(Float)
+    governance_score_min = Column(Float)
+    governance_score_max = Column(Float)
+    governance_score_sum = Column(Float)
+    governance_score_last = Column(Float)
+
+class AnalysisJob(Base):
+    """A queued batch of company analyses, claimed and run by the background job workers"""
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        Index('ix_analysis_jobs_status_id', 'status', 'id'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default='queued')  # queued, running, completed or failed
+    source = Column(String, nullable=False, default='api')  # api or scheduler
+    companies = Column(Text, nullable=False)  # JSON list of company names
+    sector = Column(String)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)  # Companies analyzed
+    failed = Column(Integer, nullable=False, default=0)  # Companies whose analysis failed
+    results = Column(Text)  # JSON list of {company, score} or {company, error}, in completion order
+    error = Column(Text)  # Why the job as a whole failed
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # Last lease renewal of a running job; jobs silent for a lease are requeued
+    finished_at = Column(DateTime)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session for endpoints that only read"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """AsyncSession for endpoints that only read"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
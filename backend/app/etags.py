@@ -0,0 +1,36 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Read endpoints are revalidated on every use; an unchanged resource costs a 304 instead of a body
+REVALIDATE = "no-cache"
+
+def make_etag(*watermark) -> str:
+    """A strong ETag from the values that change whenever the resource does"""
+    return '"' + '-'.join(str(part) for part in watermark) + '"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    A 304 response if the request's If-None-Match already names this ETag, otherwise None.
+    Tags of compressed representations (with the coding appended) and weak tags also match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or _strip_coding(candidate.removeprefix('W/')) == etag:
+            headers = {"ETag": candidate if candidate != '*' else etag, "Cache-Control": REVALIDATE}
+            return Response(status_code=304, headers=headers)
+    return None
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+
+def _strip_coding(tag: str) -> str:
+    for encoding in ('gzip', 'br'):
+        if tag.endswith(f'-{encoding}"'):
+            return tag[:-len(encoding) - 2] + '"'
+    return tag
@@ -1,16 +1,54 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import analyze
-from app.database import engine, Base
+from fastapi.responses import JSONResponse
+from app.compression import CompressionMiddleware
+from app.routers import analyze, jobs, search
+from app.database import engine, read_engine, async_engine, async_read_engine
+from app.migrations import run_migrations
+from app.services.registry import services
 import uvicorn
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables and apply schema migrations
+    started = time.perf_counter()
+    await asyncio.to_thread(run_migrations, engine)
+    services.record('migrations', started)
+
+    # Load NLP models after the server is accepting requests
+    warm_up = None
+    if services.warmup_mode == 'background':
+        warm_up = asyncio.create_task(asyncio.to_thread(services.warm_up))
+
+    # Start background analysis workers and the stale-score scheduler
+    services.job_queue.start(jobs.run_job_analysis)
+
+    services.record('startup', started)
+    logger.info("Startup finished in %.3fs (import %.3fs)", services.timings['startup'], services.timings['import'])
+
+    yield
+
+    if warm_up is not None:
+        await warm_up
+    await services.aclose()
+    read_engine.dispose()
+    engine.dispose()
+    await async_read_engine.dispose()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="ESG Risk Analyzer API",
     description="AI-powered ESG risk analysis for companies",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,8 +60,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses with brotli or gzip
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(analyze.router, prefix="/api", tags=["analyze"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -33,5 +76,18 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Whether NLP models are loaded, with import, startup and warm-up timings
+    """
+    return JSONResponse(services.status(), status_code=200 if services.ready else 503)
+
+services.record('import', _import_started)
+
+# Load models in the importing process so workers forked from it share them
+if services.warmup_mode == 'preload':
+    services.warm_up()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,225 @@
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import Base, normalize_company_name
+from app.services.decayed_scores import rebuild_score_states, scorer_from_env
+from app.services.deduplication import compact_duplicate_articles
+from app.services.leaderboard import refresh_leaderboard
+from app.services.score_history import rebuild_rollups
+
+# Schema migrations are applied in order and recorded in schema_migrations.
+# Tables that don't exist yet are created from the models first, so every
+# migration must also be safe to run against a freshly created schema.
+
+
+def _add_hot_path_indexes(conn: Connection):
+    """Index foreign keys and latest-score lookups, and add the normalized company name key"""
+    company_columns = {column['name'] for column in inspect(conn).get_columns('companies')}
+    if 'name_key' not in company_columns:
+        conn.execute(text("ALTER TABLE companies ADD COLUMN name_key VARCHAR"))
+
+    # Backfill keys, merging companies whose names normalize to the same key into the oldest one
+    keepers = {}
+    rows = conn.execute(text("SELECT id, name FROM companies ORDER BY id")).fetchall()
+    for company_id, name in rows:
+        name_key = normalize_company_name(name or '')
+        keeper_id = keepers.setdefault(name_key, company_id)
+
+        if keeper_id == company_id:
+            conn.execute(
+                text("UPDATE companies SET name_key = :name_key WHERE id = :id"),
+                {'name_key': name_key, 'id': company_id}
+            )
+        else:
+            for table in ('articles', 'risk_scores'):
+                conn.execute(
+                    text(f"UPDATE {table} SET company_id = :keeper_id WHERE company_id = :id"),
+                    {'keeper_id': keeper_id, 'id': company_id}
+                )
+            conn.execute(text("DELETE FROM companies WHERE id = :id"), {'id': company_id})
+
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_companies_name_key ON companies (name_key)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_company_published ON articles (company_id, published_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_esg_events_article_id ON esg_events (article_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_risk_scores_company_calculated ON risk_scores (company_id, calculated_at)"))
+
+
+def _add_search_index(conn: Connection):
+    """Create the FTS5 index over articles and events, kept in sync by triggers (SQLite only)"""
+    if conn.dialect.name != 'sqlite':
+        return
+
+    # Articles use even rowids (id * 2) and events odd ones (id * 2 + 1). Company and
+    # publication date are read from articles at query time so they never go stale here.
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, body, kind UNINDEXED, article_id UNINDEXED, category UNINDEXED, "
+        "tokenize = 'porter unicode61')"
+    ))
+
+    index_article = (
+        "INSERT INTO search_index (rowid, title, body, kind, article_id, category) "
+        "VALUES (new.id * 2, new.title, new.content, 'article', new.id, NULL);"
+    )
+    index_event = (
+        "INSERT INTO search_index (rowid, title, body, kind, article_id, category) "
+        "VALUES (new.id * 2 + 1, replace(new.event_type, '_', ' '), new.description, 'event', "
+        "new.article_id, substr(new.event_type, 1, instr(new.event_type, '_') - 1));"
+    )
+    triggers = {
+        'articles_search_insert': f"AFTER INSERT ON articles BEGIN {index_article} END",
+        'articles_search_update': (
+            "AFTER UPDATE OF title, content ON articles BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 2; {index_article} END"
+        ),
+        'articles_search_delete': "AFTER DELETE ON articles BEGIN DELETE FROM search_index WHERE rowid = old.id * 2; END",
+        'esg_events_search_insert': f"AFTER INSERT ON esg_events BEGIN {index_event} END",
+        'esg_events_search_update': (
+            "AFTER UPDATE OF event_type, description, article_id ON esg_events BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 2 + 1; {index_event} END"
+        ),
+        'esg_events_search_delete': "AFTER DELETE ON esg_events BEGIN DELETE FROM search_index WHERE rowid = old.id * 2 + 1; END",
+    }
+    for name, body in triggers.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+    # Index rows written before the triggers existed
+    conn.execute(text("DELETE FROM search_index"))
+    conn.execute(text(
+        "INSERT INTO search_index (rowid, title, body, kind, article_id, category) "
+        "SELECT id * 2, title, content, 'article', id, NULL FROM articles"
+    ))
+    conn.execute(text(
+        "INSERT INTO search_index (rowid, title, body, kind, article_id, category) "
+        "SELECT id * 2 + 1, replace(event_type, '_', ' '), description, 'event', article_id, "
+        "substr(event_type, 1, instr(event_type, '_') - 1) FROM esg_events"
+    ))
+
+
+def _add_article_identity(conn: Connection):
+    """Identify articles by canonical URL and content hash, collapsing existing duplicates"""
+    article_columns = {column['name'] for column in inspect(conn).get_columns('articles')}
+    if 'canonical_url' not in article_columns:
+        conn.execute(text("ALTER TABLE articles ADD COLUMN canonical_url VARCHAR"))
+    if 'content_hash' not in article_columns:
+        conn.execute(text("ALTER TABLE articles ADD COLUMN content_hash VARCHAR(64)"))
+
+    # Duplicates must go before the unique index can be built
+    compact_duplicate_articles(conn)
+
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_articles_company_identity "
+        "ON articles (company_id, canonical_url, content_hash)"
+    ))
+
+
+def _backfill_score_states(conn: Connection):
+    """Build the decayed score aggregates for companies analyzed before they were maintained"""
+    rebuild_score_states(conn, scorer_from_env())
+
+
+def _add_leaderboard(conn: Connection):
+    """Add company sectors and fill the materialized latest-score leaderboard"""
+    company_columns = {column['name'] for column in inspect(conn).get_columns('companies')}
+    if 'sector' not in company_columns:
+        conn.execute(text("ALTER TABLE companies ADD COLUMN sector VARCHAR"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_companies_sector ON companies (sector)"))
+
+    refresh_leaderboard(conn)
+
+
+def _add_stale_score_index(conn: Connection):
+    """Index latest scores by calculation time for the stale-company scheduler"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_latest_scores_calculated ON company_latest_scores (calculated_at)"))
+
+
+def _add_score_rollups(conn: Connection):
+    """Roll existing risk scores into daily, weekly and monthly history buckets"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_risk_scores_calculated ON risk_scores (calculated_at)"))
+    rebuild_rollups(conn)
+
+
+def _add_leaderboard_version(conn: Connection):
+    """Start the leaderboard version row that /companies ETags are built from"""
+    conn.execute(text(
+        "INSERT INTO leaderboard_version (id, version, company_count) "
+        "SELECT 1, 1, COUNT(*) FROM company_latest_scores "
+        "WHERE NOT EXISTS (SELECT 1 FROM leaderboard_version)"
+    ))
+
+
+def _add_percentiles_version(conn: Connection):
+    """Track the leaderboard version percentile ranks were computed at, so refreshes skip unchanged leaderboards"""
+    version_columns = {column['name'] for column in inspect(conn).get_columns('leaderboard_version')}
+    if 'percentiles_version' not in version_columns:
+        conn.execute(text("ALTER TABLE leaderboard_version ADD COLUMN percentiles_version INTEGER NOT NULL DEFAULT 0"))
+
+
+def _add_analysis_numbers(conn: Connection):
+    """Number each company's analyses and record the latest one that fetched each article"""
+    company_columns = {column['name'] for column in inspect(conn).get_columns('companies')}
+    if 'analysis_count' not in company_columns:
+        conn.execute(text("ALTER TABLE companies ADD COLUMN analysis_count INTEGER"))
+    article_columns = {column['name'] for column in inspect(conn).get_columns('articles')}
+    if 'last_analysis' not in article_columns:
+        conn.execute(text("ALTER TABLE articles ADD COLUMN last_analysis INTEGER"))
+
+
+MIGRATIONS = [
+    (1, "Hot path indexes and normalized company name key", _add_hot_path_indexes),
+    (2, "Full-text search index over articles and events", _add_search_index),
+    (3, "Article identity by canonical URL and content hash", _add_article_identity),
+    (4, "Time-decayed company score aggregates", _backfill_score_states),
+    (5, "Company sectors and materialized latest-score leaderboard", _add_leaderboard),
+    (6, "Latest-score calculation time index for scheduled re-analysis", _add_stale_score_index),
+    (7, "Daily, weekly and monthly risk score history rollups", _add_score_rollups),
+    (8, "Leaderboard version watermark", _add_leaderboard_version),
+    (9, "Leaderboard percentile refresh version", _add_percentiles_version),
+    (10, "Analysis numbers of companies and the articles they fetched", _add_analysis_numbers),
+]
+
+
+# Key of the PostgreSQL advisory lock held while migrating
+MIGRATION_LOCK_KEY = 7_301_924
+
+
+@contextmanager
+def _write_locked(engine: Engine):
+    """
+    A transaction that takes the database's write lock first, so workers starting together apply
+    each step one at a time and see each other's schema_migrations rows
+    """
+    with engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif conn.dialect.name == 'postgresql':
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+        yield conn
+        conn.commit()
+
+
+def run_migrations(engine: Engine):
+    """Create missing tables and apply any pending schema migrations; safe to run from several workers at once"""
+    with _write_locked(engine) as conn:
+        Base.metadata.create_all(bind=conn)
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR, applied_at TIMESTAMP)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        # Each migration and its bookkeeping row commit together, unless another worker applied it first
+        with _write_locked(engine) as conn:
+            if conn.execute(text("SELECT 1 FROM schema_migrations WHERE version = :version"), {'version': version}).first():
+                continue
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                {'version': version, 'description': description, 'applied_at': datetime.utcnow()}
+            )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -9,9 +9,9 @@ class ESGEventResponse(BaseModel):
 
 class ArticleResponse(BaseModel):
     title: str
-    content: str
+    content: Optional[str] = None
     url: str
-    published_at: datetime
+    published_at: Optional[datetime] = None  # Feeds may omit it
     sentiment_score: float
     events: List[ESGEventResponse] = []
 
@@ -30,5 +30,79 @@ class CompanyAnalysisResponse(BaseModel):
     total_articles: int
     analyzed_at: datetime
 
+class CompanyDetailsResponse(CompanyAnalysisResponse):
+    next_cursor: Optional[str] = None
+
+class ScoreAggregate(BaseModel):
+    min: float
+    max: float
+    mean: float
+    last: float
+
+class ScoreHistoryPoint(BaseModel):
+    start: datetime  # Bucket start, or calculation time of a raw score
+    count: int  # Scores in the bucket
+    overall_score: ScoreAggregate
+    environmental_score: ScoreAggregate
+    social_score: ScoreAggregate
+    governance_score: ScoreAggregate
+
+class ScoreHistoryResponse(BaseModel):
+    company_id: int
+    company: str
+    resolution: str  # raw, day, week or month
+    points: List[ScoreHistoryPoint]  # Oldest first
+
+class SearchResult(BaseModel):
+    kind: str  # "article" or "event"
+    company_id: int
+    company: str
+    article_id: int
+    title: str
+    url: str
+    published_at: Optional[datetime] = None
+    category: Optional[str] = None
+    snippet: str
+    score: float  # BM25 relevance, higher is better
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    limit: int
+    offset: int
+    has_more: bool
+
 class CompanyRequest(BaseModel):
     company_name: str
+
+class BatchAnalysisRequest(BaseModel):
+    companies: List[str] = Field(..., min_length=1, max_length=1000)
+    limit: int = Field(10, ge=1, le=50)
+
+class JobRequest(BaseModel):
+    companies: List[str] = Field(..., min_length=1, max_length=1000)
+    sector: Optional[str] = None
+
+class JobResult(BaseModel):
+    company: str
+    score: Optional[float] = None
+    error: Optional[str] = None
+
+class JobProgressResponse(BaseModel):
+    id: int
+    status: str  # queued, running, completed or failed
+    source: str  # api or scheduler
+    total: int
+    completed: int
+    failed: int
+    progress: float  # Share of companies finished, 0.0 to 1.0
+
+class JobResponse(JobProgressResponse):
+    companies: List[str]
+    sector: Optional[str] = None
+    results: List[JobResult] = []
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,186 +1,785 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, defer
+from typing import Callable, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import base64
+import json
 
-from app.database import get_db, Company, Article, ESGEvent, RiskScore
-from app.models import CompanyAnalysisResponse, ESGEventResponse, ArticleResponse, RiskScoreResponse
-from app.services.news_service import NewsService
-from app.services.simple_nlp import SimpleNLPService
+from app.database import get_async_db, get_async_read_db, run_async_write, normalize_company_name, Company, CompanyLatestScore, LeaderboardVersion, Article, ESGEvent, RiskScore
+from app.etags import make_etag, not_modified, set_etag
+from app.models import (
+    CompanyAnalysisResponse, CompanyDetailsResponse, ESGEventResponse, ArticleResponse,
+    RiskScoreResponse, BatchAnalysisRequest, ScoreHistoryResponse
+)
+from app.services.deduplication import article_identity
+from app.services.leaderboard import LEADERBOARD_SCORES
+from app.services.nlp_executor import ExecutorSaturated
+from app.services.registry import services
+from app.services.risk_engine import score_stored_companies
+from app.services.score_history import HISTORY_RESOLUTIONS, history_point, history_query
 
 router = APIRouter()
-news_service = NewsService()
-nlp_service = SimpleNLPService()
+
+# Batch analysis tuning
+BATCH_FETCH_CONCURRENCY = 16  # Concurrent news fetches per batch request
+BATCH_CHUNK_SIZE = 50  # Companies scored and committed per transaction
+
+# Fields accepted by /companies?sort_by=
+COMPANY_SORT_FIELDS = ('id', 'name', 'sector', *LEADERBOARD_SCORES, 'last_analyzed', 'total_articles')
 
 @router.get("/analyze", response_model=CompanyAnalysisResponse)
 async def analyze_company(
     company: str = Query(..., description="Company name to analyze"),
-    db: Session = Depends(get_db)
+    sector: Optional[str] = Query(None, description="Sector to record for the company"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze ESG risk for a company by scraping news and running NLP analysis
     """
     try:
-        # Get or create company in database
-        db_company = db.query(Company).filter(Company.name.ilike(f"%{company}%")).first()
-        if not db_company:
-            db_company = Company(name=company)
-            db.add(db_company)
-            db.commit()
-            db.refresh(db_company)
-        
-        # Get news articles
-        news_articles = news_service.get_company_news(company, limit=10)
-        
-        # Process each article
-        all_events = []
-        processed_articles = []
+        return await run_company_analysis(db, company, sector)
         
-        for article_data in news_articles:
-            # Analyze sentiment
-            sentiment_score = nlp_service.analyze_sentiment(article_data['content'])
-            
-            # Detect ESG events
-            events = nlp_service.detect_esg_events(article_data['content'])
-            
-            # Store article in database
-            db_article = Article(
-                title=article_data['title'],
-                content=article_data['content'],
-                url=article_data['url'],
-                published_at=article_data['published_at'],
-                sentiment_score=sentiment_score,
-                company_id=db_company.id
+    except ExecutorSaturated as e:
+        await db.rollback()
+        raise HTTPException(status_code=429, detail=f"Analysis capacity exhausted: {str(e)}", headers={"Retry-After": "1"})
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+@router.get("/analyze/stream")
+async def analyze_company_stream(
+    request: Request,
+    company: str = Query(..., description="Company name to analyze"),
+    sector: Optional[str] = Query(None, description="Sector to record for the company"),
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="ndjson or sse; defaults from the Accept header"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Analyze ESG risk for a company, streaming each article with its events as soon as it is
+    analyzed and the risk breakdown once the analysis is stored
+    """
+    # Headers go out before the first article, so a full NLP pool is reported up front
+    if services.nlp_executor.saturated:
+        raise HTTPException(status_code=429, detail="Analysis capacity exhausted", headers={"Retry-After": "1"})
+    
+    if format is None:
+        format = 'sse' if 'text/event-stream' in request.headers.get('accept', '') else 'ndjson'
+    
+    if format == 'sse':
+        return StreamingResponse(
+            _stream_company_analysis(company, sector, db, _sse_message),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return StreamingResponse(
+        _stream_company_analysis(company, sector, db, _ndjson_message),
+        media_type="application/x-ndjson"
+    )
+
+def _ndjson_message(kind: str, payload: dict) -> str:
+    return json.dumps({'type': kind, **payload}) + "\n"
+
+def _sse_message(kind: str, payload: dict) -> str:
+    return f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+
+async def _stream_company_analysis(company: str, sector: Optional[str], db: AsyncSession, message):
+    """
+    Yield an 'article' message per article as its analysis finishes, then a 'result' message with the
+    stored risk breakdown, or an 'error' message. Article messages carry their index in the fetched list.
+    The analysis is shared with concurrent analyses of the same company; when another request leads it,
+    or the result is cached, the articles are sent once it finishes.
+    """
+    articles = asyncio.Queue()
+    analysis = asyncio.ensure_future(run_company_analysis(
+        db, company, sector, wait=True, on_article=lambda index, article: articles.put_nowait((index, article))
+    ))
+    analysis.add_done_callback(lambda _: articles.put_nowait(None))
+    sent = set()
+    try:
+        while True:
+            item = await articles.get()
+            if item is None:
+                break
+            index, article = item
+            sent.add(index)
+            yield message('article', {'index': index, 'article': article.model_dump(mode='json')})
+        
+        response = analysis.result()
+        for index, article in enumerate(response.articles):
+            if index not in sent:
+                yield message('article', {'index': index, 'article': article.model_dump(mode='json')})
+        yield message('result', response.model_dump(mode='json', exclude={'articles'}))
+        
+    except Exception as e:
+        await db.rollback()
+        yield message('error', {'detail': f"Analysis failed: {str(e)}"})
+    finally:
+        # A disconnected client leaves nothing running
+        analysis.cancel()
+
+async def run_company_analysis(
+    db: AsyncSession,
+    company: str,
+    sector: Optional[str] = None,
+    wait: bool = False,
+    on_article: Optional[Callable[[int, ArticleResponse], None]] = None
+) -> CompanyAnalysisResponse:
+    """
+    Fetch, analyze and store one company's news, or return the cached result if it is unchanged.
+    Concurrent calls for the same company share one analysis whatever sector each asks for; callers
+    that shared another's analysis record their own sector afterwards. With wait=False a saturated
+    NLP executor raises ExecutorSaturated instead of queueing. When this call leads the analysis,
+    on_article(index, article) is called as each new article's analysis finishes.
+    """
+    led = False
+
+    async def analyze():
+        nonlocal led
+        led = True
+        return await _analyze_company(db, company, sector, wait, on_article)
+
+    response = await services.analysis_flights.run(normalize_company_name(company), analyze)
+    if not led:
+        await _save_company_sector(db, company, sector)
+    return response
+
+async def _analyze_company(
+    db: AsyncSession,
+    company: str,
+    sector: Optional[str],
+    wait: bool,
+    on_article: Optional[Callable[[int, ArticleResponse], None]] = None
+) -> CompanyAnalysisResponse:
+    # Get news articles
+    news_articles = await services.news_service.fetch_company_news(company, limit=10)
+    
+    # Unchanged news for the same company returns the stored result
+    cache_key = services.analysis_cache.make_key(company, news_articles)
+    cached_response = await services.analysis_cache.aget(cache_key)
+    if cached_response is not None:
+        await _save_company_sector(db, company, sector)
+        return cached_response
+    
+    # A new company is inserted with the rest of the analysis
+    db_company = await _find_company(db, company)
+    
+    # Analyze new articles; ones already stored for this company reuse their results
+    if on_article is None:
+        [(news_articles, analyses)] = await _analyze_articles(db, [(db_company, news_articles)], wait=wait)
+    else:
+        news_articles, analyses = await _analyze_articles_one_by_one(db, db_company, news_articles, wait, on_article)
+    
+    # Stage company, articles, events and risk score, then write them in one transaction
+    response = await _persist_company_analysis(db, company, sector, news_articles, analyses)
+    
+    await services.analysis_cache.aset(cache_key, response)
+    return response
+
+async def _find_company(db: AsyncSession, company: str) -> Company:
+    """Find a company by normalized name, or a new one that is only added to the database by the write"""
+    db_company = (await db.execute(
+        select(Company).where(Company.name_key == normalize_company_name(company))
+    )).scalars().first()
+    return db_company if db_company is not None else Company(name=company)
+
+def _company_for_write(session: Session, company: str, sector: Optional[str]) -> Company:
+    """
+    Load a company and its score state in a write transaction, adding the company if it is new. Both are
+    read afresh, with the company row locked on server databases, so a concurrent write's aggregates are
+    added to rather than overwritten with ones read before this analysis ran.
+    """
+    query = (
+        select(Company).options(selectinload(Company.score_state))
+        .where(Company.name_key == normalize_company_name(company))
+        .with_for_update().execution_options(populate_existing=True)
+    )
+    db_company = session.execute(query).scalars().first()
+    if db_company is None:
+        db_company = Company(name=company)
+        try:
+            with session.begin_nested():
+                session.add(db_company)
+        except IntegrityError:
+            # Another process added the company since this analysis looked it up
+            db_company = session.execute(query).scalars().one()
+    if sector:
+        db_company.sector = sector
+    return db_company
+
+async def _save_company_sector(db: AsyncSession, company: str, sector: Optional[str]):
+    """Record a requested sector for a company whose analysis is served from the cache"""
+    if not sector:
+        return
+    db_company = (await db.execute(
+        select(Company).where(Company.name_key == normalize_company_name(company))
+    )).scalars().first()
+    if db_company is not None and db_company.sector != sector:
+        def write(session: Session):
+            session.get(Company, db_company.id).sector = sector
+
+        await run_async_write(db, write)
+
+async def _persist_company_analysis(
+    db: AsyncSession,
+    company: str,
+    sector: Optional[str],
+    news_articles: List[dict],
+    analyses: List[dict]
+) -> CompanyAnalysisResponse:
+    """Add one company's analysis to a write session and commit it"""
+    def write(session: Session) -> CompanyAnalysisResponse:
+        db_company = _company_for_write(session, company, sector)
+        return _add_company_analysis(session, db_company, company, news_articles, analyses)
+
+    return await run_async_write(db, write)
+
+async def _analyze_articles(
+    db: AsyncSession,
+    fetched: List[Tuple[Company, List[dict]]],
+    wait: bool = False
+) -> List[Tuple[List[dict], List[dict]]]:
+    """
+    Run NLP over every article not yet stored for its company in one batch on the NLP executor,
+    reusing the stored sentiment and events for the rest. Repeated articles within a fetch are dropped.
+    With wait=False a saturated executor raises ExecutorSaturated instead of queueing.
+    """
+    companies, stored_articles = await _load_stored_articles(db, fetched)
+    
+    new_texts = [
+        article['content']
+        for db_company, articles, identities in companies
+        for article, identity in zip(articles, identities)
+        if (db_company.id, *identity) not in stored_articles
+    ]
+    new_analyses = iter(await services.nlp_executor.run('analyze_batch', new_texts, wait=wait) if new_texts else [])
+    
+    results = []
+    for db_company, articles, identities in companies:
+        analyses = []
+        for canonical_url, content_hash in identities:
+            stored_article = stored_articles.get((db_company.id, canonical_url, content_hash))
+            if stored_article:
+                analysis = _stored_analysis(stored_article)
+            else:
+                analysis = next(new_analyses)
+                analysis['canonical_url'] = canonical_url
+                analysis['content_hash'] = content_hash
+            analyses.append(analysis)
+        results.append((articles, analyses))
+    
+    return results
+
+async def _load_stored_articles(db: AsyncSession, fetched: List[Tuple[Company, List[dict]]]) -> Tuple[list, dict]:
+    """Drop repeated articles within each fetch and load the ones already stored, with their events"""
+    companies = []
+    company_ids = set()
+    content_hashes = set()
+    for db_company, news_articles in fetched:
+        unique_articles = {}
+        for article in news_articles:
+            unique_articles.setdefault(article_identity(article), article)
+        companies.append((db_company, list(unique_articles.values()), list(unique_articles)))
+        
+        if db_company.id is not None:
+            company_ids.add(db_company.id)
+            content_hashes.update(content_hash for _, content_hash in unique_articles)
+    
+    # Find already analyzed articles for all companies in one query
+    stored_articles = {}
+    if company_ids:
+        for article in (await db.execute(
+            select(Article).options(selectinload(Article.events)).where(
+                Article.company_id.in_(company_ids),
+                Article.content_hash.in_(content_hashes)
             )
-            db.add(db_article)
-            db.commit()
-            db.refresh(db_article)
-            
-            # Store ESG events
-            for event in events:
-                db_event = ESGEvent(
-                    event_type=event.event_type,
-                    description=event.description,
-                    severity=event.severity,
-                    article_id=db_article.id
+        )).scalars():
+            stored_articles[(article.company_id, article.canonical_url, article.content_hash)] = article
+    
+    return companies, stored_articles
+
+async def _analyze_articles_one_by_one(
+    db: AsyncSession,
+    db_company: Company,
+    news_articles: List[dict],
+    wait: bool,
+    on_article: Callable[[int, ArticleResponse], None]
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Like _analyze_articles for one company, but with one NLP call per new article so each is passed to
+    on_article as soon as its own analysis finishes; stored articles are passed straight away. Returns
+    the fetch without repeated articles, which on_article's indexes refer to, and its analyses.
+    """
+    [(db_company, news_articles, identities)], stored_articles = await _load_stored_articles(
+        db, [(db_company, news_articles)]
+    )
+    analyses = [None] * len(news_articles)
+    
+    async def analyze(index: int, canonical_url: str, content_hash: str):
+        [analysis] = await services.nlp_executor.run('analyze_batch', [news_articles[index]['content']], wait=wait)
+        analysis['canonical_url'] = canonical_url
+        analysis['content_hash'] = content_hash
+        return index, analysis
+    
+    pending = []
+    try:
+        for index, (canonical_url, content_hash) in enumerate(identities):
+            stored_article = stored_articles.get((db_company.id, canonical_url, content_hash))
+            if stored_article:
+                analyses[index] = _stored_analysis(stored_article)
+                on_article(index, _article_response(news_articles[index], analyses[index]))
+            else:
+                pending.append(asyncio.ensure_future(analyze(index, canonical_url, content_hash)))
+        
+        for next_analysis in asyncio.as_completed(pending):
+            index, analyses[index] = await next_analysis
+            on_article(index, _article_response(news_articles[index], analyses[index]))
+    finally:
+        # A failed or cancelled analysis leaves nothing running
+        for task in pending:
+            task.cancel()
+    
+    return news_articles, analyses
+
+def _stored_analysis(stored_article: Article) -> dict:
+    """The analysis of an already stored article, in the shape analyze_batch returns"""
+    return {
+        'sentiment_score': stored_article.sentiment_score,
+        'events': [
+            ESGEventResponse(
+                event_type=event.event_type,
+                description=event.description,
+                severity=event.severity
+            ) for event in stored_article.events
+        ],
+        'stored_article': stored_article
+    }
+
+def _article_response(article_data: dict, analysis: dict) -> ArticleResponse:
+    return ArticleResponse(
+        title=article_data['title'],
+        content=article_data['content'],
+        url=article_data['url'],
+        published_at=article_data['published_at'],
+        sentiment_score=analysis['sentiment_score'],
+        events=analysis['events']
+    )
+
+def _add_company_analysis(
+    db: Session,
+    db_company: Company,
+    company: str,
+    news_articles: List[dict],
+    analyses: List[dict]
+) -> CompanyAnalysisResponse:
+    """Add new articles, events and the risk score for one company to the session without committing"""
+    all_events = []
+    processed_articles = []
+    
+    # New articles also update the company's running time-decayed aggregates
+    risk_scorer = services.risk_scorer
+    score_state = db_company.score_state
+    if score_state is None:
+        score_state = risk_scorer.new_state(db_company)
+        db.add(score_state)
+    
+    # Number this analysis; every article it fetched is marked with the number
+    db_company.analysis_count = (db_company.analysis_count or 0) + 1
+    
+    # Articles a concurrent analysis of the company stored after this one looked them up are already
+    # counted in the score state
+    stored_since = set()
+    new_hashes = {analysis['content_hash'] for analysis in analyses if 'stored_article' not in analysis}
+    if new_hashes and db_company.id is not None:
+        stored_since = {
+            tuple(identity) for identity in db.execute(
+                select(Article.canonical_url, Article.content_hash).where(
+                    Article.company_id == db_company.id,
+                    Article.content_hash.in_(new_hashes)
                 )
-                db.add(db_event)
-                all_events.append(event)
-            
-            # Create article response
-            article_response = ArticleResponse(
+            )
+        }
+    
+    for article_data, analysis in zip(news_articles, analyses):
+        events = analysis['events']
+        
+        # Articles already stored are kept as they are; new ones are inserted with their events
+        if 'stored_article' not in analysis and (analysis['canonical_url'], analysis['content_hash']) not in stored_since:
+            db.add(Article(
+                company=db_company,
                 title=article_data['title'],
                 content=article_data['content'],
                 url=article_data['url'],
+                canonical_url=analysis['canonical_url'],
+                content_hash=analysis['content_hash'],
                 published_at=article_data['published_at'],
-                sentiment_score=sentiment_score,
-                events=events
+                sentiment_score=analysis['sentiment_score'],
+                events=[
+                    ESGEvent(
+                        event_type=event.event_type,
+                        description=event.description,
+                        severity=event.severity
+                    ) for event in events
+                ],
+                last_analysis=db_company.analysis_count
+            ))
+            risk_scorer.add_article(
+                score_state,
+                article_data['published_at'],
+                analysis['sentiment_score'],
+                [(event.event_type, event.severity) for event in events]
             )
-            processed_articles.append(article_response)
+        all_events.extend(events)
         
-        # Calculate risk scores
-        risk_scores = nlp_service.calculate_risk_scores(news_articles, all_events)
-        
-        # Store risk score in database
-        db_risk_score = RiskScore(
-            company_id=db_company.id,
+        # Create article response
+        processed_articles.append(_article_response(article_data, analysis))
+    
+    # Articles stored before this analysis fetched them again
+    stored_ids = [analysis['stored_article'].id for analysis in analyses if 'stored_article' in analysis]
+    if stored_ids:
+        db.execute(update(Article).where(Article.id.in_(stored_ids)).values(last_analysis=db_company.analysis_count))
+    if stored_since:
+        db.execute(update(Article).where(
+            Article.company_id == db_company.id,
+            tuple_(Article.canonical_url, Article.content_hash).in_(stored_since)
+        ).values(last_analysis=db_company.analysis_count))
+    
+    # Score this analysis's stored articles as the nightly re-score does, or report the decayed
+    # aggregates over the company's history
+    if risk_scorer.mode == 'decayed':
+        risk_scores = risk_scorer.scores(score_state)
+    else:
+        db.flush()
+        scored = score_stored_companies(db.connection(), [db_company.id])
+        risk_scores = scored[0] if scored else dict.fromkeys(LEADERBOARD_SCORES, 0.0)
+    
+    db.add(RiskScore(
+        company=db_company,
+        overall_score=risk_scores['overall_score'],
+        environmental_score=risk_scores['environmental_score'],
+        social_score=risk_scores['social_score'],
+        governance_score=risk_scores['governance_score']
+    ))
+    
+    return CompanyAnalysisResponse(
+        company=company,
+        score=risk_scores['overall_score'],
+        risk_breakdown=RiskScoreResponse(
             overall_score=risk_scores['overall_score'],
             environmental_score=risk_scores['environmental_score'],
             social_score=risk_scores['social_score'],
             governance_score=risk_scores['governance_score']
-        )
-        db.add(db_risk_score)
-        db.commit()
-        
-        # Create response
-        response = CompanyAnalysisResponse(
-            company=company,
-            score=risk_scores['overall_score'],
-            risk_breakdown=RiskScoreResponse(
-                overall_score=risk_scores['overall_score'],
-                environmental_score=risk_scores['environmental_score'],
-                social_score=risk_scores['social_score'],
-                governance_score=risk_scores['governance_score']
-            ),
-            events=all_events,
-            articles=processed_articles,
-            total_articles=len(processed_articles),
-            analyzed_at=datetime.utcnow()
-        )
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        ),
+        events=all_events,
+        articles=processed_articles,
+        total_articles=len(processed_articles),
+        analyzed_at=datetime.utcnow()
+    )
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters and occupancy of the analysis result cache, and how many concurrent
+    analyses of the same company were coalesced into one
+    """
+    return {**services.analysis_cache.stats(), 'single_flight': services.analysis_flights.stats()}
+
+@router.post("/analyze/batch")
+async def analyze_companies_batch(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Analyze ESG risk for many companies, streaming one NDJSON line per company as it finishes
+    """
+    # Drop names that normalize to the same company while keeping the requested order
+    unique_companies = {}
+    for name in request.companies:
+        name_key = normalize_company_name(name)
+        if name_key:
+            unique_companies.setdefault(name_key, name.strip())
+    companies = list(unique_companies.values())
+    if not companies:
+        raise HTTPException(status_code=422, detail="No company names provided")
+
+    return StreamingResponse(
+        _stream_batch_analysis(companies, request.limit, db),
+        media_type="application/x-ndjson"
+    )
+
+async def _stream_batch_analysis(companies: List[str], limit: int, db: AsyncSession):
+    """Fetch news concurrently, then score and persist companies chunk by chunk"""
+    semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+
+    async def fetch(company: str):
+        async with semaphore:
+            try:
+                articles = await services.news_service.fetch_company_news(company, limit)
+                return company, articles, None
+            except Exception as e:
+                return company, [], str(e)
+
+    pending = [asyncio.create_task(fetch(company)) for company in companies]
+    fetched = []
+
+    try:
+        for next_fetch in asyncio.as_completed(pending):
+            company, articles, error = await next_fetch
+            if error:
+                yield json.dumps({'company': company, 'error': f"News fetch failed: {error}"}) + "\n"
+            else:
+                fetched.append((company, articles))
+
+            if len(fetched) >= BATCH_CHUNK_SIZE:
+                for line in await _score_and_persist_chunk(fetched, db):
+                    yield line
+                fetched = []
+    finally:
+        # A disconnected client leaves no fetches running for companies nobody will read
+        for task in pending:
+            task.cancel()
+
+    if fetched:
+        for line in await _score_and_persist_chunk(fetched, db):
+            yield line
+
+async def _score_and_persist_chunk(fetched: List[tuple], db: AsyncSession) -> List[str]:
+    """
+    Run NLP over every new article in the chunk at once and store it in one transaction. Companies
+    another request is already analyzing share that analysis instead.
+    """
+    name_keys = [normalize_company_name(company) for company, _ in fetched]
+
+    async def analyze(led_keys: List[str]) -> dict:
+        led = [item for item, name_key in zip(fetched, name_keys) if name_key in led_keys]
+        try:
+            chunk = await _find_companies(db, led)
+
+            # Batches queue for an NLP slot, behind at most NLP_MAX_WAITING other waiting calls
+            analyzed = await _analyze_articles(db, chunk, wait=True)
+
+            responses = await _persist_chunk_analyses(db, led, analyzed)
+        except Exception:
+            await db.rollback()
+            raise
+        return {normalize_company_name(company): response for (company, _), response in zip(led, responses)}
+
+    outcomes = await services.analysis_flights.run_many(name_keys, analyze)
+    lines = []
+    for (company, _), name_key in zip(fetched, name_keys):
+        outcome = outcomes[name_key]
+        if isinstance(outcome, Exception):
+            lines.append(json.dumps({'company': company, 'error': f"Analysis failed: {str(outcome)}"}) + "\n")
+        else:
+            lines.append(outcome.model_dump_json() + "\n")
+    return lines
+
+async def _find_companies(db: AsyncSession, fetched: List[tuple]) -> List[Tuple[Company, List[dict]]]:
+    """Look up all of a chunk's existing companies in a single query, with new ones for the missing ones"""
+    name_keys = [normalize_company_name(company) for company, _ in fetched]
+    db_companies = {
+        c.name_key: c for c in (await db.execute(
+            select(Company).where(Company.name_key.in_(name_keys))
+        )).scalars()
+    }
+
+    return [
+        (db_companies.get(name_key) or Company(name=company), news_articles)
+        for (company, news_articles), name_key in zip(fetched, name_keys)
+    ]
+
+async def _persist_chunk_analyses(db: AsyncSession, fetched: List[tuple], analyzed: list) -> List[CompanyAnalysisResponse]:
+    """Add every company's analysis in the chunk to a write session and commit them together"""
+    def write(session: Session) -> List[CompanyAnalysisResponse]:
+        return [
+            _add_company_analysis(session, _company_for_write(session, company, None), company, news_articles, analyses)
+            for (company, _), (news_articles, analyses) in zip(fetched, analyzed)
+        ]
+
+    return await run_async_write(db, write)
+
+@router.get("/nlp/stats")
+async def get_nlp_stats():
+    """
+    Configuration and load of the NLP worker pool
+    """
+    return services.nlp_executor.stats()
+
+# Columns of a /companies row
+COMPANY_COLUMNS = {
+    'id': CompanyLatestScore.company_id,
+    'name': Company.name,
+    'sector': CompanyLatestScore.sector,
+    'overall_score': CompanyLatestScore.overall_score,
+    'environmental_score': CompanyLatestScore.environmental_score,
+    'social_score': CompanyLatestScore.social_score,
+    'governance_score': CompanyLatestScore.governance_score,
+    'overall_percentile': CompanyLatestScore.overall_percentile,
+    'environmental_percentile': CompanyLatestScore.environmental_percentile,
+    'social_percentile': CompanyLatestScore.social_percentile,
+    'governance_percentile': CompanyLatestScore.governance_percentile,
+    'last_analyzed': CompanyLatestScore.calculated_at,
+    'total_articles': CompanyLatestScore.total_articles
+}
+
+def companies_query(sort_by: str, order: str, sector: Optional[str], limit: Optional[int], offset: int):
+    """
+    One /companies page. Latest scores are materialized on write, so a page sorted by a score is a range
+    scan of its (score, company_id) index; the company_id tiebreaker follows the sort direction so the
+    index order satisfies the whole ORDER BY.
+    """
+    query = select(*[column.label(name) for name, column in COMPANY_COLUMNS.items()]).join(
+        Company, Company.id == CompanyLatestScore.company_id
+    )
+    if sector is not None:
+        query = query.where(CompanyLatestScore.sector == sector)
+
+    sort_column = COMPANY_COLUMNS[sort_by]
+    if order == 'desc':
+        query = query.order_by(sort_column.desc(), CompanyLatestScore.company_id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), CompanyLatestScore.company_id.asc())
+    query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
 @router.get("/companies", response_model=List[dict])
-async def get_companies(db: Session = Depends(get_db)):
+async def get_companies(
+    request: Request,
+    response: Response,
+    sort_by: str = Query("id", description="Field to sort by"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort direction"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of companies to return"),
+    offset: int = Query(0, ge=0, description="Number of companies to skip"),
+    sector: Optional[str] = Query(None, description="Only companies in this sector"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Get all analyzed companies with their latest risk scores
+    Get all analyzed companies with their latest risk scores and percentile ranks
     """
+    if sort_by not in COMPANY_SORT_FIELDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"sort_by must be one of: {', '.join(COMPANY_SORT_FIELDS)}"
+        )
+
     try:
-        companies = db.query(Company).all()
-        result = []
-        
-        for company in companies:
-            # Get latest risk score
-            latest_risk_score = db.query(RiskScore).filter(
-                RiskScore.company_id == company.id
-            ).order_by(RiskScore.calculated_at.desc()).first()
-            
-            if latest_risk_score:
-                result.append({
-                    'id': company.id,
-                    'name': company.name,
-                    'overall_score': latest_risk_score.overall_score,
-                    'environmental_score': latest_risk_score.environmental_score,
-                    'social_score': latest_risk_score.social_score,
-                    'governance_score': latest_risk_score.governance_score,
-                    'last_analyzed': latest_risk_score.calculated_at,
-                    'total_articles': len(company.articles)
-                })
-        
-        return result
+        # Every change to the listed data moves the leaderboard version, so an unchanged list is a 304
+        version, company_count = (await db.execute(
+            select(LeaderboardVersion.version, LeaderboardVersion.company_count)
+        )).first() or (0, 0)
+        etag = make_etag('companies', version)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        set_etag(response, etag)
+        
+        total = company_count
+        if sector is not None:
+            total = (await db.execute(
+                select(func.count(CompanyLatestScore.company_id)).where(CompanyLatestScore.sector == sector)
+            )).scalar()
+        response.headers['X-Total-Count'] = str(total)
+
+        query = companies_query(sort_by, order, sector, limit, offset)
+        return [dict(row._mapping) for row in await db.execute(query)]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch companies: {str(e)}")
 
-@router.get("/companies/{company_id}/details", response_model=CompanyAnalysisResponse)
-async def get_company_details(company_id: int, db: Session = Depends(get_db)):
+def articles_query(company_id: int, after: Optional[Tuple[Optional[datetime], int]], limit: int):
+    """
+    One page of a company's articles with their events, newest first, after a cursor's (published_at, id)
+    position. Articles without a publication date follow the dated ones, so the page is still a range scan
+    of the (company_id, published_at) index.
+    """
+    query = select(Article).where(Article.company_id == company_id).options(selectinload(Article.events))
+    if after is not None:
+        published_at, article_id = after
+        if published_at is None:
+            query = query.where(Article.published_at.is_(None), Article.id < article_id)
+        else:
+            query = query.where(or_(
+                Article.published_at < published_at,
+                and_(Article.published_at == published_at, Article.id < article_id),
+                Article.published_at.is_(None)
+            ))
+    return query.order_by(Article.published_at.desc().nulls_last(), Article.id.desc()).limit(limit)
+
+@router.get("/companies/{company_id}/details", response_model=CompanyDetailsResponse)
+async def get_company_details(
+    request: Request,
+    response: Response,
+    company_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of articles to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_content: bool = Query(True, description="Include full article bodies"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Get detailed analysis for a specific company
+    Get detailed analysis for a specific company, with articles paginated newest first
     """
     try:
-        company = db.query(Company).filter(Company.id == company_id).first()
+        # The company's latest score and article count identify this version of its details
+        watermark = (await db.execute(
+            select(CompanyLatestScore.risk_score_id, CompanyLatestScore.total_articles)
+            .where(CompanyLatestScore.company_id == company_id)
+        )).first()
+        if watermark is not None:
+            etag = make_etag('company', company_id, *watermark)
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+            set_etag(response, etag)
+        
+        company = await db.get(Company, company_id)
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
         
         # Get latest risk score
-        latest_risk_score = db.query(RiskScore).filter(
-            RiskScore.company_id == company.id
-        ).order_by(RiskScore.calculated_at.desc()).first()
+        latest_risk_score = (await db.execute(
+            select(RiskScore).where(RiskScore.company_id == company.id)
+            .order_by(RiskScore.calculated_at.desc(), RiskScore.id.desc()).limit(1)
+        )).scalars().first()
         
         if not latest_risk_score:
             raise HTTPException(status_code=404, detail="No analysis found for this company")
         
-        # Get articles and events
-        articles = db.query(Article).filter(Article.company_id == company.id).all()
+        total_articles = (await db.execute(
+            select(func.count(Article.id)).where(Article.company_id == company.id)
+        )).scalar()
+        
+        # Load one page of articles and all of their events in two queries
+        query = articles_query(company.id, _decode_article_cursor(cursor) if cursor else None, limit + 1)
+        if not include_content:
+            query = query.options(defer(Article.content))
+        articles = (await db.execute(query)).scalars().all()
+        
+        next_cursor = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            next_cursor = _encode_article_cursor(articles[-1])
+        
         processed_articles = []
         all_events = []
         
         for article in articles:
-            events = db.query(ESGEvent).filter(ESGEvent.article_id == article.id).all()
             event_responses = [
                 ESGEventResponse(
                     event_type=event.event_type,
                     description=event.description,
                     severity=event.severity
-                ) for event in events
+                ) for event in article.events
             ]
             
             article_response = ArticleResponse(
                 title=article.title,
-                content=article.content,
+                content=article.content if include_content else None,
                 url=article.url,
                 published_at=article.published_at,
                 sentiment_score=article.sentiment_score,
@@ -189,7 +788,7 @@ async def get_company_details(company_id: int, db: Session = Depends(get_db)):
             processed_articles.append(article_response)
             all_events.extend(event_responses)
         
-        response = CompanyAnalysisResponse(
+        response = CompanyDetailsResponse(
             company=company.name,
             score=latest_risk_score.overall_score,
             risk_breakdown=RiskScoreResponse(
@@ -200,8 +799,9 @@ async def get_company_details(company_id: int, db: Session = Depends(get_db)):
             ),
             events=all_events,
             articles=processed_articles,
-            total_articles=len(processed_articles),
-            analyzed_at=latest_risk_score.calculated_at
+            total_articles=total_articles,
+            analyzed_at=latest_risk_score.calculated_at,
+            next_cursor=next_cursor
         )
         
         return response
@@ -210,3 +810,48 @@ async def get_company_details(company_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch company details: {str(e)}")
+
+@router.get("/companies/{company_id}/history", response_model=ScoreHistoryResponse)
+async def get_company_history(
+    company_id: int,
+    resolution: str = Query("day", pattern=f"^({'|'.join(HISTORY_RESOLUTIONS)})$", description="raw, day, week or month"),
+    since: Optional[datetime] = Query(None, description="Only points at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only points before this time"),
+    limit: int = Query(365, ge=1, le=5000, description="Maximum number of points, the most recent ones"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Risk score history of a company, oldest point first: min, max, mean and last of each score per
+    day, week or month from the rollups, or the raw scores still within the retention window
+    """
+    try:
+        company = await db.get(Company, company_id)
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+        
+        rows = (await db.execute(history_query(company_id, resolution, since, until, limit))).all()
+        return ScoreHistoryResponse(
+            company_id=company_id,
+            company=company.name,
+            resolution=resolution,
+            points=[history_point(row) for row in reversed(rows)]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch company history: {str(e)}")
+
+def _encode_article_cursor(article: Article) -> str:
+    """Encode an article's (published_at, id) position as an opaque cursor; an undated article's date is empty"""
+    published_at = article.published_at.isoformat() if article.published_at is not None else ''
+    position = f"{published_at}|{article.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def _decode_article_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor produced by _encode_article_cursor"""
+    try:
+        published_at, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(published_at) if published_at else None, int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
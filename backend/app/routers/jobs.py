@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import AsyncSessionLocal, get_read_db, normalize_company_name
+from app.models import CompanyAnalysisResponse, JobProgressResponse, JobRequest, JobResponse
+from app.routers.analyze import run_company_analysis
+from app.services.job_queue import JOB_STATUSES
+from app.services.registry import services
+
+router = APIRouter()
+
+async def run_job_analysis(company: str, sector: Optional[str]) -> CompanyAnalysisResponse:
+    """Analyze one company of a job in its own session, queueing for an NLP slot if the pool is busy"""
+    async with AsyncSessionLocal() as db:
+        try:
+            return await run_company_analysis(db, company, sector, wait=True)
+        except Exception:
+            await db.rollback()
+            raise
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    request: JobRequest,
+    response: Response
+):
+    """
+    Queue an analysis of one or more companies, returning the job to poll for progress
+    """
+    # Drop names that normalize to the same company while keeping the requested order
+    unique_companies = {}
+    for name in request.companies:
+        name_key = normalize_company_name(name)
+        if name_key:
+            unique_companies.setdefault(name_key, name.strip())
+    if not unique_companies:
+        raise HTTPException(status_code=422, detail="No company names provided")
+
+    job_queue = services.job_queue
+    try:
+        job = await run_in_threadpool(job_queue.enqueue, list(unique_companies.values()), request.sector)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue job: {str(e)}")
+
+    job_queue.notify()
+    response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return job
+
+@router.get("/jobs", response_model=List[JobProgressResponse])
+async def list_jobs(
+    status: Optional[str] = Query(None, description="Only jobs with this status"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of jobs to return"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Most recent jobs first, with their progress
+    """
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=422, detail=f"status must be one of: {', '.join(JOB_STATUSES)}")
+    return await run_in_threadpool(services.job_queue.list_jobs, db, status, limit)
+
+@router.get("/jobs/stats")
+async def get_job_stats(db: Session = Depends(get_read_db)):
+    """
+    Job counts by status and the state of this process's workers and scheduler
+    """
+    return await run_in_threadpool(services.job_queue.stats, db)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: Session = Depends(get_read_db)):
+    """
+    Status, progress and per-company results of a job
+    """
+    job = await run_in_threadpool(services.job_queue.get, db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/progress", response_model=JobProgressResponse)
+async def get_job_progress(job_id: int, db: Session = Depends(get_read_db)):
+    """
+    Status and progress of a job, without its results
+    """
+    job = await run_in_threadpool(services.job_queue.get, db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+
+from app.database import get_read_db
+from app.models import SearchResponse, SearchResult
+from app.services.search_service import SearchService
+
+router = APIRouter()
+search_service = SearchService()
+
+# A plain def runs in the threadpool, so the sync FTS query never blocks the event loop
+@router.get("/search", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, description='Search terms; wrap phrases in quotes, e.g. "oil spill"'),
+    kind: Optional[str] = Query(None, pattern="^(article|event)$", description="Only return articles or events"),
+    category: Optional[str] = Query(None, pattern="^(environmental|social|governance)$", description="ESG event category"),
+    company_id: Optional[int] = Query(None, description="Only return results for this company"),
+    since: Optional[datetime] = Query(None, description="Only articles published at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only articles published before this time"),
+    days: Optional[int] = Query(None, ge=1, description="Only articles published in the last N days"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over article titles and bodies and ESG event descriptions, ranked by relevance
+    """
+    if not search_service.is_available(db):
+        raise HTTPException(status_code=501, detail="Full-text search requires the SQLite FTS5 index")
+
+    if not search_service.build_match_query(q):
+        raise HTTPException(status_code=422, detail="Search query has no terms")
+
+    if days is not None:
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        since = max(since, cutoff) if since else cutoff
+
+    try:
+        rows = search_service.search(
+            db, q, kind=kind, category=category, company_id=company_id,
+            since=since, until=until, limit=limit, offset=offset
+        )
+
+        return SearchResponse(
+            query=q,
+            results=[SearchResult(**row) for row in rows[:limit]],
+            limit=limit,
+            offset=offset,
+            has_more=len(rows) > limit
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
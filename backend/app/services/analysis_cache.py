@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.database import normalize_company_name
+from app.models import CompanyAnalysisResponse
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(ABC):
+    """A shared cache that several API workers can read and write (values are JSON strings)"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        pass
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local stand-in for a shared backend, useful for development and benchmarks"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed shared cache (requires the optional redis package)"""
+
+    def __init__(self, url: str, prefix: str = "esg:analysis:", timeout: float = 1.0):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("ANALYSIS_CACHE_URL is set but the redis package is not installed. Install with: pip install redis")
+
+        # Without timeouts an unreachable server would hold a worker thread indefinitely
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+def backend_from_url(url: Optional[str], timeout: float = 1.0) -> Optional[CacheBackend]:
+    """Build the shared backend named by ANALYSIS_CACHE_URL, if any"""
+    if not url:
+        return None
+    if url == "memory://":
+        return InMemoryCacheBackend()
+    return RedisCacheBackend(url, timeout=timeout)
+
+def article_set_fingerprint(articles: List[Dict]) -> str:
+    """Hash a set of fetched articles independently of the order they were returned in"""
+    article_hashes = sorted(
+        hashlib.sha256(json.dumps(
+            [article.get('url'), article.get('title'), article.get('content'), str(article.get('published_at'))]
+        ).encode()).hexdigest()
+        for article in articles
+    )
+    return hashlib.sha256(''.join(article_hashes).encode()).hexdigest()
+
+class AnalysisCache:
+    """Bounded LRU cache of analysis results with a TTL, optionally backed by a shared cache"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, backend: Optional[CacheBackend] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+
+        self._entries = OrderedDict()  # key -> (expires_at, response), least recently used first
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.backend_errors = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def make_key(self, company: str, articles: List[Dict]) -> str:
+        """Key results by the normalized company name and the exact set of fetched articles"""
+        return f"{normalize_company_name(company)}:{article_set_fingerprint(articles)}"
+
+    def get(self, key: str) -> Optional[CompanyAnalysisResponse]:
+        if not self.enabled:
+            return None
+
+        response = self._get_local(key)
+        if response is not None:
+            return response
+        return self._backend_lookup(key, self._get_from_backend(key))
+
+    def set(self, key: str, response: CompanyAnalysisResponse):
+        if not self.enabled:
+            return
+
+        self._store_local(key, response)
+        self._set_in_backend(key, response)
+
+    async def aget(self, key: str) -> Optional[CompanyAnalysisResponse]:
+        """get for the event loop: local hits are answered inline, shared backend lookups run in a thread"""
+        if not self.enabled:
+            return None
+
+        response = self._get_local(key)
+        if response is not None:
+            return response
+        backend_response = await asyncio.to_thread(self._get_from_backend, key) if self.backend is not None else None
+        return self._backend_lookup(key, backend_response)
+
+    async def aset(self, key: str, response: CompanyAnalysisResponse):
+        """set for the event loop: the shared backend write runs in a thread"""
+        if not self.enabled:
+            return
+
+        self._store_local(key, response)
+        if self.backend is not None:
+            await asyncio.to_thread(self._set_in_backend, key, response)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'backend_hits': self.backend_hits,
+                'backend_errors': self.backend_errors,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'shared_backend': type(self.backend).__name__ if self.backend else None
+            }
+
+    def _get_local(self, key: str) -> Optional[CompanyAnalysisResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+                self.expirations += 1
+        return None
+
+    def _backend_lookup(self, key: str, response: Optional[CompanyAnalysisResponse]) -> Optional[CompanyAnalysisResponse]:
+        """Count a lookup the local cache missed, keeping a shared backend hit locally"""
+        with self._lock:
+            if response is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.backend_hits += 1
+
+        self._store_local(key, response)
+        return response
+
+    def _store_local(self, key: str, response: CompanyAnalysisResponse):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_from_backend(self, key: str) -> Optional[CompanyAnalysisResponse]:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+            return CompanyAnalysisResponse.model_validate_json(value) if value is not None else None
+        except Exception as e:
+            self._backend_failed(e)
+            return None
+
+    def _set_in_backend(self, key: str, response: CompanyAnalysisResponse):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, response.model_dump_json(), self.ttl)
+        except Exception as e:
+            self._backend_failed(e)
+
+    def _backend_failed(self, error: Exception):
+        # A broken shared cache degrades to local caching rather than failing requests
+        logger.warning("Analysis cache backend error: %s", error)
+        with self._lock:
+            self.backend_errors += 1
+
+def cache_from_env() -> AnalysisCache:
+    """Create the analysis cache from ANALYSIS_CACHE_* environment variables"""
+    return AnalysisCache(
+        maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("ANALYSIS_CACHE_TTL", "300")),
+        backend=backend_from_url(os.getenv("ANALYSIS_CACHE_URL"), timeout=float(os.getenv("ANALYSIS_CACHE_TIMEOUT", "1")))
+    )
@@ -0,0 +1,224 @@
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+
+from app.database import Article, ESGEvent, CompanyScoreState
+from app.services.risk_engine import RISK_CATEGORIES, category_codes
+
+SECONDS_PER_DAY = 86400.0
+
+# RISK_SCORING modes: score only the articles fetched by each analysis, or report the decayed aggregates
+SCORING_MODES = ('window', 'decayed')
+
+class DecayedRiskScorer:
+    """
+    Maintains exponentially time-decayed risk aggregates per company. Each article is weighted by
+    0.5 ** (age / half_life) relative to the newest article seen, so adding one is O(1).
+    """
+
+    def __init__(self, half_life_days: float = 30.0, mode: str = 'window'):
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown RISK_SCORING '{mode}', expected one of: {', '.join(SCORING_MODES)}")
+        self.half_life_days = half_life_days
+        self.mode = mode
+
+    def new_state(self, company) -> CompanyScoreState:
+        return CompanyScoreState(
+            company=company,
+            sentiment_weight=0.0,
+            sentiment_sum=0.0,
+            event_weight=0.0,
+            severity_sum=0.0,
+            overall_score=0.0,
+            environmental_score=0.0,
+            social_score=0.0,
+            governance_score=0.0,
+            article_count=0
+        )
+
+    def add_article(
+        self,
+        state: CompanyScoreState,
+        published_at: Optional[datetime],
+        sentiment_score: Optional[float],
+        events: Iterable[Tuple[str, float]]
+    ):
+        """Fold one article and its (event_type, severity) events into the company's aggregates"""
+        published_at = as_utc(published_at) if published_at else datetime.utcnow()
+
+        # A newer article moves the reference time forward and decays everything seen so far
+        if state.reference_at is None:
+            state.reference_at = published_at
+        elif published_at > state.reference_at:
+            decay = self._decay(published_at, state.reference_at)
+            state.sentiment_weight *= decay
+            state.sentiment_sum *= decay
+            state.event_weight *= decay
+            state.severity_sum *= decay
+            for category in RISK_CATEGORIES:
+                setattr(state, f"{category}_score", getattr(state, f"{category}_score") * decay)
+            state.reference_at = published_at
+
+        weight = self._decay(state.reference_at, published_at)
+        state.sentiment_weight += weight
+        state.sentiment_sum += weight * (sentiment_score or 0.0)
+
+        for event_type, severity in events:
+            state.event_weight += weight
+            state.severity_sum += weight * severity
+            category = event_type.split('_')[0]
+            if category in RISK_CATEGORIES:
+                column = f"{category}_score"
+                setattr(state, column, max(getattr(state, column), weight * severity))
+
+        state.article_count += 1
+        state.overall_score = overall_score(
+            state.sentiment_weight, state.sentiment_sum, state.event_weight, state.severity_sum
+        )
+        state.updated_at = datetime.utcnow()
+
+    def scores(self, state: CompanyScoreState) -> Dict[str, float]:
+        """The state's scores in the shape calculate_risk_scores returns"""
+        return {
+            'overall_score': state.overall_score,
+            'environmental_score': state.environmental_score,
+            'social_score': state.social_score,
+            'governance_score': state.governance_score
+        }
+
+    def rebuild(self, conn: Connection) -> List[Dict]:
+        """
+        Recompute every company's aggregates from stored articles and events in one vectorized pass,
+        returning company_score_state rows
+        """
+        articles = conn.execute(
+            select(Article.company_id, Article.published_at, Article.created_at, Article.sentiment_score)
+            .where(Article.company_id.isnot(None))
+            .order_by(Article.company_id, Article.id)
+        ).fetchall()
+        if not articles:
+            return []
+        events = conn.execute(
+            select(Article.company_id, Article.published_at, Article.created_at, ESGEvent.event_type, ESGEvent.severity)
+            .join(ESGEvent, ESGEvent.article_id == Article.id)
+            .where(Article.company_id.isnot(None))
+            .order_by(Article.company_id, Article.id, ESGEvent.id)
+        ).fetchall()
+
+        company_ids, article_company = np.unique(np.array([row[0] for row in articles], dtype=np.int64), return_inverse=True)
+        article_times = [as_utc(row[1] or row[2]) for row in articles]
+        article_days = _days(article_times)
+        article_sentiment = np.array([row[3] or 0.0 for row in articles], dtype=np.float64)
+
+        # Each company's aggregates are decayed to its newest article
+        reference_at = {}
+        for company_index, published_at in zip(article_company.tolist(), article_times):
+            if company_index not in reference_at or published_at > reference_at[company_index]:
+                reference_at[company_index] = published_at
+        reference_days = np.full(len(company_ids), -np.inf)
+        np.maximum.at(reference_days, article_company, article_days)
+        article_weight = 0.5 ** ((reference_days[article_company] - article_days) / self.half_life_days)
+
+        sentiment_weight = np.bincount(article_company, weights=article_weight, minlength=len(company_ids))
+        sentiment_sum = np.bincount(article_company, weights=article_weight * article_sentiment, minlength=len(company_ids))
+
+        event_company = np.searchsorted(company_ids, np.array([row[0] for row in events], dtype=np.int64))
+        event_weight = 0.5 ** ((reference_days[event_company] - _days([as_utc(row[1] or row[2]) for row in events])) / self.half_life_days)
+        weighted_severity = event_weight * np.array([row[4] for row in events], dtype=np.float64)
+        event_category = category_codes(row[3] for row in events)
+
+        event_weight_sum = np.bincount(event_company, weights=event_weight, minlength=len(company_ids))
+        severity_sum = np.bincount(event_company, weights=weighted_severity, minlength=len(company_ids))
+        peaks = np.zeros((len(company_ids), len(RISK_CATEGORIES)))
+        known = event_category >= 0
+        np.maximum.at(peaks, (event_company[known], event_category[known]), weighted_severity[known])
+
+        article_counts = np.bincount(article_company, minlength=len(company_ids))
+        updated_at = datetime.utcnow()
+
+        return [
+            {
+                'company_id': int(company_id),
+                'reference_at': reference_at[i],
+                'sentiment_weight': float(sentiment_weight[i]),
+                'sentiment_sum': float(sentiment_sum[i]),
+                'event_weight': float(event_weight_sum[i]),
+                'severity_sum': float(severity_sum[i]),
+                'overall_score': overall_score(sentiment_weight[i], sentiment_sum[i], event_weight_sum[i], severity_sum[i]),
+                'environmental_score': float(peaks[i, 0]),
+                'social_score': float(peaks[i, 1]),
+                'governance_score': float(peaks[i, 2]),
+                'article_count': int(article_counts[i]),
+                'updated_at': updated_at
+            }
+            for i, company_id in enumerate(company_ids)
+        ]
+
+    def _decay(self, later: datetime, earlier: datetime) -> float:
+        return 0.5 ** ((later - earlier).total_seconds() / SECONDS_PER_DAY / self.half_life_days)
+
+def overall_score(sentiment_weight: float, sentiment_sum: float, event_weight: float, severity_sum: float) -> float:
+    """The calculate_risk_scores weighting applied to decayed means"""
+    if not sentiment_weight:
+        return 0.0
+    sentiment_risk = (1 - sentiment_sum / sentiment_weight) / 2
+    event_risk = severity_sum / event_weight if event_weight else 0.0
+    return float(min(1.0, (sentiment_risk * 0.4) + (event_risk * 0.6)))
+
+def rebuild_score_states(conn: Connection, scorer: DecayedRiskScorer) -> int:
+    """Replace every company's stored aggregates with ones rebuilt from its articles"""
+    rows = scorer.rebuild(conn)
+    conn.execute(delete(CompanyScoreState))
+    if rows:
+        conn.execute(insert(CompanyScoreState), rows)
+    return len(rows)
+
+def verify_score_states(conn: Connection, scorer: DecayedRiskScorer, tolerance: float = 1e-9) -> Dict:
+    """Compare the incrementally maintained aggregates with ones rebuilt from stored articles"""
+    stored = {row.company_id: row for row in conn.execute(select(CompanyScoreState)).fetchall()}
+    rebuilt = scorer.rebuild(conn)
+    compared = ('overall_score', 'environmental_score', 'social_score', 'governance_score', 'article_count')
+
+    mismatched = []
+    max_difference = 0.0
+    for row in rebuilt:
+        state = stored.pop(row['company_id'], None)
+        if state is None:
+            mismatched.append(row['company_id'])
+            continue
+        difference = max(abs(getattr(state, column) - row[column]) for column in compared)
+        max_difference = max(max_difference, difference)
+        if difference > tolerance:
+            mismatched.append(row['company_id'])
+
+    return {
+        'companies': len(rebuilt),
+        'mismatched': sorted(mismatched + list(stored)),
+        'max_difference': max_difference
+    }
+
+def as_utc(timestamp: datetime) -> datetime:
+    """
+    A timestamp as naive UTC, the convention of every stored time. Aware values are converted, so
+    decay ages never mix UTC with the server's local time.
+    """
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _days(timestamps: List[datetime]) -> np.ndarray:
+    """Naive UTC datetimes as fractional days since the epoch"""
+    return np.array(
+        [(timestamp - datetime(1970, 1, 1)).total_seconds() / SECONDS_PER_DAY for timestamp in timestamps],
+        dtype=np.float64
+    )
+
+def scorer_from_env() -> DecayedRiskScorer:
+    """Create the decayed scorer from RISK_* environment variables"""
+    return DecayedRiskScorer(
+        half_life_days=float(os.getenv("RISK_HALF_LIFE_DAYS", "30")),
+        mode=os.getenv("RISK_SCORING") or 'window'
+    )
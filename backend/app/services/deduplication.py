@@ -0,0 +1,72 @@
+import hashlib
+from typing import Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'cmpid'}
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so the same article is recognized however it was linked"""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMETERS
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit((parts.scheme.lower() or 'https', host, path, urlencode(query), ''))
+
+def content_hash(title: str, content: str) -> str:
+    """Hash an article's text, ignoring whitespace differences"""
+    normalized = ' '.join((title or '').split()) + '\n' + ' '.join((content or '').split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+def article_identity(article: Dict) -> Tuple[str, str]:
+    """The (canonical_url, content_hash) pair that identifies an article for a company"""
+    return canonicalize_url(article.get('url')), content_hash(article.get('title'), article.get('content'))
+
+def backfill_article_identities(conn: Connection, batch_size: int = 1000) -> int:
+    """Compute canonical_url and content_hash for articles stored before they existed"""
+    updated = 0
+    while True:
+        rows = conn.execute(
+            text("SELECT id, url, title, content FROM articles WHERE content_hash IS NULL LIMIT :limit"),
+            {'limit': batch_size}
+        ).fetchall()
+        if not rows:
+            return updated
+
+        conn.execute(
+            text("UPDATE articles SET canonical_url = :canonical_url, content_hash = :content_hash WHERE id = :id"),
+            [
+                {
+                    'id': row.id,
+                    'canonical_url': canonicalize_url(row.url),
+                    'content_hash': content_hash(row.title, row.content)
+                } for row in rows
+            ]
+        )
+        updated += len(rows)
+
+def compact_duplicate_articles(conn: Connection) -> Dict[str, int]:
+    """Keep the oldest copy of every (company, canonical URL, content hash) and delete the rest with their events"""
+    backfilled = backfill_article_identities(conn)
+
+    duplicates = (
+        "SELECT id FROM articles WHERE id NOT IN ("
+        "SELECT MIN(id) FROM articles GROUP BY company_id, canonical_url, content_hash)"
+    )
+    events_deleted = conn.execute(text(f"DELETE FROM esg_events WHERE article_id IN ({duplicates})")).rowcount
+    articles_deleted = conn.execute(text(f"DELETE FROM articles WHERE id IN ({duplicates})")).rowcount
+
+    return {
+        'articles_backfilled': backfilled,
+        'articles_deleted': articles_deleted,
+        'events_deleted': events_deleted
+    }
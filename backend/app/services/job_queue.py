@@ -0,0 +1,352 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, run_write, AnalysisJob, Company, CompanyLatestScore
+from app.services.leaderboard import percentile_refresh
+from app.services.score_history import retention_from_env
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed')
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Called by workers for each company in a job: (company, sector) -> CompanyAnalysisResponse
+AnalyzeCompany = Callable[[str, Optional[str]], Awaitable]
+
+class JobQueue:
+    """
+    Analysis jobs persisted in the analysis_jobs table. Workers in this process claim queued jobs
+    with a conditional update, so several API processes can share one database, and record
+    progress after each company, renewing the job's lease while it runs. A scheduler periodically
+    enqueues companies whose latest score is older than stale_after_hours, requeues running jobs
+    whose lease was not renewed for lease_seconds and runs prune_history, the risk score history
+    retention. Every percentile_interval seconds, even without workers, refresh_percentiles
+    re-ranks the leaderboard if it changed.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        stale_after_hours: float = 24.0,
+        schedule_interval: float = 3600.0,
+        schedule_limit: int = 100,
+        batch_size: int = 10,
+        lease_seconds: float = 600.0,
+        session_factory=SessionLocal,
+        prune_history: Optional[Callable[[], Dict[str, int]]] = None,
+        refresh_percentiles: Optional[Callable[[], bool]] = None,
+        percentile_interval: float = 60.0
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after_hours = stale_after_hours
+        self.schedule_interval = schedule_interval
+        self.schedule_limit = schedule_limit
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self.prune_history = prune_history
+        self.refresh_percentiles = refresh_percentiles
+        self.percentile_interval = percentile_interval
+
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._running: Dict[int, int] = {}  # Worker number -> id of the job it is running
+        self.jobs_finished = 0
+        self.scheduled = 0
+        self.history_pruned = 0
+        self.percentile_refreshes = 0
+
+    # Queue operations, run in a worker thread; writes go through run_write
+
+    def enqueue(self, companies: List[str], sector: Optional[str] = None, source: str = 'api') -> Dict:
+        """Queue a job in its own write transaction, returning it as get() does"""
+        def add(db: Session) -> Dict:
+            job = self._add_job(db, companies, sector, source)
+            db.flush()
+            return _job_dict(job)
+
+        return run_write(add, self.session_factory)
+
+    def _add_job(self, db: Session, companies: List[str], sector: Optional[str], source: str) -> AnalysisJob:
+        job = AnalysisJob(
+            status='queued',
+            source=source,
+            companies=json.dumps(companies),
+            sector=sector,
+            total=len(companies),
+            results='[]'
+        )
+        db.add(job)
+        return job
+
+    def claim(self) -> Optional[Dict]:
+        """Mark the oldest queued job running and return it, or None if there is nothing to do"""
+        def claim_next(db: Session) -> Optional[Dict]:
+            while True:
+                job_id = db.execute(
+                    select(AnalysisJob.id).where(AnalysisJob.status == 'queued').order_by(AnalysisJob.id).limit(1)
+                ).scalar()
+                if job_id is None:
+                    return None
+
+                now = datetime.utcnow()
+                claimed = db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == job_id, AnalysisJob.status == 'queued')
+                    .values(status='running', started_at=now, heartbeat_at=now, attempts=AnalysisJob.attempts + 1)
+                ).rowcount
+
+                # Another process took it first; try the next one
+                if claimed:
+                    job = db.get(AnalysisJob, job_id)
+                    return {'id': job.id, 'companies': json.loads(job.companies), 'sector': job.sector}
+
+        return run_write(claim_next, self.session_factory)
+
+    def record_result(self, job_id: int, result: Dict):
+        def record(db: Session):
+            job = db.get(AnalysisJob, job_id)
+            if 'error' in result:
+                job.failed += 1
+            else:
+                job.completed += 1
+            job.results = json.dumps(json.loads(job.results or '[]') + [result])
+            job.heartbeat_at = datetime.utcnow()
+
+        run_write(record, self.session_factory)
+
+    def heartbeat(self, job_id: int):
+        """Renew a running job's lease while its worker is busy with a company"""
+        run_write(lambda db: db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.status == 'running')
+            .values(heartbeat_at=datetime.utcnow())
+        ), self.session_factory)
+
+    def finish(self, job_id: int, error: Optional[str] = None):
+        def finish_job(db: Session):
+            job = db.get(AnalysisJob, job_id)
+            job.status = 'failed' if error else 'completed'
+            job.error = error
+            job.finished_at = datetime.utcnow()
+
+        run_write(finish_job, self.session_factory)
+
+    def requeue(self, job_ids: Optional[List[int]] = None, silent_since: Optional[datetime] = None) -> int:
+        """Return running jobs (these ids, or ones without a heartbeat since a time) to the queue, restarting them"""
+        query = update(AnalysisJob).where(AnalysisJob.status == 'running')
+        if job_ids is not None:
+            query = query.where(AnalysisJob.id.in_(job_ids))
+        if silent_since is not None:
+            query = query.where(AnalysisJob.heartbeat_at < silent_since)
+        query = query.values(status='queued', completed=0, failed=0, results='[]', started_at=None, heartbeat_at=None)
+        return run_write(lambda db: db.execute(query).rowcount, self.session_factory)
+
+    def enqueue_stale(self) -> int:
+        """Enqueue the companies with the oldest scores past the threshold, unless an earlier run is still pending"""
+        def enqueue_companies(db: Session) -> int:
+            pending = db.execute(select(func.count(AnalysisJob.id)).where(
+                AnalysisJob.source == 'scheduler', AnalysisJob.status.in_(ACTIVE_STATUSES)
+            )).scalar()
+            if pending:
+                return 0
+
+            cutoff = datetime.utcnow() - timedelta(hours=self.stale_after_hours)
+            companies = db.execute(
+                select(Company.name)
+                .join(CompanyLatestScore, CompanyLatestScore.company_id == Company.id)
+                .where(CompanyLatestScore.calculated_at < cutoff)
+                .order_by(CompanyLatestScore.calculated_at)
+                .limit(self.schedule_limit)
+            ).fetchall()
+
+            # Small jobs so the workers share the re-analysis
+            for start in range(0, len(companies), self.batch_size):
+                batch = companies[start:start + self.batch_size]
+                self._add_job(db, [name for name, in batch], None, 'scheduler')
+            return len(companies)
+
+        return run_write(enqueue_companies, self.session_factory)
+
+    def get(self, db: Session, job_id: int) -> Optional[Dict]:
+        job = db.get(AnalysisJob, job_id)
+        return _job_dict(job) if job is not None else None
+
+    def list_jobs(self, db: Session, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        query = select(AnalysisJob).order_by(AnalysisJob.id.desc()).limit(limit)
+        if status is not None:
+            query = query.where(AnalysisJob.status == status)
+        return [_job_dict(job) for job in db.execute(query).scalars()]
+
+    def stats(self, db: Session) -> Dict:
+        counts = dict(db.execute(select(AnalysisJob.status, func.count(AnalysisJob.id)).group_by(AnalysisJob.status)).all())
+        return {
+            'workers': self.workers,
+            'started': self._wake is not None,
+            'running_job_ids': sorted(self._running.values()),
+            'jobs': {status: counts.get(status, 0) for status in JOB_STATUSES},
+            'jobs_finished': self.jobs_finished,
+            'companies_scheduled': self.scheduled,
+            'history_rows_pruned': self.history_pruned,
+            'percentile_refreshes': self.percentile_refreshes,
+            'schedule_interval': self.schedule_interval,
+            'stale_after_hours': self.stale_after_hours
+        }
+
+    # Workers and scheduler, run on the event loop
+
+    def start(self, analyze: AnalyzeCompany):
+        """Start the percentile refresh, the workers and the scheduler on the running event loop"""
+        if self._tasks:
+            return
+        if self.refresh_percentiles is not None and self.percentile_interval > 0:
+            self._tasks.append(asyncio.create_task(self._refresh_percentiles()))
+        if self.workers <= 0:
+            return
+        self._wake = asyncio.Event()
+        self._tasks += [asyncio.create_task(self._work(worker, analyze)) for worker in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._schedule()))
+        logger.info("Started %d job workers", self.workers)
+
+    def notify(self):
+        """Wake idle workers after a job is enqueued"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self):
+        """Stop the workers, returning the jobs they were running to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+
+        if self._running:
+            await asyncio.to_thread(self.requeue, list(self._running.values()))
+            self._running.clear()
+
+    async def _work(self, worker: int, analyze: AnalyzeCompany):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.claim)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            self._running[worker] = job['id']
+            heartbeat = asyncio.create_task(self._heartbeat(job['id']))
+            try:
+                for company in job['companies']:
+                    try:
+                        response = await analyze(company, job['sector'])
+                        result = {'company': company, 'score': response.score}
+                    except Exception as e:
+                        result = {'company': company, 'error': f"Analysis failed: {str(e)}"}
+                    await asyncio.to_thread(self.record_result, job['id'], result)
+                await asyncio.to_thread(self.finish, job['id'])
+            except Exception as e:
+                logger.exception("Job %s failed", job['id'])
+                await asyncio.to_thread(self.finish, job['id'], str(e))
+            finally:
+                heartbeat.cancel()
+            del self._running[worker]
+            self.jobs_finished += 1
+
+    async def _heartbeat(self, job_id: int):
+        """Keep a job's lease alive while it runs, so only jobs of a worker that died are requeued"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.heartbeat, job_id)
+            except Exception:
+                logger.exception("Renewing the lease of job %s failed", job_id)
+
+    async def _schedule(self):
+        # Scheduling can be disabled; expired jobs are still requeued
+        interval = self.schedule_interval if self.schedule_interval > 0 else self.lease_seconds
+        while True:
+            try:
+                # Running jobs renew their lease, so only a worker that died (e.g. a crashed process)
+                # leaves its jobs silent long enough to be picked up again
+                silent_since = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+                requeued = await asyncio.to_thread(self.requeue, None, silent_since)
+                if requeued:
+                    logger.warning("Requeued %d jobs whose worker stopped renewing their lease", requeued)
+
+                scheduled = 0
+                if self.schedule_interval > 0:
+                    scheduled = await asyncio.to_thread(self.enqueue_stale)
+                    self.scheduled += scheduled
+                    if scheduled:
+                        logger.info("Scheduled re-analysis of %d stale companies", scheduled)
+                if requeued or scheduled:
+                    self.notify()
+
+                if self.prune_history is not None:
+                    pruned = await asyncio.to_thread(self.prune_history)
+                    self.history_pruned += sum(pruned.values())
+                    if any(pruned.values()):
+                        logger.info("Pruned risk score history: %d raw scores, %d daily rollups", pruned['raw'], pruned['day'])
+            except Exception:
+                logger.exception("Job scheduling failed")
+            await asyncio.sleep(interval)
+
+    async def _refresh_percentiles(self):
+        while True:
+            try:
+                if await asyncio.to_thread(self.refresh_percentiles):
+                    self.percentile_refreshes += 1
+            except Exception:
+                logger.exception("Refreshing leaderboard percentiles failed")
+            await asyncio.sleep(self.percentile_interval)
+
+def _job_dict(job: AnalysisJob) -> Dict:
+    return {
+        'id': job.id,
+        'status': job.status,
+        'source': job.source,
+        'companies': json.loads(job.companies),
+        'sector': job.sector,
+        'total': job.total,
+        'completed': job.completed,
+        'failed': job.failed,
+        'progress': (job.completed + job.failed) / job.total if job.total else 1.0,
+        'results': json.loads(job.results or '[]'),
+        'error': job.error,
+        'attempts': job.attempts,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at
+    }
+
+def job_queue_from_env() -> JobQueue:
+    """Create the job queue from JOB_* environment variables"""
+    return JobQueue(
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        poll_interval=float(os.getenv("JOB_POLL_SECONDS", "5")),
+        stale_after_hours=float(os.getenv("JOB_STALE_HOURS", "24")),
+        schedule_interval=float(os.getenv("JOB_SCHEDULE_SECONDS", "3600")),
+        schedule_limit=int(os.getenv("JOB_SCHEDULE_LIMIT", "100")),
+        batch_size=int(os.getenv("JOB_BATCH_SIZE", "10")),
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "600")),
+        prune_history=retention_from_env(),
+        refresh_percentiles=percentile_refresh,
+        percentile_interval=float(os.getenv("LEADERBOARD_PERCENTILE_SECONDS", "60"))
+    )
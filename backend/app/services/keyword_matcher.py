@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds many keywords in a single pass over text"""
+
+    def __init__(self, patterns: Iterable[str]):
+        # Unique patterns in insertion order; a pattern's index is its id
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+
+        # Trie stored as parallel lists indexed by state number
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._add_pattern(pattern, pattern_id)
+
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, pattern_id: int):
+        """Insert a pattern into the trie"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (pattern_id,)
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+
+                self._fail[next_state] = fail_state
+                self._output[next_state] = self._output[next_state] + self._output[fail_state]
+
+    def first_occurrences(self, text: str) -> Dict[str, int]:
+        """Return the start offset of the first occurrence of every pattern found in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+
+        found: Dict[str, int] = {}
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern_id in output[state]:
+                pattern = patterns[pattern_id]
+                # Matches of the same pattern are reported in order, so the first one wins
+                if pattern not in found:
+                    found[pattern] = position - len(pattern) + 1
+
+        return found
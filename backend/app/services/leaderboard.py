@@ -0,0 +1,144 @@
+from sqlalchemy import DateTime, bindparam, event, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import run_write, Company, CompanyLatestScore, RiskScore
+
+# Scores the leaderboard can be ranked by
+LEADERBOARD_SCORES = ('overall_score', 'environmental_score', 'social_score', 'governance_score')
+
+# Insert or replace a company's row when the RiskScore is newer than the one it holds
+UPSERT_LATEST_SCORE = text("""
+    INSERT INTO company_latest_scores (
+        company_id, risk_score_id, sector, overall_score, environmental_score, social_score,
+        governance_score, total_articles, calculated_at
+    ) VALUES (
+        :company_id, :risk_score_id, (SELECT sector FROM companies WHERE id = :company_id),
+        :overall_score, :environmental_score, :social_score, :governance_score,
+        (SELECT COUNT(*) FROM articles WHERE company_id = :company_id), :calculated_at
+    )
+    ON CONFLICT (company_id) DO UPDATE SET
+        risk_score_id = excluded.risk_score_id,
+        sector = excluded.sector,
+        overall_score = excluded.overall_score,
+        environmental_score = excluded.environmental_score,
+        social_score = excluded.social_score,
+        governance_score = excluded.governance_score,
+        total_articles = excluded.total_articles,
+        calculated_at = excluded.calculated_at
+    WHERE excluded.calculated_at > company_latest_scores.calculated_at
+        OR (excluded.calculated_at = company_latest_scores.calculated_at
+            AND excluded.risk_score_id > company_latest_scores.risk_score_id)
+""").bindparams(bindparam('calculated_at', type_=DateTime))
+
+# Percentile ranks need the whole table, so they are refreshed periodically rather than on each write
+REFRESH_PERCENTILES = text("""
+    UPDATE company_latest_scores SET
+        overall_percentile = ranked.overall_percentile,
+        environmental_percentile = ranked.environmental_percentile,
+        social_percentile = ranked.social_percentile,
+        governance_percentile = ranked.governance_percentile
+    FROM (
+        SELECT company_id,
+            percent_rank() OVER (ORDER BY overall_score) AS overall_percentile,
+            percent_rank() OVER (ORDER BY environmental_score) AS environmental_percentile,
+            percent_rank() OVER (ORDER BY social_score) AS social_percentile,
+            percent_rank() OVER (ORDER BY governance_score) AS governance_percentile
+        FROM company_latest_scores
+    ) AS ranked
+    WHERE ranked.company_id = company_latest_scores.company_id
+""")
+
+UPDATE_SECTOR = text("UPDATE company_latest_scores SET sector = :sector WHERE company_id = :company_id")
+
+# Every change to the leaderboard moves its version, which /companies reads instead of the table
+BUMP_VERSION = text("""
+    UPDATE leaderboard_version SET version = version + 1, company_count = company_count + :added_companies WHERE id = 1
+""")
+
+# Claim a percentile refresh if the leaderboard changed since the last one. The refresh moves the version too,
+# since the listed percentiles change; writing first takes SQLite's write lock before anything is read.
+CLAIM_PERCENTILE_REFRESH = text("""
+    UPDATE leaderboard_version SET version = version + 1, percentiles_version = version + 1
+    WHERE id = 1 AND version > percentiles_version
+""")
+
+def refresh_percentiles(conn: Connection) -> bool:
+    """Recompute every company's percentile ranks if the leaderboard changed since they were computed"""
+    if not conn.execute(CLAIM_PERCENTILE_REFRESH).rowcount:
+        return False
+    conn.execute(REFRESH_PERCENTILES)
+    return True
+
+def percentile_refresh():
+    """refresh_percentiles in its own write transaction, as run by the job scheduler"""
+    return run_write(lambda session: refresh_percentiles(session.connection()))
+
+def refresh_leaderboard(conn: Connection) -> int:
+    """Rebuild company_latest_scores from risk_scores, e.g. after bulk inserts that bypass the ORM"""
+    conn.execute(text("DELETE FROM company_latest_scores"))
+    conn.execute(text("""
+        INSERT INTO company_latest_scores (
+            company_id, risk_score_id, sector, overall_score, environmental_score, social_score,
+            governance_score, total_articles, calculated_at
+        )
+        SELECT ranked.company_id, ranked.id, companies.sector, ranked.overall_score, ranked.environmental_score,
+            ranked.social_score, ranked.governance_score,
+            (SELECT COUNT(*) FROM articles WHERE articles.company_id = ranked.company_id), ranked.calculated_at
+        FROM (
+            SELECT risk_scores.*, row_number() OVER (
+                PARTITION BY company_id ORDER BY calculated_at DESC, id DESC
+            ) AS rn
+            FROM risk_scores
+        ) AS ranked
+        JOIN companies ON companies.id = ranked.company_id
+        WHERE ranked.rn = 1
+    """))
+    conn.execute(REFRESH_PERCENTILES)
+    company_count = conn.execute(text("SELECT COUNT(*) FROM company_latest_scores")).scalar()
+    conn.execute(
+        text(
+            "UPDATE leaderboard_version SET version = version + 1, percentiles_version = version + 1, "
+            "company_count = :company_count WHERE id = 1"
+        ),
+        {'company_count': company_count}
+    )
+    return company_count
+
+@event.listens_for(Session, "after_flush")
+def _update_leaderboard(session: Session, flush_context):
+    """
+    Apply flushed RiskScores and sector changes to the leaderboard in the same transaction. Only the
+    flushed companies' rows are written; percentile ranks catch up at the next percentile_refresh.
+    """
+    risk_scores = [obj for obj in session.new if isinstance(obj, RiskScore)]
+    sector_changes = [
+        obj for obj in session.dirty
+        if isinstance(obj, Company) and inspect(obj).attrs.sector.history.has_changes()
+    ]
+    if not risk_scores and not sector_changes:
+        return
+
+    conn = session.connection()
+    for company in sector_changes:
+        conn.execute(UPDATE_SECTOR, {'company_id': company.id, 'sector': company.sector})
+
+    added_companies = 0
+    if risk_scores:
+        company_ids = {risk_score.company_id for risk_score in risk_scores}
+        listed = conn.execute(
+            select(CompanyLatestScore.company_id).where(CompanyLatestScore.company_id.in_(company_ids))
+        ).scalars().all()
+        added_companies = len(company_ids) - len(listed)
+        conn.execute(UPSERT_LATEST_SCORE, [
+            {
+                'company_id': risk_score.company_id,
+                'risk_score_id': risk_score.id,
+                'overall_score': risk_score.overall_score,
+                'environmental_score': risk_score.environmental_score,
+                'social_score': risk_score.social_score,
+                'governance_score': risk_score.governance_score,
+                'calculated_at': risk_score.calculated_at
+            } for risk_score in risk_scores
+        ])
+    conn.execute(BUMP_VERSION, {'added_companies': added_companies})
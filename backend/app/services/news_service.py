@@ -1,16 +1,182 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
-from datetime import datetime, timedelta
+import asyncio
+import httpx
+import logging
+import os
 import random
-import json
+import warnings
+from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup
+from bs4.builder import XMLParsedAsHTMLWarning
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote_plus, urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# RSS is parsed with the stdlib HTML parser when lxml isn't installed
+warnings.filterwarnings('ignore', category=XMLParsedAsHTMLWarning)
+
+try:
+    import lxml  # noqa: F401
+    RSS_PARSER_FEATURES = 'xml'
+except ImportError:
+    RSS_PARSER_FEATURES = 'html.parser'
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class NewsSource(ABC):
+    """A pluggable source of news articles: where to fetch them from and how to parse them"""
+
+    name = 'source'
+
+    def __init__(self, url_template: str):
+        # url_template contains a {company} placeholder, e.g. https://example.com/rss?q={company}
+        self.url_template = url_template
+
+    def build_url(self, company_name: str) -> str:
+        return self.url_template.format(company=quote_plus(company_name))
+
+    @abstractmethod
+    def parse(self, body: str, base_url: str) -> List[Dict]:
+        """Parse a fetched document into article dicts (runs in a worker thread)"""
+
+    def _clean_text(self, markup: str) -> str:
+        """Strip any HTML from a title or summary"""
+        return ' '.join(BeautifulSoup(markup or '', 'html.parser').get_text(' ').split())
+
+    def _parse_date(self, value: Optional[str]) -> datetime:
+        """Parse an RFC 822 or ISO 8601 date into naive UTC, defaulting to now"""
+        if value:
+            for parse in (parsedate_to_datetime, datetime.fromisoformat):
+                try:
+                    parsed = parse(value.strip())
+                    if parsed.tzinfo:
+                        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+                    return parsed
+                except (TypeError, ValueError):
+                    continue
+        return datetime.utcnow()
+
+class RSSNewsSource(NewsSource):
+    """RSS 2.0 feed, e.g. a news search feed"""
+
+    name = 'rss'
+
+    def parse(self, body: str, base_url: str) -> List[Dict]:
+        soup = BeautifulSoup(body, RSS_PARSER_FEATURES)
+        articles = []
+
+        for item in soup.find_all('item'):
+            title = item.find('title')
+            link = item.find('link')
+            description = item.find('description')
+            published = item.find(['pubDate', 'pubdate'])
+
+            url = ''
+            if link:
+                # html.parser treats <link> as a void element, leaving the URL as its next sibling
+                url = link.get_text(strip=True) or str(link.next_sibling or '').strip()
+
+            articles.append({
+                'title': self._clean_text(title.get_text() if title else ''),
+                'content': self._clean_text(description.get_text() if description else ''),
+                'url': urljoin(base_url, url),
+                'published_at': self._parse_date(published.get_text() if published else None)
+            })
+
+        return articles
+
+class HTMLNewsSource(NewsSource):
+    """HTML listing page scraped with CSS selectors"""
+
+    name = 'html'
+
+    def __init__(
+        self,
+        url_template: str,
+        item_selector: str = 'article',
+        title_selector: str = 'h2, h3',
+        link_selector: str = 'a[href]',
+        summary_selector: str = 'p',
+        date_selector: str = 'time'
+    ):
+        super().__init__(url_template)
+        self.item_selector = item_selector
+        self.title_selector = title_selector
+        self.link_selector = link_selector
+        self.summary_selector = summary_selector
+        self.date_selector = date_selector
+
+    def parse(self, body: str, base_url: str) -> List[Dict]:
+        soup = BeautifulSoup(body, 'html.parser')
+        articles = []
+
+        for item in soup.select(self.item_selector):
+            title = item.select_one(self.title_selector)
+            link = item.select_one(self.link_selector)
+            summary = item.select_one(self.summary_selector)
+            published = item.select_one(self.date_selector)
+
+            if not title or not link:
+                continue
+
+            articles.append({
+                'title': ' '.join(title.get_text(' ').split()),
+                'content': ' '.join(summary.get_text(' ').split()) if summary else '',
+                'url': urljoin(base_url, link['href']),
+                'published_at': self._parse_date(
+                    (published.get('datetime') or published.get_text()) if published else None
+                )
+            })
+
+        return articles
+
+SOURCE_TYPES = {'rss': RSSNewsSource, 'html': HTMLNewsSource}
+
+def sources_from_env(value: Optional[str]) -> List[NewsSource]:
+    """Build sources from NEWS_SOURCES, e.g. "rss:https://example.com/rss?q={company};html:https://..." """
+    sources = []
+    for entry in (value or '').split(';'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, url_template = entry.partition(':')
+        if kind not in SOURCE_TYPES or not url_template:
+            raise ValueError(f"Invalid news source '{entry}', expected <rss|html>:<url template>")
+        sources.append(SOURCE_TYPES[kind](url_template))
+    return sources
 
 class NewsService:
-    def __init__(self):
+    def __init__(self, sources: Optional[List[NewsSource]] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
+        # Real news sources; mock data is used when none are configured
+        self.sources = sources if sources is not None else sources_from_env(os.getenv("NEWS_SOURCES"))
+        
+        # HTTP fetching settings
+        self.max_connections = int(os.getenv("NEWS_HTTP_MAX_CONNECTIONS", "100"))
+        self.per_host_limit = int(os.getenv("NEWS_HTTP_PER_HOST", "8"))
+        self.timeout = float(os.getenv("NEWS_HTTP_TIMEOUT", "10"))
+        self.max_retries = int(os.getenv("NEWS_HTTP_RETRIES", "3"))
+        self.backoff_base = float(os.getenv("NEWS_HTTP_BACKOFF", "0.5"))
+        
+        # BeautifulSoup parsing runs here so it never blocks the event loop
+        self.parse_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("NEWS_PARSE_WORKERS", "4")),
+            thread_name_prefix="news-parse"
+        )
+        
+        # The HTTP client and per-host semaphores belong to the event loop that created them
+        self._loop = None
+        self._client = None
+        self._client_closer = None
+        self._host_semaphores = {}
+        
         # Mock news data for demonstration
         self.mock_news_data = {
             'tesla': [
@@ -18,19 +184,19 @@ class NewsService:
                     'title': 'Tesla Faces New Labor Disputes at German Gigafactory',
                     'content': 'Tesla is facing renewed labor disputes at its German Gigafactory as workers demand better working conditions and higher wages. The company has been criticized for its approach to labor relations and workplace safety standards.',
                     'url': 'https://example.com/tesla-labor-disputes',
-                    'published_at': datetime.now() - timedelta(days=2)
+                    'published_at': datetime.utcnow() - timedelta(days=2)
                 },
                 {
                     'title': 'Tesla Reports Record Carbon Emissions Despite EV Focus',
                     'content': 'Despite being an electric vehicle manufacturer, Tesla has reported record carbon emissions from its manufacturing processes. Environmental groups are calling for greater transparency in the company\'s environmental impact reporting.',
                     'url': 'https://example.com/tesla-emissions',
-                    'published_at': datetime.now() - timedelta(days=5)
+                    'published_at': datetime.utcnow() - timedelta(days=5)
                 },
                 {
                     'title': 'Tesla Autopilot Under Regulatory Scrutiny After Accidents',
                     'content': 'Tesla\'s Autopilot system is facing increased regulatory scrutiny following several accidents. The National Highway Traffic Safety Administration is investigating potential safety violations.',
                     'url': 'https://example.com/tesla-autopilot',
-                    'published_at': datetime.now() - timedelta(days=7)
+                    'published_at': datetime.utcnow() - timedelta(days=7)
                 }
             ],
             'exxon': [
@@ -38,19 +204,19 @@ class NewsService:
                     'title': 'ExxonMobil Fined $2.5M for Environmental Violations',
                     'content': 'ExxonMobil has been fined $2.5 million for environmental violations at its Texas refinery. The company failed to properly report emissions and violated multiple environmental regulations.',
                     'url': 'https://example.com/exxon-fine',
-                    'published_at': datetime.now() - timedelta(days=1)
+                    'published_at': datetime.utcnow() - timedelta(days=1)
                 },
                 {
                     'title': 'ExxonMobil Oil Spill Cleanup Costs Reach $50M',
                     'content': 'Cleanup costs for a recent oil spill at an ExxonMobil facility have reached $50 million. The spill has caused significant environmental damage and affected local communities.',
                     'url': 'https://example.com/exxon-spill',
-                    'published_at': datetime.now() - timedelta(days=3)
+                    'published_at': datetime.utcnow() - timedelta(days=3)
                 },
                 {
                     'title': 'ExxonMobil Workers Strike Over Safety Concerns',
                     'content': 'Workers at ExxonMobil facilities are striking over safety concerns and inadequate protective equipment. The union claims the company has ignored multiple safety violations.',
                     'url': 'https://example.com/exxon-strike',
-                    'published_at': datetime.now() - timedelta(days=6)
+                    'published_at': datetime.utcnow() - timedelta(days=6)
                 }
             ],
             'google': [
@@ -58,19 +224,19 @@ class NewsService:
                     'title': 'Google Faces Antitrust Lawsuit Over Search Dominance',
                     'content': 'Google is facing a major antitrust lawsuit over its dominance in search and advertising markets. The lawsuit alleges anti-competitive practices and market manipulation.',
                     'url': 'https://example.com/google-antitrust',
-                    'published_at': datetime.now() - timedelta(days=2)
+                    'published_at': datetime.utcnow() - timedelta(days=2)
                 },
                 {
                     'title': 'Google Data Center Emissions Under Scrutiny',
                     'content': 'Google\'s data centers are under scrutiny for their massive energy consumption and carbon emissions. Despite renewable energy commitments, the company\'s carbon footprint continues to grow.',
                     'url': 'https://example.com/google-emissions',
-                    'published_at': datetime.now() - timedelta(days=4)
+                    'published_at': datetime.utcnow() - timedelta(days=4)
                 },
                 {
                     'title': 'Google Employees Protest Military Contracts',
                     'content': 'Google employees are protesting the company\'s military contracts, citing ethical concerns about AI technology being used in warfare. The protests highlight ongoing governance issues.',
                     'url': 'https://example.com/google-protests',
-                    'published_at': datetime.now() - timedelta(days=8)
+                    'published_at': datetime.utcnow() - timedelta(days=8)
                 }
             ],
             'amazon': [
@@ -78,19 +244,19 @@ class NewsService:
                     'title': 'Amazon Warehouse Workers File Safety Complaints',
                     'content': 'Amazon warehouse workers have filed numerous safety complaints about working conditions, including inadequate breaks and unsafe equipment. The company faces multiple workplace safety violations.',
                     'url': 'https://example.com/amazon-safety',
-                    'published_at': datetime.now() - timedelta(days=1)
+                    'published_at': datetime.utcnow() - timedelta(days=1)
                 },
                 {
                     'title': 'Amazon Fined for Environmental Waste Management Violations',
                     'content': 'Amazon has been fined for improper waste management and environmental violations at its fulfillment centers. The company failed to properly dispose of hazardous materials.',
                     'url': 'https://example.com/amazon-waste',
-                    'published_at': datetime.now() - timedelta(days=5)
+                    'published_at': datetime.utcnow() - timedelta(days=5)
                 },
                 {
                     'title': 'Amazon Unionization Efforts Gain Momentum',
                     'content': 'Unionization efforts at Amazon facilities are gaining momentum as workers demand better wages and working conditions. The company has been criticized for its anti-union practices.',
                     'url': 'https://example.com/amazon-union',
-                    'published_at': datetime.now() - timedelta(days=9)
+                    'published_at': datetime.utcnow() - timedelta(days=9)
                 }
             ]
         }
@@ -113,26 +279,127 @@ class NewsService:
                 'title': f'{company_name} Reports Strong Q4 Earnings',
                 'content': f'{company_name} has reported strong fourth-quarter earnings, beating analyst expectations. The company\'s performance has been driven by increased demand and operational efficiency improvements.',
                 'url': f'https://example.com/{company_name.lower()}-earnings',
-                'published_at': datetime.now() - timedelta(days=random.randint(1, 7))
+                'published_at': datetime.utcnow() - timedelta(days=random.randint(1, 7))
             },
             {
                 'title': f'{company_name} Announces New Sustainability Initiative',
                 'content': f'{company_name} has announced a new sustainability initiative aimed at reducing its environmental impact. The company plans to invest in renewable energy and improve its carbon footprint.',
                 'url': f'https://example.com/{company_name.lower()}-sustainability',
-                'published_at': datetime.now() - timedelta(days=random.randint(1, 7))
+                'published_at': datetime.utcnow() - timedelta(days=random.randint(1, 7))
             },
             {
                 'title': f'{company_name} Faces Regulatory Scrutiny',
                 'content': f'{company_name} is facing increased regulatory scrutiny over its business practices. Regulators are investigating potential compliance issues and market conduct violations.',
                 'url': f'https://example.com/{company_name.lower()}-regulatory',
-                'published_at': datetime.now() - timedelta(days=random.randint(1, 7))
+                'published_at': datetime.utcnow() - timedelta(days=random.randint(1, 7))
             }
         ]
         
         return random.sample(mock_templates, min(limit, len(mock_templates)))
 
-    def scrape_news(self, company_name: str, limit: int = 10) -> List[Dict]:
-        """Scrape real news articles (placeholder for future implementation)"""
-        # This would implement actual news scraping in a production environment
-        # For now, we'll use mock data
-        return self.get_company_news(company_name, limit)
+    async def fetch_company_news(self, company_name: str, limit: int = 10) -> List[Dict]:
+        """Get news articles for a company from the configured sources, or mock data if there are none"""
+        if not self.sources:
+            return self.get_company_news(company_name, limit)
+        
+        return await self.scrape_news(company_name, limit)
+
+    async def scrape_news(self, company_name: str, limit: int = 10) -> List[Dict]:
+        """Scrape real news articles from every configured source concurrently"""
+        results = await asyncio.gather(
+            *[self._fetch_source(source, company_name) for source in self.sources],
+            return_exceptions=True
+        )
+        
+        articles = []
+        seen_urls = set()
+        for source, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                logger.warning("News source %s failed for %s: %s", source.name, company_name, result)
+                continue
+            for article in result:
+                if article['url'] not in seen_urls:
+                    seen_urls.add(article['url'])
+                    articles.append(article)
+        
+        articles.sort(key=lambda article: article['published_at'], reverse=True)
+        return articles[:limit]
+
+    async def _fetch_source(self, source: NewsSource, company_name: str) -> List[Dict]:
+        """Fetch one source's document and parse it in the worker pool"""
+        url = source.build_url(company_name)
+        body = await self._get(url)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_executor, source.parse, body, url)
+
+    async def _get(self, url: str) -> str:
+        """GET a URL through the shared client, limited per host and retried with exponential backoff"""
+        client = await self._get_client()
+        semaphore = self._host_semaphore(urlsplit(url).netloc)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    response = await client.get(url)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.text
+                error = httpx.HTTPStatusError(
+                    f"Server returned {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            
+            if attempt == self.max_retries:
+                raise error
+            
+            # Back off outside the semaphore so other requests to the host can proceed
+            delay = self.backoff_base * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # A client left by a loop still running elsewhere is closed there; one whose loop was shut
+            # down was closed with it
+            if self._client_closer is not None and self._loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._client_closer.aclose(), self._loop)
+            self._loop = loop
+            self._host_semaphores = {}
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                follow_redirects=True
+            )
+            self._client_closer = _close_at_shutdown(self._client)
+            await self._client_closer.__anext__()
+        return self._client
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._client_closer is not None:
+            await self._client_closer.aclose()
+            self._client_closer = None
+            self._client = None
+
+async def _close_at_shutdown(client: httpx.AsyncClient):
+    """
+    Suspends until closed, then closes the client. Its event loop closes suspended async generators
+    when it shuts down (asyncio.run does), so the client's connections are closed on the loop they
+    belong to rather than leaked when a later loop replaces the client.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
@@ -0,0 +1,201 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+# Short names for NLP_SERVICE; any other value is a "module:Class" path
+NLP_SERVICES = {
+    'simple': 'app.services.simple_nlp:SimpleNLPService',
+    'spacy': 'app.services.nlp_service:NLPService',
+}
+
+class ExecutorSaturated(Exception):
+    """Raised when every NLP slot is taken and the call can't wait, or too many calls are already waiting"""
+
+def load_nlp_service(name: str):
+    """Instantiate an NLP service by short name or "module:Class" path"""
+    module_name, _, class_name = NLP_SERVICES.get(name, name).partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+# The service used by pool workers; forked workers inherit the parent's copy
+_worker_service = None
+
+def _init_worker(service_name: str):
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = load_nlp_service(service_name)
+
+def _call_worker_service(method: str, *args):
+    return getattr(_worker_service, method)(*args)
+
+def _worker_ready() -> bool:
+    return _worker_service is not None
+
+class NLPExecutor:
+    """
+    Runs NLP service calls off the event loop: in a process pool for CPU-heavy services,
+    a thread pool for cheap ones, or inline. At most max_pending calls may be queued or running, and at
+    most max_waiting more may wait for a slot. The service itself is loaded on first use unless one is
+    passed in.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        service=None,
+        kind: str = 'thread',
+        max_workers: int = 4,
+        max_pending: int = 32,
+        max_waiting: int = 256
+    ):
+        if kind not in ('process', 'thread', 'inline'):
+            raise ValueError(f"Unknown NLP executor '{kind}', expected process, thread or inline")
+
+        self._service = service
+        self._service_lock = threading.Lock()
+        self.service_name = service_name
+        self.load_seconds: Optional[float] = None
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.max_waiting = max_waiting
+
+        self._executor: Optional[Executor] = None
+        self._loop = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.in_flight = 0  # Calls holding a slot
+        self.waiting = 0  # wait=True calls queued for a slot
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def service(self):
+        """The NLP service, loaded the first time it is needed"""
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    started = time.perf_counter()
+                    self._service = load_nlp_service(self.service_name)
+                    self.load_seconds = time.perf_counter() - started
+        return self._service
+
+    @property
+    def loaded(self) -> bool:
+        return self._service is not None
+
+    @property
+    def saturated(self) -> bool:
+        """Whether a call made now without wait=True would be rejected"""
+        return self._slots is not None and self._slots.locked()
+
+    async def run(self, method: str, *args, wait: bool = False) -> Any:
+        """
+        Call service.method(*args) on a worker. When all slots are taken this raises
+        ExecutorSaturated, or waits for a free slot if wait is True and fewer than max_waiting
+        calls are already waiting.
+        """
+        slots = self._get_slots()
+        if slots.locked():
+            if not wait:
+                self.rejected += 1
+                raise ExecutorSaturated(f"All {self.max_pending} NLP slots are busy")
+            if self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise ExecutorSaturated(f"All {self.max_pending} NLP slots are busy and {self.waiting} calls are waiting")
+
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            if self.kind == 'inline':
+                result = getattr(self.service, method)(*args)
+            elif self.kind == 'process':
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), _call_worker_service, method, *args
+                )
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), getattr(self.service, method), *args
+                )
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'kind': self.kind,
+            'service': self.service_name,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'max_waiting': self.max_waiting,
+            'loaded': self.loaded,
+            'load_seconds': self.load_seconds,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
+
+    def warm_up(self):
+        """Load the service, prime its lazily loaded resources and start the pool's workers"""
+        self.service.analyze_batch(["Warm-up article about emissions and a labor strike."])
+        if self.kind == 'process':
+            executor = self._get_executor()
+            for future in [executor.submit(_worker_ready) for _ in range(self.max_workers)]:
+                future.result()
+        elif self.kind == 'thread':
+            self._get_executor()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        global _worker_service
+        if self._executor is None:
+            if self.kind == 'process':
+                # Load the model before workers fork so they share its memory instead of each loading a copy
+                if multiprocessing.get_start_method() == 'fork':
+                    _worker_service = self.service
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.service_name,)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nlp")
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # The semaphore belongs to the event loop that first used it
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+def executor_from_env() -> NLPExecutor:
+    """Create the NLP service and its executor from NLP_* environment variables"""
+    service_name = os.getenv("NLP_SERVICE") or "simple"
+    default_kind = 'thread' if service_name == 'simple' else 'process'
+
+    return NLPExecutor(
+        service_name=service_name,
+        kind=os.getenv("NLP_EXECUTOR") or default_kind,
+        max_workers=int(os.getenv("NLP_WORKERS", str(os.cpu_count() or 4))),
+        max_pending=int(os.getenv("NLP_MAX_PENDING", "32")),
+        max_waiting=int(os.getenv("NLP_MAX_WAITING", "256"))
+    )
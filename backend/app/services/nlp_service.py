@@ -1,11 +1,20 @@
+import os
 import re
-from typing import List, Dict, Tuple
-from textblob import TextBlob
+from typing import List, Dict, Optional, Tuple
+from textblob.en import sentiment as pattern_sentiment
 import spacy
 from app.models import ESGEventResponse
+from app.services.keyword_matcher import KeywordMatcher
+
+# Pipeline components not needed for entity spans; excluded when the model is loaded
+SPACY_EXCLUDED_COMPONENTS = ['tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer']
 
 class NLPService:
-    def __init__(self):
+    def __init__(self, batch_size: Optional[int] = None, n_process: Optional[int] = None):
+        # nlp.pipe settings for analyze_batch
+        self.batch_size = batch_size or int(os.getenv("NLP_BATCH_SIZE", "64"))
+        self.n_process = n_process or int(os.getenv("NLP_N_PROCESS", "1"))
+        
         # ESG-related keywords and their categories
         self.esg_keywords = {
             'environmental': [
@@ -32,31 +41,41 @@ class NLPService:
             'low': ['improvement', 'initiative', 'program', 'effort', 'commitment']
         }
         
-        # Try to load spaCy model, fallback to basic processing if not available
+        # Compiled matcher over every category keyword and severity indicator
+        self.keyword_matcher = KeywordMatcher(
+            [keyword for keywords in self.esg_keywords.values() for keyword in keywords] +
+            [word for words in self.severity_keywords.values() for word in words]
+        )
+        
+        # Try to load spaCy model with only the entity recognizer, fallback to basic processing if not available
+        model = os.getenv("NLP_SPACY_MODEL", "en_core_web_sm")
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = spacy.load(model, exclude=SPACY_EXCLUDED_COMPONENTS)
         except OSError:
-            print("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
+            print(f"spaCy model not found. Install with: python -m spacy download {model}")
             self.nlp = None
 
     def analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment of text and return polarity score (-1 to 1)"""
-        blob = TextBlob(text)
-        return blob.sentiment.polarity
+        # Same lexicon TextBlob(text).sentiment uses, without building a TextBlob per article
+        return pattern_sentiment(text)[0]
 
     def detect_esg_events(self, text: str) -> List[ESGEventResponse]:
         """Detect ESG-related events in text"""
         events = []
         text_lower = text.lower()
         
+        # Find every keyword and severity indicator in a single pass
+        matches = self.keyword_matcher.first_occurrences(text_lower)
+        
+        # Severity depends only on which indicators appear in the text
+        severity = self._calculate_severity(matches)
+        
         for category, keywords in self.esg_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
+                if keyword in matches:
                     # Find context around the keyword
-                    context = self._extract_context(text, keyword)
-                    
-                    # Determine severity
-                    severity = self._calculate_severity(text_lower, keyword)
+                    context = self._extract_context(text, matches[keyword], len(keyword))
                     
                     # Create event
                     event = ESGEventResponse(
@@ -69,41 +88,58 @@ class NLPService:
         # Remove duplicates and return
         return self._deduplicate_events(events)
 
-    def _extract_context(self, text: str, keyword: str, context_length: int = 100) -> str:
-        """Extract context around a keyword"""
-        text_lower = text.lower()
-        keyword_lower = keyword.lower()
-        
-        if keyword_lower not in text_lower:
-            return ""
-        
-        start_idx = text_lower.find(keyword_lower)
+    def _extract_context(self, text: str, start_idx: int, keyword_length: int, context_length: int = 100) -> str:
+        """Extract context around a keyword match"""
         start_context = max(0, start_idx - context_length)
-        end_context = min(len(text), start_idx + len(keyword) + context_length)
+        end_context = min(len(text), start_idx + keyword_length + context_length)
         
         return text[start_context:end_context].strip()
 
-    def _calculate_severity(self, text: str, keyword: str) -> float:
-        """Calculate severity score based on keywords and context"""
+    def _calculate_severity(self, matches: Dict[str, int]) -> float:
+        """Calculate severity score based on the indicators found in the text"""
         base_severity = 0.5  # Default medium severity
         
         # Check for high severity indicators
-        for high_severity_word in self.severity_keywords['high']:
-            if high_severity_word in text:
-                base_severity = max(base_severity, 0.8)
+        if any(word in matches for word in self.severity_keywords['high']):
+            base_severity = max(base_severity, 0.8)
         
         # Check for medium severity indicators
-        for medium_severity_word in self.severity_keywords['medium']:
-            if medium_severity_word in text:
-                base_severity = max(base_severity, 0.6)
+        if any(word in matches for word in self.severity_keywords['medium']):
+            base_severity = max(base_severity, 0.6)
         
         # Check for low severity indicators
-        for low_severity_word in self.severity_keywords['low']:
-            if low_severity_word in text:
-                base_severity = min(base_severity, 0.3)
+        if any(word in matches for word in self.severity_keywords['low']):
+            base_severity = min(base_severity, 0.3)
         
         return base_severity
 
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze sentiment, ESG events and named entities for a batch of texts in one pass"""
+        if self.nlp is None:
+            docs = [None] * len(texts)
+        else:
+            docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        
+        return [
+            {
+                'sentiment_score': self.analyze_sentiment(text),
+                'events': self.detect_esg_events(text),
+                'entities': self._entity_spans(doc) if doc is not None else []
+            }
+            for text, doc in zip(texts, docs)
+        ]
+
+    def extract_entities(self, text: str) -> List[Dict]:
+        """Named entity spans in a single text"""
+        return self._entity_spans(self.nlp(text)) if self.nlp is not None else []
+
+    def _entity_spans(self, doc) -> List[Dict]:
+        """Character offsets and labels of the entities spaCy found in a document"""
+        return [
+            {'text': ent.text, 'label': ent.label_, 'start': ent.start_char, 'end': ent.end_char}
+            for ent in doc.ents
+        ]
+
     def _deduplicate_events(self, events: List[ESGEventResponse]) -> List[ESGEventResponse]:
         """Remove duplicate events based on event type"""
         seen_types = set()
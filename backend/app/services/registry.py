@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Service factories import their modules on first use so importing the app stays cheap
+
+def _news_service():
+    from app.services.news_service import NewsService
+    return NewsService()
+
+def _nlp_executor():
+    from app.services.nlp_executor import executor_from_env
+    return executor_from_env()
+
+def _analysis_cache():
+    from app.services.analysis_cache import cache_from_env
+    return cache_from_env()
+
+def _risk_scorer():
+    from app.services.decayed_scores import scorer_from_env
+    return scorer_from_env()
+
+def _analysis_flights():
+    from app.services.single_flight import SingleFlight
+    return SingleFlight()
+
+def _job_queue():
+    from app.services.job_queue import job_queue_from_env
+    return job_queue_from_env()
+
+SERVICE_FACTORIES: Dict[str, Callable] = {
+    'news_service': _news_service,
+    'nlp_executor': _nlp_executor,
+    'analysis_cache': _analysis_cache,
+    'analysis_flights': _analysis_flights,
+    'risk_scorer': _risk_scorer,
+    'job_queue': _job_queue,
+}
+
+# NLP_WARMUP modes: load models on first request, in the background after startup,
+# or when app.main is imported (so a pre-forking server shares them between workers)
+WARMUP_MODES = ('lazy', 'background', 'preload')
+
+class ServiceRegistry:
+    """Shared services, built on first use or during warm-up and closed at shutdown"""
+
+    def __init__(self, warmup_mode: Optional[str] = None):
+        self.warmup_mode = warmup_mode or os.getenv("NLP_WARMUP", "background")
+        if self.warmup_mode not in WARMUP_MODES:
+            raise ValueError(f"Unknown NLP_WARMUP '{self.warmup_mode}', expected one of: {', '.join(WARMUP_MODES)}")
+
+        self._services = {}
+        self._lock = threading.Lock()
+
+        self.timings: Dict[str, float] = {}  # Seconds spent on imports, startup steps and building services
+        self.warmed_up = False
+        self.warm_up_error: Optional[str] = None
+
+    def get(self, name: str):
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    started = time.perf_counter()
+                    service = SERVICE_FACTORIES[name]()
+                    self.timings[name] = time.perf_counter() - started
+                    self._services[name] = service
+        return service
+
+    @property
+    def news_service(self):
+        return self.get('news_service')
+
+    @property
+    def nlp_executor(self):
+        return self.get('nlp_executor')
+
+    @property
+    def analysis_cache(self):
+        return self.get('analysis_cache')
+
+    @property
+    def analysis_flights(self):
+        return self.get('analysis_flights')
+
+    @property
+    def risk_scorer(self):
+        return self.get('risk_scorer')
+
+    @property
+    def job_queue(self):
+        return self.get('job_queue')
+
+    @property
+    def ready(self) -> bool:
+        """Whether requests will be served without waiting for models to load"""
+        return self.warmed_up or self.warmup_mode == 'lazy'
+
+    def record(self, step: str, started: float):
+        self.timings[step] = time.perf_counter() - started
+
+    def warm_up(self):
+        """Build every service and load the NLP model so the first analysis doesn't pay for it"""
+        started = time.perf_counter()
+        try:
+            for name in SERVICE_FACTORIES:
+                self.get(name)
+            self.nlp_executor.warm_up()
+            self.timings['nlp_model'] = self.nlp_executor.load_seconds or 0.0
+            self.record('warm_up', started)
+            self.warmed_up = True
+            logger.info("Services warmed up in %.2fs", self.timings['warm_up'])
+        except Exception as e:
+            self.warm_up_error = str(e)
+            logger.exception("Service warm-up failed")
+
+    async def aclose(self):
+        """Release connections and worker pools of the services that were built"""
+        # Job workers go first since they use the other services
+        job_queue = self._services.get('job_queue')
+        if job_queue is not None:
+            await job_queue.stop()
+
+        news_service = self._services.get('news_service')
+        if news_service is not None:
+            await news_service.aclose()
+
+        nlp_executor = self._services.get('nlp_executor')
+        if nlp_executor is not None:
+            nlp_executor.shutdown()
+
+    def status(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'warmup_mode': self.warmup_mode,
+            'warm_up_error': self.warm_up_error,
+            'loaded': sorted(self._services),
+            'timings': {step: round(seconds, 4) for step, seconds in self.timings.items()}
+        }
+
+services = ServiceRegistry()
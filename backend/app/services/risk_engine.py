@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Event categories in column order; events of any other category don't affect category scores
+RISK_CATEGORIES = ('environmental', 'social', 'governance')
+
+def category_codes(event_types: Iterable[str]) -> np.ndarray:
+    """Map event types like "social_labor_strike" to RISK_CATEGORIES indexes, -1 for other categories"""
+    codes = {category: index for index, category in enumerate(RISK_CATEGORIES)}
+    unique_types, inverse = np.unique(np.asarray(list(event_types), dtype=object), return_inverse=True)
+    unique_codes = np.array([codes.get(event_type.split('_')[0], -1) for event_type in unique_types], dtype=np.int64)
+    return unique_codes[inverse] if len(unique_types) else np.zeros(0, dtype=np.int64)
+
+def score_portfolio(
+    company_count: int,
+    article_company: np.ndarray,
+    article_sentiment: np.ndarray,
+    event_company: np.ndarray,
+    event_category: np.ndarray,
+    event_severity: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Compute calculate_risk_scores for every company at once. Companies are indexes in
+    [0, company_count); articles and events are parallel arrays. Sums are accumulated in array
+    order, so with each company's rows in the same order the results equal the per-company formula
+    exactly. Companies without articles score 0.
+    """
+    article_company = np.asarray(article_company, dtype=np.int64)
+    event_company = np.asarray(event_company, dtype=np.int64)
+    event_category = np.asarray(event_category, dtype=np.int64)
+    event_severity = np.asarray(event_severity, dtype=np.float64)
+
+    article_counts = np.bincount(article_company, minlength=company_count)
+    sentiment_sums = np.bincount(article_company, weights=np.asarray(article_sentiment, dtype=np.float64), minlength=company_count)
+    event_counts = np.bincount(event_company, minlength=company_count)
+    severity_sums = np.bincount(event_company, weights=event_severity, minlength=company_count)
+
+    has_articles = article_counts > 0
+    has_events = event_counts > 0
+
+    # Average sentiment converted from [-1,1] to a [0,1] risk, and mean event severity
+    avg_sentiment = np.divide(sentiment_sums, article_counts, out=np.zeros(company_count), where=has_articles)
+    sentiment_risk = (1 - avg_sentiment) / 2
+    event_risk = np.divide(severity_sums, event_counts, out=np.zeros(company_count), where=has_events)
+
+    # Highest severity per company and category
+    category_scores = np.zeros((company_count, len(RISK_CATEGORIES)))
+    known = event_category >= 0
+    np.maximum.at(category_scores, (event_company[known], event_category[known]), event_severity[known])
+
+    overall_score = np.minimum(1.0, (sentiment_risk * 0.4) + (event_risk * 0.6))
+
+    return {
+        'overall_score': np.where(has_articles, overall_score, 0.0),
+        'environmental_score': np.where(has_articles, category_scores[:, 0], 0.0),
+        'social_score': np.where(has_articles, category_scores[:, 1], 0.0),
+        'governance_score': np.where(has_articles, category_scores[:, 2], 0.0)
+    }
+
+# Articles fetched by each company's latest analysis; all of a company's articles if its analyses aren't numbered
+LATEST_ANALYSIS_ARTICLES = (
+    "FROM articles a LEFT JOIN companies c ON c.id = a.company_id "
+    "WHERE (c.analysis_count IS NULL OR a.last_analysis = c.analysis_count)"
+)
+
+def score_stored_companies(conn: Connection, company_ids: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Score every company (or these companies) from the sentiment and events of the articles its latest
+    analysis fetched, returning one row of RiskScore columns per company that has such articles.
+    Analyses score themselves with this too, so a re-score without new data leaves scores unchanged.
+    """
+    only = ""
+    params = {}
+    if company_ids is not None:
+        only = f" AND a.company_id IN ({', '.join(f':company_{i}' for i in range(len(company_ids)))})"
+        params = {f'company_{i}': company_id for i, company_id in enumerate(company_ids)}
+
+    articles = conn.execute(text(
+        f"SELECT a.company_id, COALESCE(a.sentiment_score, 0) {LATEST_ANALYSIS_ARTICLES}{only} ORDER BY a.company_id, a.id"
+    ), params).fetchall()
+    if not articles:
+        return []
+    events = conn.execute(text(
+        f"SELECT a.company_id, e.event_type, e.severity FROM esg_events e JOIN ({f'SELECT a.id, a.company_id {LATEST_ANALYSIS_ARTICLES}{only}'}) a "
+        "ON a.id = e.article_id ORDER BY a.company_id, a.id, e.id"
+    ), params).fetchall()
+
+    article_company_ids, article_sentiment = zip(*articles)
+    company_ids, article_company = np.unique(np.array(article_company_ids, dtype=np.int64), return_inverse=True)
+
+    if events:
+        event_company_ids, event_types, event_severity = zip(*events)
+        event_company = np.searchsorted(company_ids, np.array(event_company_ids, dtype=np.int64))
+        event_category = category_codes(event_types)
+    else:
+        event_company, event_category, event_severity = [], [], []
+
+    scores = score_portfolio(
+        len(company_ids), article_company, np.array(article_sentiment, dtype=np.float64),
+        event_company, event_category, np.array(event_severity, dtype=np.float64)
+    )
+
+    return [
+        {'company_id': int(company_id), **{name: float(values[index]) for name, values in scores.items()}}
+        for index, company_id in enumerate(company_ids)
+    ]
@@ -0,0 +1,199 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import DateTime, bindparam, delete, event, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import run_write, CompanyLatestScore, RiskScore, RiskScoreRollup
+from app.services.leaderboard import LEADERBOARD_SCORES
+
+# Rollup bucket sizes, finest first; 'raw' history reads risk_scores within the raw retention window
+ROLLUP_RESOLUTIONS = ('day', 'week', 'month')
+HISTORY_RESOLUTIONS = ('raw', *ROLLUP_RESOLUTIONS)
+
+_ROLLUP_COLUMNS = [f"{score}_{aggregate}" for score in LEADERBOARD_SCORES for aggregate in ('min', 'max', 'sum', 'last')]
+
+def _merge(column: str) -> str:
+    """SET clause combining a bucket's stored aggregate with the one being added"""
+    stored, added = f"risk_score_rollups.{column}", f"excluded.{column}"
+    if column.endswith('_min'):
+        return f"{column} = CASE WHEN {added} < {stored} THEN {added} ELSE {stored} END"
+    if column.endswith('_max'):
+        return f"{column} = CASE WHEN {added} > {stored} THEN {added} ELSE {stored} END"
+    if column.endswith('_sum'):
+        return f"{column} = {stored} + {added}"
+    # _last and last_at follow the newest score
+    return f"{column} = CASE WHEN excluded.last_at >= risk_score_rollups.last_at THEN {added} ELSE {stored} END"
+
+# Add aggregates to a bucket, creating it if needed
+UPSERT_ROLLUP = text(f"""
+    INSERT INTO risk_score_rollups (company_id, resolution, bucket_start, score_count, last_at, {', '.join(_ROLLUP_COLUMNS)})
+    VALUES (:company_id, :resolution, :bucket_start, :score_count, :last_at, {', '.join(':' + column for column in _ROLLUP_COLUMNS)})
+    ON CONFLICT (company_id, resolution, bucket_start) DO UPDATE SET
+        score_count = risk_score_rollups.score_count + excluded.score_count,
+        {', '.join(_merge(column) for column in [*_ROLLUP_COLUMNS, 'last_at'])}
+""").bindparams(bindparam('bucket_start', type_=DateTime), bindparam('last_at', type_=DateTime))
+
+def bucket_start(resolution: str, at: datetime) -> datetime:
+    """Start of the day, ISO week (Monday) or month containing a time"""
+    day = datetime(at.year, at.month, at.day)
+    if resolution == 'day':
+        return day
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+def rollup_rows(scores: Iterable) -> List[Dict]:
+    """
+    Aggregate risk scores (objects or mappings with company_id, calculated_at and the four scores)
+    into one UPSERT_ROLLUP parameter set per company, resolution and bucket
+    """
+    buckets = {}
+    for score in scores:
+        values = score if isinstance(score, dict) else {
+            name: getattr(score, name) for name in ('company_id', 'calculated_at', *LEADERBOARD_SCORES)
+        }
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (values['company_id'], resolution, bucket_start(resolution, values['calculated_at']))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {
+                    'company_id': key[0], 'resolution': resolution, 'bucket_start': key[2],
+                    'score_count': 0, 'last_at': values['calculated_at']
+                }
+                for name in LEADERBOARD_SCORES:
+                    bucket.update({
+                        f'{name}_min': values[name], f'{name}_max': values[name],
+                        f'{name}_sum': 0.0, f'{name}_last': values[name]
+                    })
+            bucket['score_count'] += 1
+            newest = values['calculated_at'] >= bucket['last_at']
+            if newest:
+                bucket['last_at'] = values['calculated_at']
+            for name in LEADERBOARD_SCORES:
+                value = values[name]
+                bucket[f'{name}_min'] = min(bucket[f'{name}_min'], value)
+                bucket[f'{name}_max'] = max(bucket[f'{name}_max'], value)
+                bucket[f'{name}_sum'] += value
+                if newest:
+                    bucket[f'{name}_last'] = value
+    return list(buckets.values())
+
+def add_to_rollups(conn: Connection, scores: Iterable) -> int:
+    """Add risk scores to their daily, weekly and monthly buckets, returning the buckets touched"""
+    rows = rollup_rows(scores)
+    if rows:
+        conn.execute(UPSERT_ROLLUP, rows)
+    return len(rows)
+
+def rebuild_rollups(conn: Connection, batch_size: int = 50000) -> int:
+    """
+    Rebuild every rollup from risk_scores. Only complete while no raw scores have been pruned, so
+    it backs the migration that introduces rollups rather than routine maintenance.
+    """
+    conn.execute(delete(RiskScoreRollup))
+    columns = [RiskScore.company_id, RiskScore.calculated_at, *[getattr(RiskScore, name) for name in LEADERBOARD_SCORES]]
+    result = conn.execute(select(*columns).where(RiskScore.calculated_at.is_not(None)).order_by(RiskScore.company_id))
+
+    # Companies come in order, so a batch's buckets are complete once the next company starts
+    buckets = 0
+    pending = []
+    for row in result.mappings():
+        if len(pending) >= batch_size and row['company_id'] != pending[-1]['company_id']:
+            buckets += add_to_rollups(conn, pending)
+            pending = []
+        pending.append(dict(row))
+    return buckets + add_to_rollups(conn, pending)
+
+def prune_history(conn: Connection, raw_days: float, daily_days: float, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Delete raw scores older than raw_days and daily rollups older than daily_days (0 keeps them).
+    Each company's latest RiskScore stays, since the leaderboard and company details read it.
+    """
+    now = now or datetime.utcnow()
+    pruned = {'raw': 0, 'day': 0}
+    if raw_days > 0:
+        latest_ids = select(CompanyLatestScore.risk_score_id).where(CompanyLatestScore.risk_score_id.is_not(None))
+        pruned['raw'] = conn.execute(delete(RiskScore).where(
+            RiskScore.calculated_at < now - timedelta(days=raw_days),
+            RiskScore.id.not_in(latest_ids)
+        )).rowcount
+    if daily_days > 0:
+        pruned['day'] = conn.execute(delete(RiskScoreRollup).where(
+            RiskScoreRollup.resolution == 'day',
+            RiskScoreRollup.bucket_start < bucket_start('day', now - timedelta(days=daily_days))
+        )).rowcount
+    return pruned
+
+def history_query(company_id: int, resolution: str, since: Optional[datetime], until: Optional[datetime], limit: int):
+    """
+    Newest `limit` points of a company's history, newest first: raw scores, or rollup buckets read
+    by a range scan of the rollup primary key, one row per point
+    """
+    if resolution == 'raw':
+        query = select(
+            RiskScore.calculated_at.label('start'),
+            *[getattr(RiskScore, name) for name in LEADERBOARD_SCORES]
+        ).where(RiskScore.company_id == company_id)
+        if since is not None:
+            query = query.where(RiskScore.calculated_at >= since)
+        if until is not None:
+            query = query.where(RiskScore.calculated_at < until)
+        return query.order_by(RiskScore.calculated_at.desc(), RiskScore.id.desc()).limit(limit)
+
+    query = select(
+        RiskScoreRollup.bucket_start.label('start'),
+        RiskScoreRollup.score_count,
+        *[getattr(RiskScoreRollup, column) for column in _ROLLUP_COLUMNS]
+    ).where(
+        RiskScoreRollup.company_id == company_id,
+        RiskScoreRollup.resolution == resolution
+    )
+    if since is not None:
+        query = query.where(RiskScoreRollup.bucket_start >= bucket_start(resolution, since))
+    if until is not None:
+        query = query.where(RiskScoreRollup.bucket_start < until)
+    return query.order_by(RiskScoreRollup.bucket_start.desc()).limit(limit)
+
+def history_point(row) -> Dict:
+    """A row of history_query as a history point with min/max/mean/last per score"""
+    row = row._mapping
+    if 'score_count' not in row:
+        point = {'start': row['start'], 'count': 1}
+        for name in LEADERBOARD_SCORES:
+            value = row[name]
+            point[name] = {'min': value, 'max': value, 'mean': value, 'last': value}
+        return point
+
+    count = row['score_count']
+    point = {'start': row['start'], 'count': count}
+    for name in LEADERBOARD_SCORES:
+        point[name] = {
+            'min': row[f'{name}_min'],
+            'max': row[f'{name}_max'],
+            'mean': row[f'{name}_sum'] / count,
+            'last': row[f'{name}_last']
+        }
+    return point
+
+def retention_from_env() -> Optional[Callable[[], Dict[str, int]]]:
+    """The pruning run by the job scheduler, from HISTORY_* environment variables, or None if disabled"""
+    raw_days = float(os.getenv("HISTORY_RAW_DAYS", "90"))
+    daily_days = float(os.getenv("HISTORY_DAILY_DAYS", "730"))
+    if raw_days <= 0 and daily_days <= 0:
+        return None
+
+    def prune() -> Dict[str, int]:
+        return run_write(lambda session: prune_history(session.connection(), raw_days, daily_days))
+    return prune
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups(session: Session, flush_context):
+    """Add flushed RiskScores to their rollup buckets in the same transaction"""
+    risk_scores = [obj for obj in session.new if isinstance(obj, RiskScore)]
+    if risk_scores:
+        add_to_rollups(session.connection(), risk_scores)
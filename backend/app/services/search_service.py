@@ -0,0 +1,74 @@
+import re
+from datetime import datetime
+from typing import List, Dict, Optional
+from sqlalchemy import bindparam, text, DateTime
+from sqlalchemy.orm import Session
+
+# Quoted phrases or bare terms in a user query
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+class SearchService:
+    """Ranked full-text search over articles and ESG events using the SQLite FTS5 index"""
+
+    def is_available(self, db: Session) -> bool:
+        """Search needs the FTS5 index, which only exists on SQLite"""
+        return db.get_bind().dialect.name == 'sqlite'
+
+    def build_match_query(self, query: str) -> str:
+        """Turn user input into an FTS5 query: quoted phrases stay phrases, bare terms are ANDed"""
+        terms = []
+        for phrase, word in QUERY_TOKEN_PATTERN.findall(query):
+            term = ' '.join((phrase or word).replace('"', ' ').split())
+            if term:
+                # Quoting every term keeps FTS5 operators and punctuation from being interpreted
+                terms.append(f'"{term}"')
+        return ' '.join(terms)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        kind: Optional[str] = None,
+        category: Optional[str] = None,
+        company_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Return up to limit + 1 matches, most relevant first (BM25 with title matches weighted higher)"""
+        filters = []
+        params = {'match': self.build_match_query(query), 'limit': limit + 1, 'offset': offset}
+
+        if kind:
+            filters.append("search_index.kind = :kind")
+            params['kind'] = kind
+        if category:
+            filters.append("search_index.category = :category")
+            params['category'] = category
+        if company_id is not None:
+            filters.append("articles.company_id = :company_id")
+            params['company_id'] = company_id
+        if since:
+            filters.append("articles.published_at >= :since")
+            params['since'] = since
+        if until:
+            filters.append("articles.published_at < :until")
+            params['until'] = until
+
+        statement = text(
+            "SELECT search_index.kind, articles.company_id, companies.name AS company, "
+            "search_index.article_id, articles.title, articles.url, articles.published_at, "
+            "search_index.category, snippet(search_index, 1, '<mark>', '</mark>', '...', 16) AS snippet, "
+            "-bm25(search_index, 4.0, 1.0) AS score "
+            "FROM search_index "
+            "JOIN articles ON articles.id = search_index.article_id "
+            "JOIN companies ON companies.id = articles.company_id "
+            "WHERE search_index MATCH :match "
+            + ''.join(f"AND {condition} " for condition in filters) +
+            "ORDER BY bm25(search_index, 4.0, 1.0) LIMIT :limit OFFSET :offset"
+        ).bindparams(
+            *[bindparam(name, type_=DateTime) for name in ('since', 'until') if name in params]
+        ).columns(published_at=DateTime)
+
+        return [dict(row._mapping) for row in db.execute(statement, params)]
@@ -1,6 +1,7 @@
 import re
 from typing import List, Dict
 from app.models import ESGEventResponse
+from app.services.keyword_matcher import KeywordMatcher
 
 class SimpleNLPService:
     def __init__(self):
@@ -29,6 +30,12 @@ class SimpleNLPService:
             'medium': ['violation', 'concern', 'issue', 'problem', 'controversy'],
             'low': ['improvement', 'initiative', 'program', 'effort', 'commitment']
         }
+        
+        # Compiled matcher over every category keyword and severity indicator
+        self.keyword_matcher = KeywordMatcher(
+            [keyword for keywords in self.esg_keywords.values() for keyword in keywords] +
+            [word for words in self.severity_keywords.values() for word in words]
+        )
 
     def analyze_sentiment(self, text: str) -> float:
         """Simple sentiment analysis based on keyword matching"""
@@ -52,14 +59,17 @@ class SimpleNLPService:
         events = []
         text_lower = text.lower()
         
+        # Find every keyword and severity indicator in a single pass
+        matches = self.keyword_matcher.first_occurrences(text_lower)
+        
+        # Severity depends only on which indicators appear in the text
+        severity = self._calculate_severity(matches)
+        
         for category, keywords in self.esg_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
+                if keyword in matches:
                     # Find context around the keyword
-                    context = self._extract_context(text, keyword)
-                    
-                    # Determine severity
-                    severity = self._calculate_severity(text_lower, keyword)
+                    context = self._extract_context(text, matches[keyword], len(keyword))
                     
                     # Create event
                     event = ESGEventResponse(
@@ -72,41 +82,42 @@ class SimpleNLPService:
         # Remove duplicates and return
         return self._deduplicate_events(events)
 
-    def _extract_context(self, text: str, keyword: str, context_length: int = 100) -> str:
-        """Extract context around a keyword"""
-        text_lower = text.lower()
-        keyword_lower = keyword.lower()
-        
-        if keyword_lower not in text_lower:
-            return ""
-        
-        start_idx = text_lower.find(keyword_lower)
+    def _extract_context(self, text: str, start_idx: int, keyword_length: int, context_length: int = 100) -> str:
+        """Extract context around a keyword match"""
         start_context = max(0, start_idx - context_length)
-        end_context = min(len(text), start_idx + len(keyword) + context_length)
+        end_context = min(len(text), start_idx + keyword_length + context_length)
         
         return text[start_context:end_context].strip()
 
-    def _calculate_severity(self, text: str, keyword: str) -> float:
-        """Calculate severity score based on keywords and context"""
+    def _calculate_severity(self, matches: Dict[str, int]) -> float:
+        """Calculate severity score based on the indicators found in the text"""
         base_severity = 0.5  # Default medium severity
         
         # Check for high severity indicators
-        for high_severity_word in self.severity_keywords['high']:
-            if high_severity_word in text:
-                base_severity = max(base_severity, 0.8)
+        if any(word in matches for word in self.severity_keywords['high']):
+            base_severity = max(base_severity, 0.8)
         
         # Check for medium severity indicators
-        for medium_severity_word in self.severity_keywords['medium']:
-            if medium_severity_word in text:
-                base_severity = max(base_severity, 0.6)
+        if any(word in matches for word in self.severity_keywords['medium']):
+            base_severity = max(base_severity, 0.6)
         
         # Check for low severity indicators
-        for low_severity_word in self.severity_keywords['low']:
-            if low_severity_word in text:
-                base_severity = min(base_severity, 0.3)
+        if any(word in matches for word in self.severity_keywords['low']):
+            base_severity = min(base_severity, 0.3)
         
         return base_severity
 
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze sentiment and ESG events for a batch of texts (no entity recognition here)"""
+        return [
+            {
+                'sentiment_score': self.analyze_sentiment(text),
+                'events': self.detect_esg_events(text),
+                'entities': []
+            }
+            for text in texts
+        ]
+
     def _deduplicate_events(self, events: List[ESGEventResponse]) -> List[ESGEventResponse]:
         """Remove duplicate events based on event type"""
         seen_types = set()
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the call and every caller
+    that arrives while it is in flight awaits the same result (or exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0  # Calls that ran
+        self.coalesced = 0  # Calls that shared another call's result
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            try:
+                # A cancelled follower must not cancel the shared flight
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The leader was cancelled rather than failing, so start a flight of our own
+                if flight.cancelled():
+                    self.coalesced -= 1
+                    return await self.run(key, call)
+                raise
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Followers see the exception; mark it retrieved for the case where there are none
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    async def run_many(
+        self,
+        keys: List[Hashable],
+        call: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """
+        run() for several distinct keys at once: keys already in flight share those calls, and one
+        call(led_keys) returning a result per key runs for the rest. Each key maps to its result, or
+        to the exception raised for it.
+        """
+        loop = asyncio.get_running_loop()
+        joined = {key: self._flights[key] for key in keys if key in self._flights}
+        flights = {key: loop.create_future() for key in keys if key not in joined}
+        self._flights.update(flights)
+        self.leaders += len(flights)
+        self.coalesced += len(joined)
+
+        outcomes = {}
+        if flights:
+            try:
+                results = await call(list(flights))
+            except asyncio.CancelledError:
+                for flight in flights.values():
+                    flight.cancel()
+                raise
+            except Exception as e:
+                for flight in flights.values():
+                    flight.set_exception(e)
+                    flight.exception()
+                outcomes.update((key, e) for key in flights)
+            else:
+                for key, flight in flights.items():
+                    flight.set_result(results[key])
+                outcomes.update(results)
+            finally:
+                for key in flights:
+                    del self._flights[key]
+
+        for key, flight in joined.items():
+            try:
+                outcomes[key] = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                self.coalesced -= 1
+                outcomes.update(await self.run_many([key], call))
+            except Exception as e:
+                outcomes[key] = e
+        return outcomes
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._flights),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced
+        }
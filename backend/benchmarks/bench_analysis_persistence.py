@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark analyze_company persistence: commit-per-article vs a single unit of work
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure the write path rather than analysis cache hits
+os.environ.setdefault("ANALYSIS_CACHE_SIZE", "0")
+
+import asyncio
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import Base, Company, Article, ESGEvent, RiskScore
+from app.routers import analyze
+from app.services.news_service import NewsService
+from app.services.simple_nlp import SimpleNLPService
+
+news_service = NewsService()
+nlp_service = SimpleNLPService()
+
+
+def legacy_analyze(db, company):
+    """The original write path: a commit for the company, every article and the score"""
+    db_company = db.query(Company).filter(Company.name.ilike(f"%{company}%")).first()
+    if not db_company:
+        db_company = Company(name=company)
+        db.add(db_company)
+        db.commit()
+        db.refresh(db_company)
+
+    news_articles = news_service.get_company_news(company, limit=10)
+    all_events = []
+    for article_data in news_articles:
+        sentiment_score = nlp_service.analyze_sentiment(article_data['content'])
+        events = nlp_service.detect_esg_events(article_data['content'])
+
+        db_article = Article(
+            title=article_data['title'],
+            content=article_data['content'],
+            url=article_data['url'],
+            published_at=article_data['published_at'],
+            sentiment_score=sentiment_score,
+            company_id=db_company.id
+        )
+        db.add(db_article)
+        db.commit()
+        db.refresh(db_article)
+
+        for detected in events:
+            db.add(ESGEvent(
+                event_type=detected.event_type,
+                description=detected.description,
+                severity=detected.severity,
+                article_id=db_article.id
+            ))
+            all_events.append(detected)
+
+    risk_scores = nlp_service.calculate_risk_scores(news_articles, all_events)
+    db.add(RiskScore(company_id=db_company.id, **risk_scores))
+    db.commit()
+
+
+async def unit_of_work_analyze(db, company):
+    """The current endpoint, called directly with an AsyncSession"""
+    await analyze.analyze_company(company=company, sector=None, db=db)
+
+
+def run(label, analyze_func, companies):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        commits = [0]
+        event.listen(engine, "commit", lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+        latencies = []
+        if asyncio.iscoroutinefunction(analyze_func):
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+            event.listen(async_engine.sync_engine, "commit", lambda conn: commits.__setitem__(0, commits[0] + 1))
+            AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+            async def analyze_all():
+                for company in companies:
+                    async with AsyncSession() as db:
+                        start = time.perf_counter()
+                        await analyze_func(db, company)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                await async_engine.dispose()
+
+            # SQLite analysis writes are committed through the app's sync session factory
+            app_session = database.SessionLocal
+            database.SessionLocal = Session
+            try:
+                asyncio.run(analyze_all())
+            finally:
+                database.SessionLocal = app_session
+        else:
+            for company in companies:
+                db = Session()
+                try:
+                    start = time.perf_counter()
+                    analyze_func(db, company)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                finally:
+                    db.close()
+
+        engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<16} {commits[0] / len(companies):>10.1f} {statistics.mean(latencies):>10.2f} {p95:>10.2f}")
+
+
+def main():
+    companies = ['Tesla', 'Exxon', 'Google', 'Amazon'] * 50
+
+    print(f"{'write path':<16} {'commits':>10} {'mean (ms)':>10} {'p95 (ms)':>10}")
+    run("per-article", legacy_analyze, companies)
+    run("unit of work", unit_of_work_analyze, companies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare time to first result of /api/analyze and /api/analyze/stream against a live API server
+whose NLP service takes a fixed time per article
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from load_test_nlp_offload import CPU_SECONDS_PER_ARTICLE, free_port, start_server
+
+REQUESTS = 10
+
+
+async def measure(base_url: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for _ in range(100):
+            try:
+                await client.get('/health')
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        results = {'json': [], 'stream': []}
+        for i in range(REQUESTS):
+            # Fresh company names so every request runs NLP over all of its articles
+            started = time.perf_counter()
+            resp = await client.get('/api/analyze', params={'company': f'Json Company {i}'})
+            resp.raise_for_status()
+            elapsed = time.perf_counter() - started
+            results['json'].append((elapsed, elapsed))
+
+            started = time.perf_counter()
+            first = None
+            async with client.stream('GET', '/api/analyze/stream', params={'company': f'Stream Company {i}'}) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if line and first is None:
+                        first = time.perf_counter() - started
+            results['stream'].append((first, time.perf_counter() - started))
+        return results
+
+
+def main():
+    print(f"{CPU_SECONDS_PER_ARTICLE * 1000:.0f} ms CPU per article, thread executor, {REQUESTS} requests per endpoint")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        server = start_server('thread', os.path.join(tmp, 'stream.db'), port)
+        try:
+            results = asyncio.run(measure(f"http://127.0.0.1:{port}"))
+        finally:
+            server.terminate()
+            server.wait()
+
+    for name, timings in results.items():
+        first = statistics.median(t[0] for t in timings) * 1000
+        total = statistics.median(t[1] for t in timings) * 1000
+        print(f"{name:7s} first result p50 {first:8.1f} ms   complete p50 {total:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare /api/companies under concurrent load when it queries through the AsyncSession (the
+current route) and through a synchronous Session called from the async route, which blocks the
+event loop for every query. A /health probe measures how long other requests wait meanwhile.
+
+The sync variant is the same app with /api/companies replaced, served with
+uvicorn --factory bench_async_db:create_sync_app. CLIENTS stays within the pool size: past it, a sync
+query waiting for a connection blocks the loop that would return one, stalling for DB_POOL_TIMEOUT.
+"""
+
+import sys
+import os
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+import asyncio
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from bench_conditional_get import seed
+from load_test_nlp_offload import free_port
+
+CLIENTS = 16
+DURATION = 10.0
+PROBE_INTERVAL = 0.05
+COMPANIES_PARAMS = {'sort_by': 'overall_score', 'order': 'desc', 'limit': 100}
+
+
+def create_sync_app():
+    """The API with /api/companies running its queries on a sync Session, as before the async port"""
+    from fastapi import Depends, Query, Response
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+
+    from app.database import get_read_db, Company, CompanyLatestScore
+    from app.main import app
+
+    app.router.routes = [route for route in app.router.routes if getattr(route, 'path', None) != '/api/companies']
+
+    @app.get('/api/companies')
+    async def get_companies(
+        response: Response,
+        sort_by: str = Query("id"),
+        order: str = Query("asc"),
+        limit: int = Query(None),
+        db: Session = Depends(get_read_db)
+    ):
+        total = db.execute(select(func.count(CompanyLatestScore.company_id))).scalar()
+        response.headers['X-Total-Count'] = str(total)
+        sort_column = getattr(CompanyLatestScore, sort_by, CompanyLatestScore.company_id)
+        direction = 'desc' if order == 'desc' else 'asc'
+        query = select(
+            CompanyLatestScore.company_id.label('id'), Company.name, CompanyLatestScore.sector,
+            CompanyLatestScore.overall_score, CompanyLatestScore.environmental_score,
+            CompanyLatestScore.social_score, CompanyLatestScore.governance_score,
+            CompanyLatestScore.overall_percentile, CompanyLatestScore.calculated_at.label('last_analyzed'),
+            CompanyLatestScore.total_articles
+        ).join(Company, Company.id == CompanyLatestScore.company_id).order_by(
+            getattr(sort_column, direction)(), getattr(CompanyLatestScore.company_id, direction)()
+        ).limit(limit)
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    return app
+
+
+def start_server(database_url: str, port: int, sync: bool) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        JOB_WORKERS="0",
+        PYTHONPATH=os.pathsep.join([BACKEND_DIR, os.path.join(BACKEND_DIR, 'benchmarks')])
+    )
+    target = ['--factory', 'bench_async_db:create_sync_app'] if sync else ['app.main:app']
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', *target, '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def run_load(base_url: str):
+    limits = httpx.Limits(max_connections=CLIENTS + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits, headers={'Accept-Encoding': 'identity'}) as client:
+        for _ in range(100):
+            try:
+                await client.get('/health')
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        await client.get('/api/companies', params=COMPANIES_PARAMS)
+
+        deadline = time.perf_counter() + DURATION
+        latencies = []
+        probes = []
+        errors = 0
+
+        async def company_client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get('/api/companies', params=COMPANIES_PARAMS)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get('/health')
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        await asyncio.gather(probe(), *[company_client() for _ in range(CLIENTS)])
+        return latencies, probes, errors
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def main():
+    company_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/async.db"
+        seed(database_url, company_count)
+
+        print(f"{company_count} companies, {CLIENTS} concurrent /api/companies clients, {DURATION:.0f}s per path")
+        print(f"{'path':8s} {'req/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'/health p99':>12s} {'errors':>7s}")
+        for label, sync in (('sync', True), ('async', False)):
+            port = free_port()
+            server = start_server(database_url, port, sync)
+            try:
+                latencies, probes, errors = asyncio.run(run_load(f"http://127.0.0.1:{port}"))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{label:8s} {len(latencies) / DURATION:8.0f} {statistics.median(latencies) * 1000:8.1f} "
+                f"{percentile(latencies, 0.99):8.1f} {percentile(probes, 0.99):12.1f} {errors:7d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Time simple_backend.py's indexed CompanyStore against scanning a list of company dicts:
+name lookups, top-N by score and score range queries, for growing company counts
+"""
+
+import sys
+import os
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(REPO_DIR)
+
+import random
+import time
+
+from simple_backend import SCORE_FIELDS, CompanyStore
+
+QUERIES = 20
+
+
+def make_companies(count: int, rng: random.Random):
+    return [
+        {
+            'id': i + 1, 'name': f'Company {i}',
+            **{field: round(rng.random(), 2) for field in SCORE_FIELDS},
+            'last_analyzed': '2024-01-15T10:30:00Z', 'total_articles': 3
+        }
+        for i in range(count)
+    ]
+
+
+def timed(run) -> float:
+    """Median microseconds per call"""
+    timings = []
+    for _ in range(QUERIES):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]
+    rng = random.Random(3)
+    print(f"{'companies':>10s} {'query':24s} {'scan (us)':>12s} {'store (us)':>12s}")
+
+    for size in sizes:
+        companies = make_companies(size, rng)
+        started = time.perf_counter()
+        store = CompanyStore(companies)
+        build = time.perf_counter() - started
+        name = f'company {size // 2}'
+
+        # Equivalent queries against the plain list
+        def scan_lookup():
+            return next(c for c in companies if c['name'].lower() == name)
+
+        def scan_top():
+            return sorted(companies, key=lambda c: c['overall_score'], reverse=True)[:10]
+
+        def scan_range():
+            return [c for c in companies if 0.80 <= c['social_score'] <= 0.82][:50]
+
+        cases = [
+            ('name lookup', scan_lookup, lambda: store.get_or_add(companies[size // 2])),
+            ('top 10 overall', scan_top, lambda: store.query('overall_score', True, limit=10)),
+            ('social 0.80-0.82, 50', scan_range, lambda: store.query('social_score', False, 0.80, 0.82, limit=50)),
+        ]
+        for label, scan, indexed in cases:
+            print(f"{size:10d} {label:24s} {timed(scan):12.1f} {timed(indexed):12.1f}")
+        print(f"{size:10d} {'build store':24s} {'':12s} {build * 1e6:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
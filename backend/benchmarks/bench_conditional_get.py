@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Measure bytes on the wire and latency of repeated dashboard loads of /api/companies and
+/api/companies/{id}/details: uncompressed, gzip, brotli and revalidated with If-None-Match
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REQUESTS = 50
+
+
+def seed(database_url: str, company_count: int):
+    from sqlalchemy import create_engine, insert
+    from app.database import Company, Article, RiskScore
+    from app.migrations import run_migrations
+    from app.services.leaderboard import refresh_leaderboard
+
+    engine = create_engine(database_url)
+    run_migrations(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Company), [
+            {'name': f'Company {i}', 'name_key': f'company {i}', 'sector': f'Sector {i % 10}'} for i in range(company_count)
+        ])
+        conn.execute(insert(Article), [
+            {
+                'company_id': 1, 'title': f'Article {j}', 'content': 'Workers strike over safety concerns. ' * 40,
+                'url': f'https://example.com/{j}', 'published_at': now - timedelta(hours=j), 'sentiment_score': -0.2
+            } for j in range(50)
+        ])
+        conn.execute(insert(RiskScore), [
+            {
+                'company_id': i + 1, 'overall_score': (i % 97) / 97, 'environmental_score': 0.5,
+                'social_score': 0.4, 'governance_score': 0.3, 'calculated_at': now
+            } for i in range(company_count)
+        ])
+        refresh_leaderboard(conn)
+    engine.dispose()
+
+
+def main():
+    company_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tmp}/conditional.db"
+        seed(os.environ['DATABASE_URL'], company_count)
+
+        from fastapi.testclient import TestClient
+        from app.compression import brotli
+        from app.main import app
+
+        print(f"{company_count} companies, median of {REQUESTS} requests")
+        encodings = [('identity', 'identity'), ('gzip', 'gzip'), ('brotli', 'br')]
+        if brotli is None:
+            print("brotli is not installed (pip install -r requirements.txt), so only gzip is measured")
+            encodings.pop()
+        with TestClient(app) as client:
+            for path in ('/api/companies', '/api/companies/1/details'):
+                print(path)
+                etag = None
+                for label, encoding in encodings:
+                    headers = {'Accept-Encoding': encoding}
+                    with client.stream('GET', path, headers=headers) as resp:
+                        wire = sum(len(chunk) for chunk in resp.iter_raw())
+                        etag = resp.headers.get('etag')
+                        actual = resp.headers.get('content-encoding', 'identity')
+                    latency = statistics.median(
+                        _timed(client, path, headers) for _ in range(REQUESTS)
+                    )
+                    print(f"  {label:9s} ({actual:8s}) {wire:9d} bytes  {latency:7.2f} ms")
+
+                headers = {'Accept-Encoding': 'gzip', 'If-None-Match': etag}
+                resp = client.get(path, headers=headers)
+                latency = statistics.median(_timed(client, path, headers) for _ in range(REQUESTS))
+                print(f"  {'304':9s} ({resp.status_code:<8d}) {len(resp.content):9d} bytes  {latency:7.2f} ms")
+
+
+def _timed(client, path: str, headers: dict) -> float:
+    started = time.perf_counter()
+    client.get(path, headers=headers)
+    return (time.perf_counter() - started) * 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark ESG keyword detection: per-keyword substring scans vs the single-pass matcher
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+
+from app.models import ESGEventResponse
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.simple_nlp import SimpleNLPService
+
+
+def legacy_detect_esg_events(service, text):
+    """The original detection loop: one substring scan per keyword, rescans per hit"""
+    events = []
+    text_lower = text.lower()
+
+    for category, keywords in service.esg_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                # Context lowercases and searches the text again
+                context_lower = text.lower()
+                start_idx = context_lower.find(keyword)
+                context = text[max(0, start_idx - 100):min(len(text), start_idx + len(keyword) + 100)].strip()
+
+                # Severity scans every indicator list over the whole text again
+                severity = 0.5
+                for word in service.severity_keywords['high']:
+                    if word in text_lower:
+                        severity = max(severity, 0.8)
+                for word in service.severity_keywords['medium']:
+                    if word in text_lower:
+                        severity = max(severity, 0.6)
+                for word in service.severity_keywords['low']:
+                    if word in text_lower:
+                        severity = min(severity, 0.3)
+
+                events.append(ESGEventResponse(
+                    event_type=f"{category}_{keyword.replace(' ', '_')}",
+                    description=context,
+                    severity=severity
+                ))
+
+    return service._deduplicate_events(events)
+
+
+def build_service(extra_keywords):
+    """Create a service whose taxonomy is extended with synthetic keywords"""
+    service = SimpleNLPService()
+    categories = list(service.esg_keywords)
+    for i, keyword in enumerate(extra_keywords):
+        service.esg_keywords[categories[i % len(categories)]].append(keyword)
+
+    service.keyword_matcher = KeywordMatcher(
+        [keyword for keywords in service.esg_keywords.values() for keyword in keywords] +
+        [word for words in service.severity_keywords.values() for word in words]
+    )
+    return service
+
+
+def build_corpus(service, n_articles, words_per_article, rng):
+    """Generate long filings that mention a sample of the taxonomy"""
+    vocabulary = ['the', 'company', 'reported', 'quarterly', 'results', 'after', 'regulators',
+                  'reviewed', 'operations', 'across', 'several', 'regions', 'and', 'markets']
+    keywords = [keyword for keywords in service.esg_keywords.values() for keyword in keywords]
+    indicators = [word for words in service.severity_keywords.values() for word in words]
+
+    corpus = []
+    for _ in range(n_articles):
+        words = [rng.choice(vocabulary) for _ in range(words_per_article)]
+        for _ in range(words_per_article // 50):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords + indicators))
+        corpus.append(' '.join(words).capitalize() + '.')
+    return corpus
+
+
+def time_it(func, corpus):
+    start = time.perf_counter()
+    results = [func(text) for text in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+    rng = random.Random(42)
+    n_articles = 200
+    words_per_article = 2000
+
+    print(f"{'keywords':>10} {'legacy (s)':>12} {'matcher (s)':>12} {'speedup':>9}")
+    for n_extra in (0, 100, 500, 2000):
+        extra = [f"esg term {i:05d}" for i in range(n_extra)]
+        service = build_service(extra)
+        corpus = build_corpus(service, n_articles, words_per_article, rng)
+
+        legacy_time, legacy_results = time_it(lambda text: legacy_detect_esg_events(service, text), corpus)
+        matcher_time, matcher_results = time_it(service.detect_esg_events, corpus)
+
+        if legacy_results != matcher_results:
+            raise SystemExit("Matcher output differs from the legacy implementation")
+
+        n_keywords = sum(len(keywords) for keywords in service.esg_keywords.values())
+        print(f"{n_keywords:>10} {legacy_time:>12.3f} {matcher_time:>12.3f} {legacy_time / matcher_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
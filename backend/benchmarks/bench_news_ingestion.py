@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Fetch many companies' feeds from a local stand-in news server and show that the
+async ingestion layer fetches them concurrently without stalling the event loop
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from app.services.news_service import NewsService, RSSNewsSource, HTMLNewsSource
+
+RESPONSE_DELAY = 0.2  # Simulated upstream latency per request (seconds)
+ARTICLES_PER_FEED = 5
+
+
+class StandInNewsHandler(BaseHTTPRequestHandler):
+    """Serves slow RSS and HTML listings; /flaky fails the first request for each company"""
+
+    failed_once = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        company = parse_qs(parsed.query).get('q', ['unknown'])[0]
+        time.sleep(RESPONSE_DELAY)
+
+        if parsed.path == '/flaky':
+            with self.lock:
+                first_attempt = company not in self.failed_once
+                self.failed_once.add(company)
+            if first_attempt:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+        if parsed.path in ('/rss', '/flaky'):
+            items = ''.join(
+                f"<item><title>{company} update {i}</title><link>https://news.test/{company}/{i}</link>"
+                f"<description>&lt;p&gt;{company} workers strike over safety concerns&lt;/p&gt;</description>"
+                f"<pubDate>Mon, 06 Sep 2021 16:{i:02d}:00 GMT</pubDate></item>"
+                for i in range(ARTICLES_PER_FEED)
+            )
+            body = f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+            content_type = 'application/rss+xml'
+        else:
+            items = ''.join(
+                f'<article><h2>{company} filing {i}</h2><a href="/{company}/filing-{i}">read</a>'
+                f'<p>{company} faces a regulatory fine</p><time datetime="2021-09-0{i + 1}T10:00:00">x</time></article>'
+                for i in range(ARTICLES_PER_FEED)
+            )
+            body = f"<html><body>{items}</body></html>"
+            content_type = 'text/html'
+
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def measure(news_service, companies):
+    """Fetch all companies concurrently while a heartbeat task measures event loop lag"""
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    ticker = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    results = await asyncio.gather(*[news_service.fetch_company_news(company, limit=20) for company in companies])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+    await news_service.aclose()
+
+    return elapsed, results, max(lags) * 1000
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInNewsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    companies = [f"company{i}" for i in range(100)]
+    news_service = NewsService(sources=[
+        RSSNewsSource(base_url + "/rss?q={company}"),
+        HTMLNewsSource(base_url + "/html?q={company}"),
+        RSSNewsSource(base_url + "/flaky?q={company}"),
+    ])
+    news_service.per_host_limit = 64
+    news_service.backoff_base = 0.05
+
+    elapsed, results, max_lag = asyncio.run(measure(news_service, companies))
+    requests_made = len(companies) * (len(news_service.sources) + 1)  # +1 for each flaky retry
+    articles = sum(len(result) for result in results)
+
+    print(f"Companies fetched:        {len(companies)} ({requests_made} HTTP requests, {articles} articles)")
+    print(f"Sequential lower bound:   {requests_made * RESPONSE_DELAY:.1f}s")
+    print(f"Concurrent wall time:     {elapsed:.2f}s")
+    print(f"Max event loop stall:     {max_lag:.1f} ms")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare per-article NLP calls (fresh TextBlob and a full spaCy pipeline per article)
+with NLPService.analyze_batch streaming the same articles through nlp.pipe
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+
+import spacy
+from textblob import TextBlob
+
+from app.services.nlp_service import NLPService
+
+SENTENCES = [
+    "{company} is facing renewed labor disputes as workers demand better working conditions.",
+    "Regulators announced a regulatory fine against {company} over emissions reporting.",
+    "{company} unveiled a renewable energy initiative across its European plants.",
+    "Shareholders of {company} filed a lawsuit alleging fraud by the board.",
+    "Analysts expect {company} to report strong quarterly earnings in London.",
+    "{company} was praised for diversity programs and transparency in executive compensation.",
+    "An oil spill near a {company} facility raised biodiversity concerns.",
+]
+COMPANIES = ["Tesla", "Exxon Mobil", "Amazon", "Nike", "BP", "Apple", "Unilever"]
+
+
+def make_articles(count: int, rng: random.Random):
+    return [
+        " ".join(rng.choice(SENTENCES).format(company=rng.choice(COMPANIES)) for _ in range(rng.randint(3, 8)))
+        for _ in range(count)
+    ]
+
+
+def per_article(service: NLPService, full_nlp, texts):
+    """The original path: a TextBlob and a full pipeline run for every article"""
+    results = []
+    for text in texts:
+        doc = full_nlp(text) if full_nlp is not None else None
+        results.append({
+            'sentiment_score': TextBlob(text).sentiment.polarity,
+            'events': service.detect_esg_events(text),
+            'entities': service._entity_spans(doc) if doc is not None else []
+        })
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    texts = make_articles(count, random.Random(42))
+
+    service = NLPService()
+    if service.nlp is None:
+        print("Entity spans are skipped without a spaCy model; timings cover sentiment and events only")
+        full_nlp = None
+    else:
+        full_nlp = spacy.load(os.getenv("NLP_SPACY_MODEL", "en_core_web_sm"))
+        print(f"Full pipeline:    {', '.join(full_nlp.pipe_names)}")
+        print(f"Batched pipeline: {', '.join(service.nlp.pipe_names)} (batch_size={service.batch_size}, n_process={service.n_process})")
+
+    # Warm up lexicons and models
+    service.analyze_batch(texts[:10])
+    per_article(service, full_nlp, texts[:10])
+
+    started = time.perf_counter()
+    expected = per_article(service, full_nlp, texts)
+    per_article_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = service.analyze_batch(texts)
+    batched_time = time.perf_counter() - started
+
+    assert [r['sentiment_score'] for r in batched] == [r['sentiment_score'] for r in expected]
+    assert [r['events'] for r in batched] == [r['events'] for r in expected]
+    assert [r['entities'] for r in batched] == [r['entities'] for r in expected]
+
+    print(f"Articles:         {count}")
+    print(f"Per-article:      {per_article_time:7.2f}s  ({count / per_article_time:8.0f} articles/s)")
+    print(f"Batched:          {batched_time:7.2f}s  ({count / batched_time:8.0f} articles/s)")
+    print(f"Speedup:          {per_article_time / batched_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
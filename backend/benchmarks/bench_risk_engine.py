@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Score a synthetic portfolio with calculate_risk_scores one company at a time and with the
+vectorized risk engine, check the results are identical, then time a full stored re-score
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+from app.database import Base, Company, Article, ESGEvent
+from app.models import ESGEventResponse
+from app.services.risk_engine import category_codes, score_portfolio, score_stored_companies
+from app.services.simple_nlp import SimpleNLPService
+
+EVENT_TYPES = [
+    'environmental_emissions', 'environmental_oil_spill', 'social_labor_strike', 'social_layoffs',
+    'governance_lawsuit', 'governance_fraud', 'other_mention'
+]
+SEVERITIES = [0.3, 0.5, 0.6, 0.8]
+
+
+def make_portfolio(company_count: int, rng: random.Random):
+    """Per company: article sentiments and (event_type, severity) pairs, some companies without events"""
+    portfolio = []
+    for _ in range(company_count):
+        sentiments = [rng.uniform(-1, 1) for _ in range(rng.randint(1, 20))]
+        events = [(rng.choice(EVENT_TYPES), rng.choice(SEVERITIES)) for _ in range(rng.choice([0, 1, 3, 8, 15]))]
+        portfolio.append((sentiments, events))
+    return portfolio
+
+
+def main():
+    company_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    portfolio = make_portfolio(company_count, random.Random(7))
+    nlp_service = SimpleNLPService()
+
+    # Per-company inputs as calculate_risk_scores receives them
+    per_company = [
+        (
+            [{'sentiment_score': sentiment} for sentiment in sentiments],
+            [ESGEventResponse(event_type=event_type, description='', severity=severity) for event_type, severity in events]
+        )
+        for sentiments, events in portfolio
+    ]
+
+    started = time.perf_counter()
+    expected = [nlp_service.calculate_risk_scores(articles, events) for articles, events in per_company]
+    loop_time = time.perf_counter() - started
+
+    # The same data as flat columns
+    article_company = np.repeat(np.arange(company_count), [len(sentiments) for sentiments, _ in portfolio])
+    article_sentiment = np.array([s for sentiments, _ in portfolio for s in sentiments])
+    event_company = np.repeat(np.arange(company_count), [len(events) for _, events in portfolio])
+    event_category = category_codes([event_type for _, events in portfolio for event_type, _ in events])
+    event_severity = np.array([severity for _, events in portfolio for _, severity in events])
+
+    started = time.perf_counter()
+    scores = score_portfolio(company_count, article_company, article_sentiment, event_company, event_category, event_severity)
+    vector_time = time.perf_counter() - started
+
+    for name in scores:
+        assert scores[name].tolist() == [result[name] for result in expected], f"{name} differs"
+
+    print(f"Companies:              {company_count} ({len(article_sentiment)} articles, {len(event_severity)} events)")
+    print(f"Per-company loop:       {loop_time * 1000:9.1f} ms")
+    print(f"Vectorized:             {vector_time * 1000:9.1f} ms  ({loop_time / vector_time:.0f}x, results identical)")
+
+    # Full re-score from a stored database
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/rescore.db")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Company), [{'name': f'Company {i}', 'name_key': f'company {i}'} for i in range(company_count)])
+            article_rows, event_rows = [], []
+            for company_index, (sentiments, events) in enumerate(portfolio):
+                first_article = len(article_rows) + 1
+                for sentiment in sentiments:
+                    article_rows.append({
+                        'company_id': company_index + 1, 'title': 't', 'content': 'c',
+                        'url': f'https://example.com/{len(article_rows)}', 'sentiment_score': sentiment
+                    })
+                for event_type, severity in events:
+                    event_rows.append({
+                        'article_id': first_article, 'event_type': event_type, 'description': '', 'severity': severity
+                    })
+            conn.execute(insert(Article), article_rows)
+            conn.execute(insert(ESGEvent), event_rows)
+
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            rows = score_stored_companies(conn)
+        stored_time = time.perf_counter() - started
+        engine.dispose()
+
+    assert [row['overall_score'] for row in rows] == [result['overall_score'] for result in expected]
+    print(f"Stored re-score:        {stored_time * 1000:9.1f} ms  (load + score {len(rows)} companies)")
+
+
+if __name__ == "__main__":
+    main()
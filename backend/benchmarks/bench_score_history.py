@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Time a company's risk score history at day, week and month resolution: aggregating its raw
+RiskScore rows with GROUP BY versus reading the maintained rollups, for growing history lengths
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from app.database import create_database_engine, Company, RiskScore
+from app.migrations import run_migrations
+from app.services.score_history import history_point, history_query, rebuild_rollups
+
+COMPANIES = 100
+SCORES_PER_DAY = 4
+QUERIES = 20
+
+# Bucket expressions matching score_history.bucket_start, for the GROUP BY baseline
+RAW_BUCKETS = {
+    'day': "date(calculated_at)",
+    'week': "date(calculated_at, 'weekday 0', '-6 days')",
+    'month': "date(calculated_at, 'start of month')",
+}
+
+
+def seed(engine, days: int):
+    run_migrations(engine)
+    rng = random.Random(5)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Company), [{'name': f'Company {i}', 'name_key': f'company {i}'} for i in range(COMPANIES)])
+        for company_id in range(1, COMPANIES + 1):
+            conn.execute(insert(RiskScore), [
+                {
+                    'company_id': company_id,
+                    'calculated_at': now - timedelta(days=day, hours=slot * 24 / SCORES_PER_DAY),
+                    'overall_score': rng.random(), 'environmental_score': rng.random(),
+                    'social_score': rng.random(), 'governance_score': rng.random()
+                }
+                for day in range(days) for slot in range(SCORES_PER_DAY)
+            ])
+        started = time.perf_counter()
+        buckets = rebuild_rollups(conn)
+    return buckets, time.perf_counter() - started
+
+
+def raw_history(conn, company_id: int, resolution: str):
+    bucket = RAW_BUCKETS[resolution]
+    aggregates = ', '.join(
+        f"MIN({score}), MAX({score}), AVG({score})"
+        for score in ('overall_score', 'environmental_score', 'social_score', 'governance_score')
+    )
+    return conn.execute(text(
+        f"SELECT {bucket} AS bucket, COUNT(*), {aggregates} FROM risk_scores "
+        f"WHERE company_id = :company_id GROUP BY bucket ORDER BY bucket"
+    ), {'company_id': company_id}).all()
+
+
+def rollup_history(conn, company_id: int, resolution: str):
+    rows = conn.execute(history_query(company_id, resolution, None, None, 5000)).all()
+    return [history_point(row) for row in reversed(rows)]
+
+
+def timed(run) -> float:
+    """Median milliseconds per call"""
+    timings = []
+    for _ in range(QUERIES):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    years = [float(arg) for arg in sys.argv[1:]] or [1, 5]
+    print(f"{COMPANIES} companies, {SCORES_PER_DAY} scores per company per day")
+    print(f"{'years':>6s} {'resolution':10s} {'points':>7s} {'raw rows':>9s} {'scan (ms)':>10s} {'rollup (ms)':>12s} {'us/point':>9s}")
+
+    for length in years:
+        days = int(length * 365)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_database_engine(f"sqlite:///{tmp}/history.db")
+            buckets, build = seed(engine, days)
+            company_id = COMPANIES // 2
+            with engine.connect() as conn:
+                conn.execute(text("ANALYZE"))
+                for resolution in ('day', 'week', 'month'):
+                    points = rollup_history(conn, company_id, resolution)
+                    assert len(points) == len(raw_history(conn, company_id, resolution))
+                    scan = timed(lambda: raw_history(conn, company_id, resolution))
+                    rollup = timed(lambda: rollup_history(conn, company_id, resolution))
+                    print(
+                        f"{length:6g} {resolution:10s} {len(points):7d} {days * SCORES_PER_DAY:9d} "
+                        f"{scan:10.2f} {rollup:12.2f} {rollup * 1000 / len(points):9.1f}"
+                    )
+            print(f"{length:6g} {'rebuild':10s} {buckets:7d} buckets for all companies in {build:.1f}s")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/search latency over a large synthetic article corpus
+
+Usage: python benchmarks/bench_search.py [number_of_articles]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import run_migrations
+from app.services.search_service import SearchService
+
+# Topic words plus a long tail of filler, drawn with a Zipf-like distribution as in real text
+WORDS = ['company', 'reported', 'quarterly', 'results', 'regulators', 'reviewed', 'operations',
+         'workers', 'union', 'safety', 'emissions', 'carbon', 'lawsuit', 'board', 'audit',
+         'refinery', 'pipeline', 'community', 'wages', 'investors', 'market', 'growth']
+VOCABULARY = [f"term{i}" for i in range(20000)]
+for position, word in enumerate(WORDS):
+    VOCABULARY.insert(50 + position * 40, word)
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+PHRASES = ['oil spill', 'labor strike', 'regulatory fine', 'data breach', 'child labor']
+
+
+def seed(engine, n_articles, n_companies=2000, batch_size=10000):
+    """Insert articles and one event per article; the triggers index them as they go"""
+    rng = random.Random(7)
+    now = datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO companies (id, name, name_key) VALUES (:id, :name, :name)"),
+            [{'id': i, 'name': f"company {i}"} for i in range(1, n_companies + 1)]
+        )
+
+    for start in range(0, n_articles, batch_size):
+        articles, events = [], []
+        for article_id in range(start + 1, min(start + batch_size, n_articles) + 1):
+            words = rng.choices(VOCABULARY, weights=WEIGHTS, k=60)
+            if rng.random() < 0.02:
+                words.insert(rng.randrange(len(words)), rng.choice(PHRASES))
+            articles.append({
+                'id': article_id,
+                'company_id': rng.randint(1, n_companies),
+                'title': ' '.join(rng.choices(VOCABULARY, weights=WEIGHTS, k=8)),
+                'content': ' '.join(words),
+                'published_at': now - timedelta(days=rng.randint(0, 365))
+            })
+            events.append({
+                'article_id': article_id,
+                'event_type': rng.choice(['environmental_emissions', 'social_union', 'governance_lawsuit']),
+                'description': ' '.join(words[:20])
+            })
+
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO articles (id, company_id, title, content, url, published_at, sentiment_score) "
+                "VALUES (:id, :company_id, :title, :content, 'https://example.com', :published_at, 0.0)"
+            ), articles)
+            conn.execute(text(
+                "INSERT INTO esg_events (article_id, event_type, description, severity) "
+                "VALUES (:article_id, :event_type, :description, 0.5)"
+            ), events)
+
+
+def main():
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    search_service = SearchService()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/search.db")
+        run_migrations(engine)
+
+        start = time.perf_counter()
+        seed(engine, n_articles)
+        print(f"Indexed {n_articles} articles and events in {time.perf_counter() - start:.1f}s")
+
+        db = sessionmaker(bind=engine)()
+        cases = {
+            'phrase': dict(query='"oil spill"'),
+            'phrase, last 30 days': dict(query='"oil spill"', since=datetime.now() - timedelta(days=30)),
+            'term, social events': dict(query='safety', kind='event', category='social'),
+            'two terms, page 3': dict(query='carbon audit', offset=40),
+        }
+
+        for name, params in cases.items():
+            latencies = []
+            for _ in range(20):
+                started = time.perf_counter()
+                search_service.search(db, limit=20, **params)
+                latencies.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<24} median {statistics.median(latencies):8.2f} ms   max {max(latencies):8.2f} ms")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
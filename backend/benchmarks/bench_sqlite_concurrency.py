@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write benchmark for the SQLite storage layer: writer processes commit analyses
+(articles plus a RiskScore, which updates the leaderboard) while reader processes run the
+/companies leaderboard query. Compares a plain engine (rollback journal, synchronous=FULL,
+one engine for everything) with the tuned write engine and read-only engine from app.database.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_database_engine, Company, CompanyLatestScore, Article, RiskScore
+from app.migrations import run_migrations
+
+COMPANIES = 500
+WRITERS = 2
+READERS = 4
+DURATION = 5.0
+
+
+def seed(engine):
+    run_migrations(engine)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(7)
+    with Session() as db:
+        companies = [Company(name=f'Company {i}', sector='Technology') for i in range(COMPANIES)]
+        db.add_all(companies)
+        db.flush()
+        for company in companies:
+            db.add(RiskScore(company_id=company.id, **random_scores(rng)))
+        db.commit()
+
+
+def random_scores(rng: random.Random) -> dict:
+    return {field: round(rng.random(), 3) for field in ('overall_score', 'environmental_score', 'social_score', 'governance_score')}
+
+
+def write_analysis(Session, rng: random.Random, sequence: int):
+    """One analysis commit: a few articles and a new RiskScore for a random company"""
+    company_id = rng.randint(1, COMPANIES)
+    with Session() as db:
+        for article in range(3):
+            db.add(Article(
+                title=f'Article {sequence}-{article}',
+                content='The company was fined for environmental violations. ' * 20,
+                url=f'https://example.com/{sequence}/{article}',
+                canonical_url=f'https://example.com/{sequence}/{article}',
+                content_hash=f'{sequence:032x}{article:032x}',
+                published_at=datetime.utcnow(),
+                sentiment_score=rng.uniform(-1, 1),
+                company_id=company_id
+            ))
+        db.add(RiskScore(company_id=company_id, **random_scores(rng)))
+        db.commit()
+
+
+def read_leaderboard(Session):
+    """The /companies query: top companies by overall score with their names"""
+    with Session() as db:
+        return db.execute(
+            select(Company.name, CompanyLatestScore)
+            .join(Company, Company.id == CompanyLatestScore.company_id)
+            .order_by(CompanyLatestScore.overall_score.desc())
+            .limit(50)
+        ).all()
+
+
+def make_sessions(url: str, tuned: bool, read_only: bool):
+    if not tuned:
+        # The original setup: default journal and sync mode, reads and writes share one engine
+        return sessionmaker(bind=create_engine(url, connect_args={"check_same_thread": False}))
+    return sessionmaker(bind=create_database_engine(url, read_only=read_only))
+
+
+def wait_until(start: float) -> float:
+    """Start every process together once they have all imported, returning the time to stop"""
+    time.sleep(max(0.0, start - time.time()))
+    return start + DURATION
+
+
+def writer(url: str, tuned: bool, number: int, start: float, results):
+    Session = make_sessions(url, tuned, read_only=False)
+    deadline = wait_until(start)
+    rng = random.Random(number)
+    sequence = number * 10_000_000
+    writes = errors = 0
+    while time.time() < deadline:
+        try:
+            write_analysis(Session, rng, sequence)
+            writes += 1
+        except Exception:
+            errors += 1
+        sequence += 1
+    results.put(('write', writes, errors, []))
+
+
+def reader(url: str, tuned: bool, start: float, results):
+    Session = make_sessions(url, tuned, read_only=True)
+    deadline = wait_until(start)
+    timings = []
+    errors = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            read_leaderboard(Session)
+            timings.append(time.perf_counter() - started)
+        except Exception:
+            errors += 1
+    results.put(('read', len(timings), errors, timings))
+
+
+def run(label: str, url: str, tuned: bool):
+    """Writers and readers run in separate processes, like API workers sharing one database file"""
+    results = multiprocessing.Queue()
+    start = time.time() + 2.0
+    processes = [multiprocessing.Process(target=writer, args=(url, tuned, i, start, results)) for i in range(WRITERS)]
+    processes += [multiprocessing.Process(target=reader, args=(url, tuned, start, results)) for _ in range(READERS)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    writes = sum(count for kind, count, _, _ in reports if kind == 'write')
+    errors = sum(errors for _, _, errors, _ in reports)
+    read_timings = sorted(timing for _, _, _, timings in reports for timing in timings)
+    p99 = read_timings[int(len(read_timings) * 0.99)] if read_timings else 0
+    print(
+        f"{label:10s} {writes / DURATION:10.0f} {len(read_timings) / DURATION:10.0f} "
+        f"{statistics.median(read_timings) * 1000 if read_timings else 0:10.2f} {p99 * 1000:10.2f} {errors:8d}"
+    )
+
+
+def main():
+    global COMPANIES, DURATION
+    if len(sys.argv) > 1:
+        DURATION = float(sys.argv[1])
+    if len(sys.argv) > 2:
+        COMPANIES = int(sys.argv[2])
+
+    print(f"{COMPANIES} companies, {WRITERS} writer and {READERS} reader processes, {DURATION:.0f}s per engine")
+    print(f"{'engine':10s} {'writes/s':>10s} {'reads/s':>10s} {'read p50':>10s} {'read p99':>10s} {'errors':>8s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuned in (('default', False), ('tuned', True)):
+            url = f"sqlite:///{os.path.join(tmp, label + '.db')}"
+            engine = make_sessions(url, tuned, read_only=False).kw['bind']
+            seed(engine)
+            engine.dispose()
+            run(label, url, tuned)
+
+
+if __name__ == "__main__":
+    main()
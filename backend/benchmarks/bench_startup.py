@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Start the API with a slow-loading stand-in NLP model under each NLP_WARMUP mode and report
+how long /health, /ready and the first analysis take from process launch
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socket
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from app.services.simple_nlp import SimpleNLPService
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_LOAD_SECONDS = 3.0  # Roughly what loading a spaCy pipeline costs
+
+
+class SlowLoadingNLPService(SimpleNLPService):
+    """SimpleNLPService that takes as long to construct as a real model takes to load"""
+
+    def __init__(self):
+        time.sleep(MODEL_LOAD_SECONDS)
+        super().__init__()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(client: httpx.Client, path: str, launched: float, timeout: float = 60.0) -> float:
+    """Seconds from launch until path answers 200"""
+    while time.perf_counter() - launched < timeout:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - launched
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{path} not ready after {timeout}s")
+
+
+def measure(mode: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            NLP_SERVICE="bench_startup:SlowLoadingNLPService",
+            NLP_EXECUTOR="thread",
+            NLP_WARMUP=mode,
+            PYTHONPATH=os.pathsep.join([BACKEND_DIR, os.path.join(BACKEND_DIR, 'benchmarks')])
+        )
+        launched = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+            cwd=BACKEND_DIR, env=env
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+                health = wait_for(client, '/health', launched)
+                ready = wait_for(client, '/ready', launched)
+
+                started = time.perf_counter()
+                client.get('/api/analyze', params={'company': 'Tesla'}).raise_for_status()
+                first_analysis = time.perf_counter() - started
+
+                timings = client.get('/ready').json()['timings']
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {'health': health, 'ready': ready, 'first_analysis': first_analysis, 'timings': timings}
+
+
+def main():
+    modes = sys.argv[1:] or ['lazy', 'background', 'preload']
+    print(f"Stand-in model load time: {MODEL_LOAD_SECONDS:.1f}s")
+    for mode in modes:
+        result = measure(mode)
+        timings = result['timings']
+        print(
+            f"{mode:10s} /health {result['health']:5.2f}s  /ready {result['ready']:5.2f}s"
+            f"  first analysis {result['first_analysis'] * 1000:7.1f} ms"
+            f"  | import {timings.get('import', 0):.2f}s  migrations {timings.get('migrations', 0):.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
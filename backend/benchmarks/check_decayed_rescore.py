@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Run the nightly re-score job with RISK_SCORING=decayed and check that the leaderboard it leaves
+holds the decayed scores the API served, not scores from the analysis-window formula
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from datetime import datetime, timedelta
+
+TOLERANCE = 1e-9
+COMPANIES = {
+    # Recent negative news outweighs older positive news only when articles are decayed by age
+    'Acme Energy': [(1, 'Acme Energy fined for a major oil spill and toxic waste leak.'), (60, 'Acme Energy praised for record profits.')],
+    'Globex': [(2, 'Globex faces a labor strike over unsafe working conditions.'), (90, 'Globex wins a sustainability award.')],
+    'Initech': [(3, 'Initech executives charged with fraud and bribery.'), (45, 'Initech reports strong growth.')],
+}
+
+
+def leaderboard(client) -> dict:
+    return {
+        row['name']: {name: row[name] for name in ('overall_score', 'environmental_score', 'social_score', 'governance_score')}
+        for row in client.get('/api/companies').json()
+    }
+
+
+def differences(expected: dict, actual: dict) -> list:
+    return [
+        f"{company} {name}: {expected[company][name]:.6f} != {actual.get(company, {}).get(name)}"
+        for company in expected for name in expected[company]
+        if company not in actual or abs(expected[company][name] - actual[company][name]) > TOLERANCE
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tmp}/rescore.db"
+        os.environ['RISK_SCORING'] = 'decayed'
+        os.environ['JOB_WORKERS'] = '0'
+
+        from fastapi.testclient import TestClient
+        from app.database import engine
+        from app.main import app
+        from app.services.registry import services
+        from app.services.risk_engine import score_stored_companies
+        from rescore_companies import rescore
+
+        now = datetime.utcnow()
+
+        async def fetch_company_news(company: str, limit: int = 10):
+            return [
+                {'title': f'{company} news {age}', 'content': content, 'url': f'https://example.com/{company}/{age}', 'published_at': now - timedelta(days=age)}
+                for age, content in COMPANIES[company]
+            ]
+
+        with TestClient(app) as client:
+            services.news_service.fetch_company_news = fetch_company_news
+            for company in COMPANIES:
+                assert client.get('/api/analyze', params={'company': company}).status_code == 200
+            served = leaderboard(client)
+
+            with engine.connect() as conn:
+                window = {row['company_id']: row['overall_score'] for row in score_stored_companies(conn)}
+            rescore()
+            rescored = leaderboard(client)
+
+    failures = differences(served, rescored)
+    print(f"🏢 Companies: {len(rescored)}")
+    print(f"📉 Decayed overall scores: {sorted(round(scores['overall_score'], 4) for scores in rescored.values())}")
+    print(f"📊 Window overall scores:  {sorted(round(score, 4) for score in window.values())}")
+    if failures:
+        print("❌ Leaderboard after the re-score differs from the decayed scores served by the API:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("✅ Re-score kept the decayed scores on the leaderboard")
+
+
+if __name__ == "__main__":
+    main()
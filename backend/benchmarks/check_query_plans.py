@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Check that the hot lookup queries are answered from indexes rather than table scans
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import normalize_company_name, AnalysisJob, Company, CompanyLatestScore, Article, ESGEvent, RiskScore, RiskScoreRollup
+from app.migrations import run_migrations
+from app.routers.analyze import articles_query, companies_query
+from app.services.leaderboard import LEADERBOARD_SCORES
+
+
+def seed(db, n_companies=200, n_articles=20):
+    """Insert enough rows that the planner prefers indexes over scans"""
+    now = datetime.utcnow()
+    for i in range(n_companies):
+        company = Company(name=f"Company {i}", sector=f"Sector {i % 10}")
+        db.add(company)
+        for j in range(n_articles):
+            db.add(Article(
+                company=company,
+                title=f"Article {j}",
+                content="Workers strike over safety concerns",
+                url=f"https://example.com/{i}/{j}",
+                published_at=now - timedelta(days=j),
+                sentiment_score=0.0,
+                events=[ESGEvent(event_type="social_union", description="union", severity=0.8)]
+            ))
+        db.add(RiskScore(company=company, overall_score=0.5, environmental_score=0.5,
+                         social_score=0.5, governance_score=0.5, calculated_at=now - timedelta(days=i % 7)))
+    db.commit()
+    db.execute(text("ANALYZE"))
+
+
+def query_plan(db, query):
+    """Return the EXPLAIN QUERY PLAN details for an ORM query or a select()"""
+    statement = getattr(query, 'statement', query)
+    sql = str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/plans.db")
+        run_migrations(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db)
+
+        hot_queries = {
+            'company by name key': (
+                db.query(Company).filter(Company.name_key == normalize_company_name("Company 42")),
+                'ix_companies_name_key'
+            ),
+            'latest risk score': (
+                db.query(RiskScore).filter(RiskScore.company_id == 42)
+                .order_by(RiskScore.calculated_at.desc()),
+                'ix_risk_scores_company_calculated'
+            ),
+            'article page': (articles_query(42, None, 50), 'ix_articles_company_published'),
+            'article page after cursor': (
+                articles_query(42, (datetime(2024, 1, 1), 1000), 50), 'ix_articles_company_published'
+            ),
+            'events for articles': (
+                db.query(ESGEvent).filter(ESGEvent.article_id.in_([1, 2, 3])),
+                'ix_esg_events_article_id'
+            ),
+            'next queued job': (
+                db.query(AnalysisJob.id).filter(AnalysisJob.status == 'queued').order_by(AnalysisJob.id).limit(1),
+                'ix_analysis_jobs_status_id'
+            ),
+            'stale companies': (
+                db.query(CompanyLatestScore.company_id).filter(CompanyLatestScore.calculated_at < datetime(2024, 1, 1))
+                .order_by(CompanyLatestScore.calculated_at).limit(100),
+                'ix_latest_scores_calculated'
+            ),
+            'score history': (
+                db.query(RiskScoreRollup).filter(RiskScoreRollup.company_id == 42, RiskScoreRollup.resolution == 'month')
+                .order_by(RiskScoreRollup.bucket_start.desc()).limit(120),
+                'sqlite_autoindex_risk_score_rollups_1'
+            ),
+            'expired raw scores': (
+                db.query(RiskScore.id).filter(RiskScore.calculated_at < datetime(2024, 1, 1)),
+                'ix_risk_scores_calculated'
+            ),
+        }
+
+        # Every score-sorted /companies page the route builds, in both directions, with and without a sector
+        for score in LEADERBOARD_SCORES:
+            category = score.removesuffix('_score')
+            for order in ('asc', 'desc'):
+                hot_queries[f'companies {category} {order}'] = (
+                    companies_query(score, order, None, 50, 0), f'ix_latest_scores_{category}'
+                )
+                hot_queries[f'companies sector {category} {order}'] = (
+                    companies_query(score, order, "Sector 3", 50, 0), f'ix_latest_scores_sector_{category}'
+                )
+
+        failures = 0
+        for name, (query, index_name) in hot_queries.items():
+            plan = query_plan(db, query)
+            # An index that only narrows the rows still leaves a sort if ORDER BY needs a temp B-tree
+            uses_index = any(index_name in step for step in plan) and not any('TEMP B-TREE' in step for step in plan)
+            failures += not uses_index
+            print(f"{'ok' if uses_index else 'FAIL':<5} {name:<30} {' | '.join(plan)}")
+
+        db.close()
+        engine.dispose()
+
+    if failures:
+        raise SystemExit(f"{failures} hot queries do not use their index")
+
+
+if __name__ == "__main__":
+    main()
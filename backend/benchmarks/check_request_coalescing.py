@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Fire N parallel /api/analyze requests for the same company, with differing spellings and sectors, at
+a live API server and check that they were served by one analysis: one RiskScore row, one set of
+articles, N-1 coalesced
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import sqlite3
+import tempfile
+import time
+
+import httpx
+
+from load_test_nlp_offload import free_port, start_server
+
+
+async def fire(base_url: str, company: str, requests: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for _ in range(100):
+            try:
+                await client.get('/health')
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        # Spellings and sectors differ, but every request names the same company
+        names = [company, company.upper(), f'  {company.lower()} '] * (requests // 3) + [company] * (requests % 3)
+        sectors = [None, 'Automotive', 'Energy']
+        responses = await asyncio.gather(*[
+            client.get('/api/analyze', params={'company': name, **({'sector': sectors[i % 3]} if sectors[i % 3] else {})})
+            for i, name in enumerate(names)
+        ])
+        elapsed = time.perf_counter() - started
+
+        stats = (await client.get('/api/cache/stats')).json()['single_flight']
+        return responses, elapsed, stats
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    company = 'Tesla'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'coalescing.db')
+        port = free_port()
+        server = start_server('thread', database_path, port)
+        try:
+            responses, elapsed, stats = asyncio.run(fire(f"http://127.0.0.1:{port}", company, requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+        with sqlite3.connect(database_path) as conn:
+            risk_scores = conn.execute("SELECT COUNT(*) FROM risk_scores").fetchone()[0]
+            articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            companies = conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    statuses = sorted({response.status_code for response in responses})
+    scores = {response.json()['score'] for response in responses if response.status_code == 200}
+    print(f"{requests} parallel requests in {elapsed * 1000:.0f} ms, statuses {statuses}, distinct scores {len(scores)}")
+    print(f"Rows written: {companies} companies, {articles} articles, {risk_scores} risk scores")
+    print(f"Single flight: {stats['leaders']} analyses, {stats['coalesced']} coalesced")
+
+    if statuses != [200] or risk_scores != 1 or companies != 1 or stats['coalesced'] != requests - 1:
+        raise SystemExit("Parallel requests were not coalesced into one analysis")
+    print("✅ One analysis served every request")
+
+
+if __name__ == "__main__":
+    main()
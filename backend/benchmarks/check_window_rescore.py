@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Analyze companies through /api/analyze with RISK_SCORING=window, run the nightly re-score job without
+new data and check that it leaves the scores the API stored exactly as they were
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from datetime import datetime, timedelta
+
+FETCHES = [
+    # Exxon is analyzed twice: the second fetch repeats one stored article and drops the others
+    ('Exxon', [(1, 'Exxon fined for a major oil spill and toxic waste leak.'), (3, 'Exxon workers strike over unsafe conditions.'), (6, 'Exxon reports record profits.')]),
+    ('Google', [(2, 'Google faces an antitrust lawsuit and data privacy fines.'), (4, 'Google data center emissions grow.')]),
+    ('Amazon', [(1, 'Amazon warehouse workers file safety complaints.'), (5, 'Amazon praised for renewable energy investment.')]),
+    ('Exxon', [(3, 'Exxon workers strike over unsafe conditions.'), (8, 'Exxon executives charged with fraud and bribery.')]),
+]
+
+
+def stored_scores(conn) -> dict:
+    from sqlalchemy import text
+    return {
+        row.name: (row.overall_score, row.environmental_score, row.social_score, row.governance_score)
+        for row in conn.execute(text(
+            "SELECT c.name, l.overall_score, l.environmental_score, l.social_score, l.governance_score "
+            "FROM company_latest_scores l JOIN companies c ON c.id = l.company_id"
+        ))
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tmp}/rescore.db"
+        os.environ['RISK_SCORING'] = 'window'
+        os.environ['JOB_WORKERS'] = '0'
+
+        from fastapi.testclient import TestClient
+        from app.database import engine
+        from app.main import app
+        from app.services.registry import services
+        from rescore_companies import rescore
+
+        now = datetime.utcnow()
+        fetches = iter(FETCHES)
+
+        async def fetch_company_news(company: str, limit: int = 10):
+            name, articles = next(fetches)
+            assert name == company
+            return [
+                {'title': f'{company} news {age}', 'content': content, 'url': f'https://example.com/{company}/{age}', 'published_at': now - timedelta(days=age)}
+                for age, content in articles
+            ]
+
+        with TestClient(app) as client:
+            services.news_service.fetch_company_news = fetch_company_news
+            responses = {}
+            for company, _ in FETCHES:
+                response = client.get('/api/analyze', params={'company': company})
+                assert response.status_code == 200
+                responses[company] = response.json()['score']
+
+            with engine.connect() as conn:
+                served = stored_scores(conn)
+            rescore()
+            with engine.connect() as conn:
+                rescored = stored_scores(conn)
+
+    failures = [f"{company}: {served[company]} != {rescored.get(company)}" for company in served if rescored.get(company) != served[company]]
+    failures += [f"{company}: response score {score} != stored {served[company][0]}" for company, score in responses.items() if score != served[company][0]]
+    print(f"🏢 Companies: {len(rescored)}")
+    print(f"📊 Overall scores: {', '.join(f'{company} {scores[0]:.4f}' for company, scores in sorted(rescored.items()))}")
+    if failures:
+        print("❌ Re-score without new data changed the window scores served by the API:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("✅ Re-score left the window scores unchanged, bit for bit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load test: keep CPU-heavy analyses running against a live API server while probing
+/api/companies, and report the probe's latency percentiles for each NLP executor mode
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from app.services.simple_nlp import SimpleNLPService
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CPU_SECONDS_PER_ARTICLE = 0.05  # Simulated model cost per article
+ANALYSIS_CLIENTS = 8
+DURATION = 10.0  # Seconds of load per mode
+
+
+class SlowNLPService(SimpleNLPService):
+    """SimpleNLPService that burns CPU per article like a real model would"""
+
+    def analyze_batch(self, texts):
+        for _ in texts:
+            deadline = time.process_time() + CPU_SECONDS_PER_ARTICLE
+            while time.process_time() < deadline:
+                pass
+        return super().analyze_batch(texts)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(executor: str, database_path: str, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{database_path}",
+        NLP_SERVICE="load_test_nlp_offload:SlowNLPService",
+        NLP_EXECUTOR=executor,
+        NLP_WORKERS="4",
+        NLP_MAX_PENDING="8",
+        ANALYSIS_CACHE_SIZE="0",
+        PYTHONPATH=os.pathsep.join([BACKEND_DIR, os.path.join(BACKEND_DIR, 'benchmarks')])
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def run_load(base_url: str):
+    """Run analysis clients and a /api/companies probe side by side for DURATION seconds"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for _ in range(100):
+            try:
+                await client.get('/health')
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        # Seed a few companies so the probe returns rows
+        for i in range(20):
+            await client.get('/api/analyze', params={'company': f'Seed Company {i}'})
+
+        deadline = time.perf_counter() + DURATION
+        outcomes = {'ok': 0, 'rejected': 0}
+        probe_latencies = []
+
+        async def analysis_client(client_id: int):
+            n = 0
+            while time.perf_counter() < deadline:
+                n += 1
+                resp = await client.get('/api/analyze', params={'company': f'Load Company {client_id}-{n}'})
+                if resp.status_code == 429:
+                    outcomes['rejected'] += 1
+                    await asyncio.sleep(float(resp.headers.get('Retry-After', '1')) / 10)
+                else:
+                    resp.raise_for_status()
+                    outcomes['ok'] += 1
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                resp = await client.get('/api/companies', params={'limit': 50})
+                resp.raise_for_status()
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(probe(), *[analysis_client(i) for i in range(ANALYSIS_CLIENTS)])
+        return probe_latencies, outcomes
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    modes = sys.argv[1:] or ['inline', 'thread', 'process']
+    print(f"{ANALYSIS_CLIENTS} analysis clients, {CPU_SECONDS_PER_ARTICLE * 1000:.0f} ms CPU per article, {DURATION:.0f}s per mode")
+
+    for mode in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_server(mode, os.path.join(tmp, 'load.db'), port)
+            try:
+                latencies, outcomes = asyncio.run(run_load(f"http://127.0.0.1:{port}"))
+            finally:
+                server.terminate()
+                server.wait()
+
+        print(
+            f"{mode:8s} /api/companies p50 {statistics.median(latencies):8.1f} ms"
+            f"  p99 {percentile(latencies, 99):8.1f} ms  max {max(latencies):8.1f} ms"
+            f"  | analyses ok {outcomes['ok']:4d}  429s {outcomes['rejected']:4d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Load test simple_backend.py: client threads hold keep-alive connections and request
+/api/companies, with an occasional /api/analyze of a new company that invalidates the
+cached list, and the script reports requests/sec and latency percentiles
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(host: str, port: int):
+    for _ in range(100):
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on {host}:{port} did not start")
+
+
+def client(host: str, port: int, deadline: float, analyze_every: int, client_id: int, results: dict, keep_alive: bool):
+    latencies = []
+    errors = 0
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+        if analyze_every and n % analyze_every == 0:
+            path = '/api/analyze?company=' + urllib.parse.quote(f'Load Company {client_id}-{n}')
+        else:
+            path = '/api/companies'
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers={} if keep_alive else {'Connection': 'close'})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+            if not keep_alive or response.will_close:
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=10)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    results[client_id] = (latencies, errors)
+
+
+def run(host: str, port: int, clients: int, duration: float, analyze_every: int, keep_alive: bool):
+    results = {}
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client, args=(host, port, deadline, analyze_every, i, results, keep_alive))
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for client_latencies, _ in results.values() for latency in client_latencies)
+    errors = sum(client_errors for _, client_errors in results.values())
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{clients:3d} clients {'keep-alive' if keep_alive else 'close     '}"
+        f"  {len(latencies) / elapsed:9.0f} req/s  p50 {statistics.median(latencies):7.2f} ms"
+        f"  p99 {p99:7.2f} ms  errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='test a server that is already running instead of starting one')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--analyze-every', type=int, default=100, help='every Nth request analyzes a new company (0 for never)')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parsed = urllib.parse.urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = subprocess.Popen(
+            [sys.executable, 'simple_backend.py', '--host', host, '--port', str(port), '--quiet'],
+            cwd=REPO_DIR, stdout=subprocess.DEVNULL
+        )
+    try:
+        wait_until_up(host, port)
+        for clients in args.clients:
+            for keep_alive in (True, False):
+                run(host, port, clients, args.duration, args.analyze_every, keep_alive)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
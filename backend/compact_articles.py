@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+One-off job that collapses duplicate articles left by repeated analyses
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.migrations import run_migrations
+from app.services.deduplication import compact_duplicate_articles
+from app.services.leaderboard import refresh_leaderboard
+
+def count_rows():
+    """Count stored articles and events (zero before the tables exist)"""
+    if not inspect(engine).has_table('articles'):
+        return 0, 0
+    with engine.connect() as conn:
+        return (
+            conn.execute(text("SELECT COUNT(*) FROM articles")).scalar(),
+            conn.execute(text("SELECT COUNT(*) FROM esg_events")).scalar()
+        )
+
+def compact():
+    """Collapse duplicate articles; on an unmigrated database the identity migration does the first pass"""
+    articles_before, events_before = count_rows()
+    
+    run_migrations(engine)
+    with engine.begin() as conn:
+        compact_duplicate_articles(conn)
+        refresh_leaderboard(conn)  # Article counts changed
+    
+    articles_after, events_after = count_rows()
+    print("✅ Article compaction finished")
+    print(f"📰 Articles: {articles_before} -> {articles_after}")
+    print(f"🔎 Events: {events_before} -> {events_after}")
+
+if __name__ == "__main__":
+    compact()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Retention job for risk score history: deletes raw scores and daily rollups past their windows.
+The job scheduler runs it with the API; this runs it on demand, e.g. when JOB_WORKERS=0.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import time
+from sqlalchemy import func, select
+from app.database import engine, RiskScore, RiskScoreRollup
+from app.migrations import run_migrations
+from app.services.score_history import prune_history
+
+def count_rows(conn):
+    return (
+        conn.execute(select(func.count(RiskScore.id))).scalar(),
+        conn.execute(select(func.count()).select_from(RiskScoreRollup).where(RiskScoreRollup.resolution == 'day')).scalar()
+    )
+
+def prune(raw_days: float, daily_days: float):
+    """Prune history past the retention windows in one transaction"""
+    run_migrations(engine)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        raw_before, daily_before = count_rows(conn)
+        prune_history(conn, raw_days, daily_days)
+        raw_after, daily_after = count_rows(conn)
+
+    print("✅ Score history pruned")
+    print(f"📈 Raw scores: {raw_before} -> {raw_after} (keeping {raw_days:g} days)")
+    print(f"📅 Daily rollups: {daily_before} -> {daily_after} (keeping {daily_days:g} days)")
+    print(f"⏱️  Total: {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--raw-days", type=float, default=float(os.getenv("HISTORY_RAW_DAYS", "90")), help="days of raw scores to keep (0 keeps all)")
+    parser.add_argument("--daily-days", type=float, default=float(os.getenv("HISTORY_DAILY_DAYS", "730")), help="days of daily rollups to keep (0 keeps all)")
+    args = parser.parse_args()
+
+    prune(args.raw_days, args.daily_days)
@@ -17,6 +17,8 @@ interface Company {
   total_articles: number
 }
 
+const COMPANY_PAGE_SIZE = 100
+
 export default function Dashboard() {
   const [companies, setCompanies] = useState<Company[]>([])
   const [loading, setLoading] = useState(false)
@@ -25,7 +27,7 @@ export default function Dashboard() {
 
   const fetchCompanies = async () => {
     try {
-      const data = await getCompanies()
+      const data = await getCompanies({ sortBy: 'overall_score', order: 'desc', limit: COMPANY_PAGE_SIZE })
       setCompanies(data)
     } catch (err) {
       console.error('Failed to fetch companies:', err)
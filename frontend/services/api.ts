@@ -25,9 +25,9 @@ export interface CompanyAnalysis {
   }>
   articles: Array<{
     title: string
-    content: string
+    content: string | null
     url: string
-    published_at: string
+    published_at: string | null
     sentiment_score: number
     events: Array<{
       event_type: string
@@ -42,14 +42,30 @@ export interface CompanyAnalysis {
 export interface Company {
   id: number
   name: string
+  sector: string | null
   overall_score: number
   environmental_score: number
   social_score: number
   governance_score: number
+  overall_percentile: number | null  // Percentiles are null until the next refresh after a first analysis
+  environmental_percentile: number | null
+  social_percentile: number | null
+  governance_percentile: number | null
   last_analyzed: string
   total_articles: number
 }
 
+export type CompanySortField =
+  | 'id'
+  | 'name'
+  | 'sector'
+  | 'overall_score'
+  | 'environmental_score'
+  | 'social_score'
+  | 'governance_score'
+  | 'last_analyzed'
+  | 'total_articles'
+
 export const analyzeCompany = async (companyName: string): Promise<CompanyAnalysis> => {
   try {
     const response = await api.get(`/api/analyze?company=${encodeURIComponent(companyName)}`)
@@ -60,9 +76,70 @@ export const analyzeCompany = async (companyName: string): Promise<CompanyAnalys
   }
 }
 
-export const getCompanies = async (): Promise<Company[]> => {
+export type CompanyAnalysisArticle = CompanyAnalysis['articles'][number]
+
+export type CompanyAnalysisResult = Omit<CompanyAnalysis, 'articles'>
+
+// Streams an analysis, calling onArticle for each article as soon as the backend has analyzed it
+export const analyzeCompanyStream = async (
+  companyName: string,
+  onArticle: (article: CompanyAnalysisArticle, index: number) => void
+): Promise<CompanyAnalysisResult> => {
+  const response = await fetch(`${API_BASE_URL}/api/analyze/stream?company=${encodeURIComponent(companyName)}`)
+  if (!response.ok || !response.body) {
+    throw new Error(`Error analyzing company: ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffered = ''
+  let result: CompanyAnalysisResult | null = null
+
+  while (true) {
+    const { done, value } = await reader.read()
+    buffered += decoder.decode(value, { stream: !done })
+    const lines = buffered.split('\n')
+    buffered = done ? '' : lines.pop() ?? ''
+
+    for (const line of lines) {
+      if (!line.trim()) continue
+      const { type, ...message } = JSON.parse(line)
+      if (type === 'article') {
+        onArticle(message.article, message.index)
+      } else if (type === 'result') {
+        result = message as CompanyAnalysisResult
+      } else if (type === 'error') {
+        throw new Error(message.detail)
+      }
+    }
+    if (done) break
+  }
+
+  if (!result) {
+    throw new Error('Analysis stream ended without a result')
+  }
+  return result
+}
+
+export interface CompanyQuery {
+  sortBy?: CompanySortField
+  order?: 'asc' | 'desc'
+  limit?: number
+  offset?: number
+  sector?: string
+}
+
+export const getCompanies = async (query: CompanyQuery = {}): Promise<Company[]> => {
   try {
-    const response = await api.get('/api/companies')
+    const response = await api.get('/api/companies', {
+      params: {
+        sort_by: query.sortBy,
+        order: query.order,
+        limit: query.limit,
+        offset: query.offset,
+        sector: query.sector,
+      },
+    })
     return response.data
   } catch (error) {
     console.error('Error fetching companies:', error)
@@ -70,12 +147,77 @@ export const getCompanies = async (): Promise<Company[]> => {
   }
 }
 
-export const getCompanyDetails = async (companyId: number): Promise<CompanyAnalysis> => {
+export interface CompanyDetails extends CompanyAnalysis {
+  next_cursor: string | null
+}
+
+export interface CompanyDetailsQuery {
+  limit?: number
+  cursor?: string
+  includeContent?: boolean
+}
+
+export const getCompanyDetails = async (companyId: number, query: CompanyDetailsQuery = {}): Promise<CompanyDetails> => {
   try {
-    const response = await api.get(`/api/companies/${companyId}/details`)
+    const response = await api.get(`/api/companies/${companyId}/details`, {
+      params: {
+        limit: query.limit,
+        cursor: query.cursor,
+        include_content: query.includeContent,
+      },
+    })
     return response.data
   } catch (error) {
     console.error('Error fetching company details:', error)
     throw error
   }
 }
+
+export type HistoryResolution = 'raw' | 'day' | 'week' | 'month'
+
+export interface ScoreAggregate {
+  min: number
+  max: number
+  mean: number
+  last: number
+}
+
+export interface ScoreHistoryPoint {
+  start: string
+  count: number
+  overall_score: ScoreAggregate
+  environmental_score: ScoreAggregate
+  social_score: ScoreAggregate
+  governance_score: ScoreAggregate
+}
+
+export interface ScoreHistory {
+  company_id: number
+  company: string
+  resolution: HistoryResolution
+  points: ScoreHistoryPoint[]
+}
+
+export interface ScoreHistoryQuery {
+  resolution?: HistoryResolution
+  since?: string
+  until?: string
+  limit?: number
+}
+
+export const getCompanyHistory = async (companyId: number, query: ScoreHistoryQuery = {}): Promise<ScoreHistory> => {
+  try {
+    const response = await api.get(`/api/companies/${companyId}/history`, {
+      params: {
+        resolution: query.resolution,
+        since: query.since,
+        until: query.until,
+        limit: query.limit,
+      },
+    })
+    return response.data
+  } catch (error) {
+    console.error('Error fetching company history:', error)
+    throw error
+  }
+}
@@ -3,15 +3,17 @@
 Simple ESG Risk Analyzer Backend - No complex dependencies
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+import argparse
 import json
+import threading
 import urllib.parse
 from datetime import datetime
 from companies_data import COMPANIES_DATA
 
-# Mock data - this will be updated when new companies are analyzed
-MOCK_COMPANIES = COMPANIES_DATA.copy()
-
 MOCK_ANALYSIS = {
     "tesla": {
         "company": "Tesla",
@@ -49,92 +51,273 @@ MOCK_ANALYSIS = {
     }
 }
 
+# Score columns, each with a sorted index for top-N and range queries
+SCORE_FIELDS = ('overall_score', 'environmental_score', 'social_score', 'governance_score')
+
+class CompanyStore:
+    """
+    Mock companies shared by all request threads, stored as array-backed columns with a
+    name -> row hash index and, per score, row numbers sorted by that score. Range and top-N
+    queries bisect the sorted index. The serialized full list is cached and only rebuilt after
+    a new company is added.
+    """
+
+    def __init__(self, companies):
+        self._lock = threading.Lock()
+        self._companies_json = None
+        
+        companies = sorted(companies, key=lambda company: company['id'])
+        self._ids = array('l', (company['id'] for company in companies))
+        self._names = [company['name'] for company in companies]
+        self._last_analyzed = [company['last_analyzed'] for company in companies]
+        self._total_articles = array('l', (company['total_articles'] for company in companies))
+        self._scores = {field: array('d', (company[field] for company in companies)) for field in SCORE_FIELDS}
+        
+        self._rows_by_name = {}
+        for row, name in enumerate(self._names):
+            self._rows_by_name.setdefault(name.lower(), row)
+        
+        # Parallel arrays per score: values ascending and their row numbers (ties in row order)
+        self._sorted = {}
+        for field, scores in self._scores.items():
+            rows = sorted(range(len(scores)), key=lambda row: (scores[row], row))
+            self._sorted[field] = (array('d', (scores[row] for row in rows)), array('l', rows))
+
+    def companies_json(self) -> Tuple[bytes, int]:
+        """Every company serialized, and how many there are"""
+        with self._lock:
+            if self._companies_json is None:
+                self._companies_json = json.dumps([self._company(row) for row in range(len(self._ids))]).encode()
+            return self._companies_json, len(self._ids)
+
+    def get_or_add(self, company: dict) -> Tuple[dict, bool]:
+        """The stored company with this name, or the given one added with the next id"""
+        with self._lock:
+            row = self._rows_by_name.get(company['name'].lower())
+            if row is not None:
+                return self._company(row), False
+            
+            row = len(self._ids)
+            self._ids.append(self._ids[-1] + 1 if self._ids else 1)
+            self._names.append(company['name'])
+            self._last_analyzed.append(company['last_analyzed'])
+            self._total_articles.append(company['total_articles'])
+            for field in SCORE_FIELDS:
+                score = company[field]
+                self._scores[field].append(score)
+                values, rows = self._sorted[field]
+                position = bisect_right(values, score)
+                values.insert(position, score)
+                rows.insert(position, row)
+            self._rows_by_name[company['name'].lower()] = row
+            self._companies_json = None
+            return self._company(row), True
+
+    def query(
+        self,
+        sort: str = 'id',
+        descending: bool = False,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Tuple[List[dict], int]:
+        """
+        Companies ordered by id or a score, optionally limited to sort scores within
+        [min_score, max_score], with the number matched before limit and offset
+        """
+        with self._lock:
+            # Positions in the chosen order; range slicing keeps this O(log n + limit)
+            if sort == 'id':
+                order = None
+                positions = range(len(self._ids))
+            else:
+                values, order = self._sorted[sort]
+                low = bisect_left(values, min_score) if min_score is not None else 0
+                high = bisect_right(values, max_score) if max_score is not None else len(values)
+                positions = range(low, max(low, high))
+            
+            total = len(positions)
+            if descending:
+                positions = positions[::-1]
+            positions = positions[offset:] if limit is None else positions[offset:offset + limit]
+            return [self._company(order[position] if order is not None else position) for position in positions], total
+
+    def _company(self, row: int) -> dict:
+        return {
+            "id": self._ids[row],
+            "name": self._names[row],
+            "overall_score": self._scores['overall_score'][row],
+            "environmental_score": self._scores['environmental_score'][row],
+            "social_score": self._scores['social_score'][row],
+            "governance_score": self._scores['governance_score'][row],
+            "last_analyzed": self._last_analyzed[row],
+            "total_articles": self._total_articles[row]
+        }
+
+# Mock data - this will be updated when new companies are analyzed
+MOCK_COMPANIES = CompanyStore(COMPANIES_DATA)
+
+# Fixed responses are serialized once at startup
+STATIC_RESPONSES = {
+    '/': json.dumps({"message": "ESG Risk Analyzer API is running"}).encode(),
+    '/health': json.dumps({"status": "healthy"}).encode(),
+}
+MOCK_ANALYSIS_JSON = {company: json.dumps(analysis).encode() for company, analysis in MOCK_ANALYSIS.items()}
+NOT_FOUND = json.dumps({"error": "Not found"}).encode()
+
+def analyze_company(company: str) -> bytes:
+    """Mock analysis of a company, adding it to the company list the first time it is seen"""
+    stored, _ = MOCK_COMPANIES.get_or_add({
+        "name": company.title(),
+        "overall_score": 0.55,
+        "environmental_score": 0.50,
+        "social_score": 0.60,
+        "governance_score": 0.55,
+        "last_analyzed": datetime.now().isoformat() + "Z",
+        "total_articles": 1
+    })
+    company_title = stored["name"]
+    
+    response = {
+        "company": company_title,
+        "score": stored["overall_score"],
+        "risk_breakdown": {field: stored[field] for field in SCORE_FIELDS},
+        "events": [
+            {
+                "event_type": "governance_regulatory_fine",
+                "description": f"{company_title} is facing regulatory scrutiny over compliance issues.",
+                "severity": 0.6
+            }
+        ],
+        "articles": [
+            {
+                "title": f"{company_title} Reports Strong Q4 Earnings",
+                "content": f"{company_title} has reported strong fourth-quarter earnings, beating analyst expectations.",
+                "url": f"https://example.com/{company}-earnings",
+                "published_at": "2024-01-15T10:00:00Z",
+                "sentiment_score": 0.2,
+                "events": []
+            }
+        ],
+        "total_articles": 1,
+        "analyzed_at": datetime.now().isoformat() + "Z"
+    }
+    return json.dumps(response).encode()
+
+def query_companies(query_params: dict) -> Tuple[int, bytes, dict]:
+    """
+    /api/companies?sort=&order=&min_score=&max_score=&limit=&offset= over the company store.
+    Score bounds apply to the sort field, which defaults to overall_score when a bound is given.
+    """
+    params = {name: values[0] for name, values in query_params.items()}
+    try:
+        min_score = float(params['min_score']) if 'min_score' in params else None
+        max_score = float(params['max_score']) if 'max_score' in params else None
+        limit = int(params['limit']) if 'limit' in params else None
+        offset = int(params.get('offset', 0))
+    except ValueError as e:
+        return 400, json.dumps({"error": f"Invalid query parameter: {e}"}).encode(), {}
+    
+    bounded = min_score is not None or max_score is not None
+    sort = params.get('sort') or params.get('sort_by') or ('overall_score' if bounded else 'id')
+    if sort not in ('id', *SCORE_FIELDS):
+        return 400, json.dumps({"error": f"sort must be one of: id, {', '.join(SCORE_FIELDS)}"}).encode(), {}
+    if sort == 'id' and bounded:
+        return 400, json.dumps({"error": "min_score and max_score need a score sort"}).encode(), {}
+    if (limit is not None and limit < 0) or offset < 0:
+        return 400, json.dumps({"error": "limit and offset must not be negative"}).encode(), {}
+    
+    # Scores default to highest risk first
+    order = params.get('order', 'asc' if sort == 'id' else 'desc')
+    if order not in ('asc', 'desc'):
+        return 400, json.dumps({"error": "order must be asc or desc"}).encode(), {}
+    
+    companies, total = MOCK_COMPANIES.query(sort, order == 'desc', min_score, max_score, limit, offset)
+    return 200, json.dumps(companies).encode(), {'X-Total-Count': str(total)}
+
 class ESGRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests; every response sets Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without TCP_NODELAY each kept-alive response
+    # waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+
     def do_GET(self):
-        # Handle CORS
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        parsed_url = urllib.parse.urlparse(self.path)
+        # Parse query parameters
+        query_params = urllib.parse.parse_qs(parsed_url.query)
+        status = 200
+        headers = {}
         
-        if self.path == '/':
-            response = {"message": "ESG Risk Analyzer API is running"}
-        elif self.path == '/health':
-            response = {"status": "healthy"}
-        elif self.path == '/api/companies':
-            response = MOCK_COMPANIES
-        elif self.path.startswith('/api/analyze'):
-            # Parse query parameters
-            parsed_url = urllib.parse.urlparse(self.path)
-            query_params = urllib.parse.parse_qs(parsed_url.query)
-            company = query_params.get('company', [''])[0].lower()
+        if parsed_url.path in STATIC_RESPONSES:
+            body = STATIC_RESPONSES[parsed_url.path]
+        elif parsed_url.path == '/api/companies':
+            if query_params:
+                status, body, headers = query_companies(query_params)
+            else:
+                body, total = MOCK_COMPANIES.companies_json()
+                headers = {'X-Total-Count': str(total)}
+        elif parsed_url.path == '/api/analyze':
+            company = query_params.get('company', [''])[0].strip().lower()
             
-            if company in MOCK_ANALYSIS:
-                response = MOCK_ANALYSIS[company]
+            if not company:
+                status = 400
+                body = json.dumps({"error": "company is required"}).encode()
+            elif company in MOCK_ANALYSIS_JSON:
+                body = MOCK_ANALYSIS_JSON[company]
             else:
-                # Generate mock analysis for new company
-                company_title = company.title()
-                new_company_data = {
-                    "id": len(MOCK_COMPANIES) + 1,
-                    "name": company_title,
-                    "overall_score": 0.55,
-                    "environmental_score": 0.50,
-                    "social_score": 0.60,
-                    "governance_score": 0.55,
-                    "last_analyzed": datetime.now().isoformat() + "Z",
-                    "total_articles": 1
-                }
-                
-                # Add new company to the list
-                MOCK_COMPANIES.append(new_company_data)
-                
-                response = {
-                    "company": company_title,
-                    "score": 0.55,
-                    "risk_breakdown": {
-                        "overall_score": 0.55,
-                        "environmental_score": 0.50,
-                        "social_score": 0.60,
-                        "governance_score": 0.55
-                    },
-                    "events": [
-                        {
-                            "event_type": "governance_regulatory_fine",
-                            "description": f"{company_title} is facing regulatory scrutiny over compliance issues.",
-                            "severity": 0.6
-                        }
-                    ],
-                    "articles": [
-                        {
-                            "title": f"{company_title} Reports Strong Q4 Earnings",
-                            "content": f"{company_title} has reported strong fourth-quarter earnings, beating analyst expectations.",
-                            "url": f"https://example.com/{company}-earnings",
-                            "published_at": "2024-01-15T10:00:00Z",
-                            "sentiment_score": 0.2,
-                            "events": []
-                        }
-                    ],
-                    "total_articles": 1,
-                    "analyzed_at": datetime.now().isoformat() + "Z"
-                }
+                body = analyze_company(company)
         else:
-            response = {"error": "Not found"}
+            status = 404
+            body = NOT_FOUND
         
-        self.wfile.write(json.dumps(response).encode())
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_OPTIONS(self):
         # Handle CORS preflight
         self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self._send_cors_headers()
+        self.end_headers()
+
+    def _send_cors_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+class ESGServer(ThreadingHTTPServer):
+    """One thread per connection, so a slow or idle keep-alive client doesn't block the others"""
+    daemon_threads = True
+    request_queue_size = 128
+    quiet = False
 
 if __name__ == '__main__':
-    server = HTTPServer(('localhost', 8001), ESGRequestHandler)
-    print("🚀 ESG Risk Analyzer Backend running on http://localhost:8001")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--quiet', action='store_true', help="don't log each request")
+    args = parser.parse_args()
+
+    server = ESGServer((args.host, args.port), ESGRequestHandler)
+    server.quiet = args.quiet
+    print(f"🚀 ESG Risk Analyzer Backend running on http://{args.host}:{args.port}")
     print("📊 Frontend should be on http://localhost:3000")
     print("🛑 Press Ctrl+C to stop")
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()